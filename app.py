@@ -14,9 +14,10 @@ from ui.handlers import (
     create_my_convolution_ui, create_edge_detection_ui,
     create_my_convolution_ui, create_edge_detection_ui,
     create_laplace_features_ui, create_fourier_ui,
-    create_idft_ui
+    create_idft_ui, create_frequency_filter_ui
 )
 from utils.image_utils import resize_for_display, check_alpha_channel
+from features import pyramid
 
 
 class ImageApp(tk.Tk):
@@ -125,7 +126,8 @@ class ImageApp(tk.Tk):
             "Dò biên (Edge Detection)",
             "Laplace & LoG & Sharpening",
             "Biến đổi Fourier",
-            "Biến đổi Fourier Ngược"
+            "Biến đổi Fourier Ngược",
+            "Lọc miền tần số"
         ]
         for f in funcs:
             self.func_listbox.insert(tk.END, f)
@@ -187,6 +189,7 @@ class ImageApp(tk.Tk):
         self.original_mode = img.mode
         self.has_alpha = check_alpha_channel(img)
 
+        pyramid.clear_cache() # Tầng kim tự tháp của ảnh cũ không còn dùng
         self.original_image = img.convert("RGBA")
         self.current_filename = os.path.basename(path)
         self.filename_label.config(text=f"📄 {self.current_filename}", fg='#2ecc71')
@@ -202,7 +205,8 @@ class ImageApp(tk.Tk):
         self.canvas.master.pack(fill='both', expand=True)
         
         self.canvas.delete("all")
-        resized = resize_for_display(self.canvas, pil_image) # Thu nhỏ ảnh nếu quá to
+        # Thu nhỏ ảnh nếu quá to; ảnh gốc được xem lại nhiều lần -> dùng tầng kim tự tháp đã cache
+        resized = resize_for_display(self.canvas, pil_image, cached=pil_image is self.original_image)
         self.display_image = resized
 
         self.photo_image = ImageTk.PhotoImage(self.display_image)
@@ -267,12 +271,29 @@ class ImageApp(tk.Tk):
             create_edge_detection_ui,
             create_laplace_features_ui,
             create_fourier_ui,
-            create_idft_ui
+            create_idft_ui,
+            create_frequency_filter_ui
         ]
         
         if 0 <= idx < len(handlers):
             handlers[idx](self, self.info_frame)
 
+    @property
+    def processed_image(self): # Ảnh đã xử lý; ảnh đặt trễ bằng set_processed_lazy chỉ được tính ở lần đọc đầu
+        if self._processed_render is not None:
+            render, self._processed_render = self._processed_render, None
+            self._processed_image = render()
+        return self._processed_image
+
+    @processed_image.setter
+    def processed_image(self, image):
+        self._processed_render = None
+        self._processed_image = image
+
+    def set_processed_lazy(self, render): # Đặt ảnh đã xử lý là render() nhưng chỉ tính khi lưu/đọc (vd bản đủ độ phân giải)
+        self._processed_render = render
+        self._processed_image = None
+
     def save_as(self):
         """Lưu ảnh gốc sang định dạng khác"""
         if self.original_image is None:
@@ -0,0 +1,38 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Chay tu thu muc goc: python -m benchmarks.bench_box
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from features import noise, summed_area
+
+SIZE = 2048
+WINDOWS = [3, 5, 9, 15, 25, 51]
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench():
+    print(f"--- Benchmark loc trung binh / phuong sai (bang tong tich luy), anh {SIZE}x{SIZE} uint8 ---")
+    print("(chi phi moi pixel khong phu thuoc kich thuoc cua so)")
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (SIZE, SIZE), dtype=np.uint8)
+
+    print(f"{'size':>6} {'mean':>10} {'variance':>10}")
+    for size in WINDOWS:
+        t_mean = best_of(lambda: noise.average_filter_array(img, size))
+        t_var = best_of(lambda: summed_area.window_variance(img, size, return_mean=True))
+        print(f"{size:>6} {t_mean:>9.3f}s {t_var:>9.3f}s")
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,88 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Chay tu thu muc goc: python -m benchmarks.bench_convolution [--full]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from features import convolution
+
+SIZES = [512, 2048, 4096]
+
+# Vong lap cu rat cham: mac dinh chi do tren LOOP_ROWS hang roi ngoai suy theo so pixel
+LOOP_ROWS = 64
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(full=False):
+    print("--- Benchmark my_convolution: vectorized vs loop ---")
+    rng = np.random.default_rng(0)
+    kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
+
+    print(f"{'size':>10} {'loop (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for n in SIZES:
+        img = rng.integers(0, 256, (n, n), dtype=np.uint8)
+
+        t_vec = best_of(lambda: convolution.my_convolution(img, kernel))
+
+        if full or n <= 512:
+            t_loop = best_of(lambda: convolution.my_convolution_loop(img, kernel), repeat=1)
+            note = ""
+        else:
+            strip = img[:LOOP_ROWS]
+            t_strip = best_of(lambda: convolution.my_convolution_loop(strip, kernel), repeat=1)
+            t_loop = t_strip * n / LOOP_ROWS
+            note = " (ngoai suy)"
+
+        # Kiem tra ket qua giong het nhau tren mot phan anh
+        part = img[:LOOP_ROWS, :LOOP_ROWS]
+        same = np.array_equal(convolution.my_convolution(part, kernel),
+                              convolution.my_convolution_loop(part, kernel))
+
+        print(f"{n:>4}x{n:<5} {t_loop:>12.3f} {t_vec:>15.4f} {t_loop / t_vec:>8.0f}x{note}"
+              f"{'' if same else '  KET QUA KHAC!'}")
+
+
+def bench_separable(n=2048):
+    print(f"\n--- Separable (2 luot 1-D) vs 2-D, anh {n}x{n} ---")
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (n, n), dtype=np.uint8)
+
+    print(f"{'kernel':>10} {'2-D (s)':>10} {'1-D x2 (s)':>11} {'speedup':>9}")
+    for k in [3, 7, 15]:
+        kernel = np.ones((k, k), dtype=int)
+        t_2d = best_of(lambda: convolution.my_convolution(img, kernel, separable=False))
+        t_sep = best_of(lambda: convolution.my_convolution(img, kernel, separable=True))
+        print(f"{k:>4}x{k:<5} {t_2d:>10.4f} {t_sep:>11.4f} {t_2d / t_sep:>8.1f}x")
+
+
+def bench_integer(n=4096):
+    print(f"\n--- uint8: duong so nguyen (int16/int32) vs float64, anh {n}x{n} ---")
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (n, n), dtype=np.uint8)
+
+    kernels = [
+        ("laplace 8n", np.array([[1, 1, 1], [1, -8, 1], [1, 1, 1]])),
+        ("gaussian /16", np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]]) / 16.0),
+    ]
+    print(f"{'kernel':>14} {'float (s)':>10} {'int (s)':>9} {'acc dtype':>10} {'bytes/px':>9}")
+    for name, kernel in kernels:
+        t_float = best_of(lambda: convolution.my_convolution(img, kernel))
+        t_int = best_of(lambda: convolution.integer_convolution(img, kernel))
+        acc = convolution.integer_convolution(img[:8, :8], kernel).dtype
+        print(f"{name:>14} {t_float:>10.4f} {t_int:>9.4f} {str(acc):>10} {acc.itemsize:>5} vs 8")
+
+
+if __name__ == "__main__":
+    bench(full='--full' in sys.argv)
+    bench_separable()
+    bench_integer()
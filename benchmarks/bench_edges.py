@@ -0,0 +1,49 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Chay tu thu muc goc: python -m benchmarks.bench_edges
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from features import edge_detection
+
+# 20 MP (5000 x 4000)
+SHAPE = (4000, 5000)
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench():
+    print(f"--- Benchmark edge detectors tren anh {SHAPE[1]}x{SHAPE[0]} ---")
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[0:SHAPE[0], 0:SHAPE[1]]
+    # Anh "tu nhien": van song muot + nhieu nhe; anh nhieu thuan la truong hop xau cho hysteresis
+    natural = 128 + 60 * np.sin(xx / 50) * np.cos(yy / 70) + rng.normal(0, 5, SHAPE)
+    images = {
+        "natural": np.clip(natural, 0, 255).astype(np.uint8),
+        "noise": rng.integers(0, 256, SHAPE, dtype=np.uint8),
+    }
+    del yy, xx, natural
+
+    cases = [
+        ("sobel", lambda img: edge_detection.apply_sobel(img, 100)),
+        ("kirsch", lambda img: edge_detection.apply_kirsch(img, 100)),
+        ("canny", lambda img: edge_detection.apply_canny(img, 50, 100)),
+    ]
+
+    print(f"{'operator':>10} " + " ".join(f"{name:>10}" for name in images))
+    for name, fn in cases:
+        cells = [f"{best_of(lambda: fn(img), repeat=2):.2f}s" for img in images.values()]
+        print(f"{name:>10} " + " ".join(f"{c:>10}" for c in cells))
+
+
+if __name__ == "__main__":
+    bench()
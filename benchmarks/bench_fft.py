@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Chay tu thu muc goc: python -m benchmarks.bench_fft
+# Thoi gian DFT_Fourier / nua pho RDFT_Fourier (FFT tu viet) so voi np.fft.fft2 va goi y features.fft.MAX_RADIX
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from features import fft, fourier
+
+SHAPES = [(64, 64), (512, 512), (1000, 1000), (1080, 1920), (2048, 2048), (2160, 3840), (1009, 1013)]
+RADICES = [8, 12, 16, 20, 32]
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench():
+    print("--- Benchmark DFT_Fourier (FFT) vs np.fft.fft2 ---")
+    rng = np.random.default_rng(0)
+    print(f"{'shape':>12} {'DFT_Fourier':>12} {'np.fft':>10} {'IDFT':>10} {'RDFT':>10} {'IRDFT':>10}")
+    for shape in SHAPES:
+        img = rng.random(shape) * 255
+        t_ours = best_of(lambda: fourier.DFT_Fourier(img))
+        t_np = best_of(lambda: np.fft.fft2(img))
+        F = fourier.DFT_Fourier(img)
+        t_inv = best_of(lambda: fourier.IDFT_Fourier(F))
+        H = fourier.RDFT_Fourier(img)
+        t_half = best_of(lambda: fourier.RDFT_Fourier(img))
+        t_ihalf = best_of(lambda: fourier.IRDFT_Fourier(H, shape[1]))
+        print(f"{shape[0]:>5}x{shape[1]:<6} {t_ours:>11.3f}s {t_np:>9.3f}s {t_inv:>9.3f}s {t_half:>9.3f}s {t_ihalf:>9.3f}s")
+
+    print("\n--- Dich tam pho: np.fft.fftshift vs shifted (mang moi / out / tai cho) ---")
+    print(f"{'shape':>12} {'fftshift':>10} {'shifted':>10} {'out':>10} {'in-place':>10}")
+    for shape in [(1080, 1920), (2048, 2048), (2159, 3841)]:
+        F = rng.random(shape) + 1j
+        out = np.empty_like(F)
+        t_np = best_of(lambda: np.fft.fftshift(F))
+        t_new = best_of(lambda: fourier.shifted(F))
+        t_out = best_of(lambda: fourier.shifted(F, out=out))
+        t_in = best_of(lambda: fourier.shifted(F, out=F))
+        print(f"{shape[0]:>5}x{shape[1]:<6} {t_np:>9.3f}s {t_new:>9.3f}s {t_out:>9.3f}s {t_in:>9.3f}s")
+
+    print("\n--- MAX_RADIX (anh 2160x3840) ---")
+    img = rng.random((2160, 3840))
+    default = fft.MAX_RADIX
+    for radix in RADICES:
+        fft.MAX_RADIX = radix
+        fft.clear_cache()
+        print(f"{radix:>6} {best_of(lambda: fft.fft2(img)):>9.3f}s")
+    fft.MAX_RADIX = default
+    fft.clear_cache()
+
+
+if __name__ == "__main__":
+    bench()
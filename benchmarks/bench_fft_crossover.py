@@ -0,0 +1,74 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Chay tu thu muc goc: python -m benchmarks.bench_fft_crossover
+# Do diem giao nhau spatial / FFT va goi y gia tri convolution.FFT_COST_FACTOR va
+# convolution.SEPARABLE_COST_FACTOR cho may hien tai.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from features import convolution
+
+IMAGE_SIZES = [512, 1024, 2048]
+KERNEL_SIZES = [3, 5, 7, 9, 11, 15, 21]
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench():
+    print("--- Benchmark spatial vs FFT convolution ---")
+    rng = np.random.default_rng(0)
+    ratios = []
+    sep_ratios = []
+
+    for n in IMAGE_SIZES:
+        img = rng.integers(0, 256, (n, n), dtype=np.uint8)
+        print(f"\nAnh {n}x{n}")
+        print(f"{'kernel':>8} {'spatial (s)':>12} {'tach (s)':>10} {'fft (s)':>10} {'nhanh hon':>10} "
+              f"{'auto chon':>10} {'auto (tach)':>12}")
+
+        crossover = None
+        for k in KERNEL_SIZES:
+            # Kernel ngau nhien khong tach duoc: do dung duong 2-D
+            kernel = rng.integers(-3, 4, (k, k))
+            t_sp = best_of(lambda: convolution.my_convolution(img, kernel, separable=False, method='spatial'))
+            t_fft = best_of(lambda: convolution.my_convolution(img, kernel, method='fft'))
+            # Kernel Gaussian tach duoc: do 2 luot 1-D
+            g = np.exp(-np.linspace(-2, 2, k) ** 2)
+            gauss = np.outer(g, g)
+            factors = convolution.prepared_factors(gauss)
+            t_sep = best_of(lambda: convolution.my_convolution(img, gauss, separable=True))
+            picked = convolution.choose_method(img.shape, kernel)
+            picked_sep = convolution.choose_method(img.shape, gauss, factors)
+            faster = 'fft' if t_fft < t_sp else 'spatial'
+            if faster == 'fft' and crossover is None:
+                crossover = k
+            print(f"{k:>4}x{k:<3} {t_sp:>12.4f} {t_sep:>10.4f} {t_fft:>10.4f} {faster:>10} "
+                  f"{picked:>10} {picked_sep:>12}")
+
+            # Ty le chi phi 1 don vi FFT / 1 phep nhan-cong spatial
+            P = convolution._next_fast_len(n + 2 * (k // 2))
+            unit = t_sp / (n * n * np.count_nonzero(kernel))
+            fft_units = P * P * np.log2(P * P)
+            ratios.append((t_fft / fft_units) / unit)
+            # Luot tach duoc: t_sep = unit * n^2 * (SEPARABLE_COST_FACTOR * 2k + 2 * SEPARABLE_PASS_COST)
+            sep_ratios.append((t_sep / (unit * n * n) - 2 * convolution.SEPARABLE_PASS_COST) / (2 * k))
+
+        print(f"Diem giao nhau (kernel): {crossover}x{crossover}" if crossover else "Diem giao nhau: > 21x21")
+
+    print(f"\nFFT_COST_FACTOR hien tai: {convolution.FFT_COST_FACTOR}")
+    print(f"FFT_COST_FACTOR goi y cho may nay: {np.median(ratios):.2f}")
+    print(f"SEPARABLE_COST_FACTOR hien tai: {convolution.SEPARABLE_COST_FACTOR}")
+    print(f"SEPARABLE_COST_FACTOR goi y cho may nay: {np.median(sep_ratios):.2f}")
+
+
+if __name__ == "__main__":
+    bench()
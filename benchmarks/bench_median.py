@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Chay tu thu muc goc: python -m benchmarks.bench_median
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from features import noise
+
+SIZE = 1024
+WINDOWS = [3, 5, 7, 9, 11, 15, 21, 31]
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench():
+    print(f"--- Benchmark median: sap xep (np.median) vs histogram, anh {SIZE}x{SIZE} uint8 ---")
+    print(f"(median_filter_array chuyen sang histogram tu size >= {noise.HISTOGRAM_MEDIAN_MIN_SIZE})")
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (SIZE, SIZE), dtype=np.uint8)
+    img_float = img.astype(float)
+
+    print(f"{'size':>6} {'sort':>10} {'histogram':>10} {'ratio':>8}")
+    for size in WINDOWS:
+        # Duong sap xep rat cham voi cua so lon: chi do 1 lan
+        t_sort = best_of(lambda: noise.median_filter_array(img_float, size), repeat=1)
+        t_hist = best_of(lambda: noise._histogram_median(img, size), repeat=2)
+        print(f"{size:>6} {t_sort:>9.3f}s {t_hist:>9.3f}s {t_sort / t_hist:>7.1f}x")
+
+    print("--- Median thich nghi (chi pixel nhieu) vs median 3x3, theo mat do nhieu muoi tieu ---")
+    y, x = np.mgrid[:SIZE, :SIZE]
+    clean = (127 + 100 * np.sin(x / 40) * np.cos(y / 55)).astype(np.uint8)
+    print(f"{'density':>8} {'median 3x3':>11} {'adaptive':>10}")
+    for density in (0.01, 0.02, 0.05, 0.1, 0.2):
+        noisy = clean.copy()
+        hit = rng.random(clean.shape) < density
+        noisy[hit] = rng.choice(np.array([0, 255], dtype=np.uint8), hit.sum())
+        t_med = best_of(lambda: noise.median_filter_array(noisy, 3), repeat=2)
+        t_ad = best_of(lambda: noise.adaptive_median_filter_array(noisy), repeat=2)
+        print(f"{density:>8.2f} {t_med:>10.3f}s {t_ad:>9.3f}s")
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Chay tu thu muc goc: python -m benchmarks.bench_parallel
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from features import parallel
+
+SIZE = 2048
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench():
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cpus})
+    print(f"--- Benchmark tile scheduler: speedup theo so worker (CPU: {cpus}) ---")
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (SIZE, SIZE), dtype=np.uint8)
+    kernel = rng.integers(-3, 4, (5, 5))
+
+    cases = [
+        ("convolution 5x5", lambda w, b: parallel.parallel_convolution(img, kernel, workers=w, backend=b)),
+        ("average 5x5", lambda w, b: parallel.parallel_average_filter(img, 5, workers=w, backend=b)),
+        ("median 3x3", lambda w, b: parallel.parallel_median_filter(img[:SIZE // 4], 3, workers=w, backend=b)),
+    ]
+
+    for backend in ['thread', 'process']:
+        print(f"\nBackend: {backend}")
+        print(f"{'filter':>16} " + " ".join(f"{f'w={w}':>12}" for w in worker_counts))
+        for name, fn in cases:
+            base = None
+            cells = []
+            for w in worker_counts:
+                t = best_of(lambda: fn(w, backend), repeat=2)
+                base = base or t
+                cells.append(f"{t:.3f}s/{base / t:.1f}x")
+            print(f"{name:>16} " + " ".join(f"{c:>12}" for c in cells))
+
+
+if __name__ == "__main__":
+    bench()
@@ -1,38 +1,13 @@
 import numpy as np
 from PIL import Image
 
-
-def _box_sum(mat: np.ndarray, win: int) -> np.ndarray:
-    """Tính tổng trên cửa sổ win x win bằng integral image; giữ đúng kích thước h x w."""
-    pad = win // 2
-    padded = np.pad(mat, pad_width=pad, mode="reflect")
-    # integral với biên 0 ở trên/trái để dùng chỉ số offset 1
-    integral = np.pad(padded, ((1, 0), (1, 0)), mode="constant", constant_values=0).cumsum(axis=0).cumsum(axis=1)
-
-    h, w = mat.shape
-    y1 = np.arange(win, win + h)
-    x1 = np.arange(win, win + w)
-    y0 = y1 - win
-    x0 = x1 - win
-
-    total = (
-        integral[np.ix_(y1, x1)]
-        - integral[np.ix_(y0, x1)]
-        - integral[np.ix_(y1, x0)]
-        + integral[np.ix_(y0, x0)]
-    )
-    return total
+from features import summed_area
 
 
 def _local_mean_var(gray: np.ndarray, win: int):
-    """Tính trung bình và phương sai cục bộ cho mỗi pixel."""
-    gray_f = gray.astype(np.float32)
-    sum_local = _box_sum(gray_f, win)
-    sum_sq_local = _box_sum(gray_f ** 2, win)
-    area = float(win * win)
-    mean = sum_local / area
-    var = sum_sq_local / area - mean ** 2
-    return mean, var
+    """Tính trung bình và phương sai cục bộ cho mỗi pixel (bảng tổng tích lũy dùng chung, biên reflect)."""
+    # Ảnh uint8 được cộng dồn chính xác bằng int64 (không mất độ chính xác như float32 trên ảnh lớn)
+    return summed_area.window_variance(gray, win, "reflect", return_mean=True)
 
 
 def adaptive_histogram_equalization(img, tile_size=3,
@@ -59,7 +34,7 @@ def adaptive_histogram_equalization(img, tile_size=3,
     m_global = float(y_arr.mean())
     sigma2_global = float(((y_arr - m_global) ** 2).mean())
 
-    mean_local, var_local = _local_mean_var(y_arr, tile_size)
+    mean_local, var_local = _local_mean_var(np.asarray(y), tile_size)
 
     mask = (
         (mean_local >= k0 * m_global) & (mean_local <= k1 * m_global) &
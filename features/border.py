@@ -0,0 +1,103 @@
+import numpy as np
+
+
+def map_indices(start, stop, n, mode):
+    """
+    Chi so [start, stop) tren truc dai n sau khi anh xa vung ngoai bien theo mode
+    (giong np.pad: 'reflect', 'edge', 'wrap'). Voi 'constant' tra ve ca mask hop le.
+    """
+    idx = np.arange(start, stop)
+    if mode == 'constant':
+        valid = (idx >= 0) & (idx < n)
+        return np.clip(idx, 0, n - 1), valid
+    if mode == 'edge':
+        return np.clip(idx, 0, n - 1), None
+    if mode == 'wrap':
+        return np.mod(idx, n), None
+    if mode == 'reflect':
+        if n == 1:
+            return np.zeros_like(idx), None
+        period = 2 * (n - 1)
+        idx = np.mod(idx, period)
+        return np.where(idx >= n, period - idx, idx), None
+    raise ValueError(f"Unknown mode {mode}")
+
+
+def read_window(src, r0, r1, c0, c1, mode='constant', cval=0):
+    """
+    Doc vung [r0:r1, c0:c1] cua src (co the vuot ra ngoai anh), phan ngoai bien dien theo mode.
+    Chi cac hang/cot can thiet duoc doc tu src (phu hop voi np.memmap).
+    """
+    H, W = src.shape[:2]
+
+    # Truong hop thuong gap: vung nam tron trong anh -> slice truc tiep
+    if r0 >= 0 and c0 >= 0 and r1 <= H and c1 <= W:
+        return np.array(src[r0:r1, c0:c1])
+
+    ri, rvalid = map_indices(r0, r1, H, mode)
+    ci, cvalid = map_indices(c0, c1, W, mode)
+
+    if mode == 'constant':
+        block = np.full((r1 - r0, c1 - c0) + src.shape[2:], cval, dtype=src.dtype)
+        rr = np.flatnonzero(rvalid)
+        cc = np.flatnonzero(cvalid)
+        if len(rr) and len(cc):
+            block[rr[0]:rr[-1] + 1, cc[0]:cc[-1] + 1] = src[ri[rr[0]]:ri[rr[-1]] + 1, ci[cc[0]]:ci[cc[-1]] + 1]
+        return block
+
+    return np.asarray(src[np.ix_(ri, ci)])
+
+
+def kernel_margins(kh, kw):
+    """
+    Vien (tren, duoi, trai, phai) cua cua so kh x kw dat tai [i - kh//2, i - kh//2 + kh).
+    Kernel le: doi xung; kernel chan (vd Roberts 2x2): le ben duoi/phai nho hon.
+    """
+    return kh // 2, kh - 1 - kh // 2, kw // 2, kw - 1 - kw // 2
+
+
+def _sub(out, rows, cols):
+    # View [rows, cols] cua mot mang ket qua hoac cua tung mang trong tuple
+    if isinstance(out, tuple):
+        return tuple(o[rows, cols] for o in out)
+    return out[rows, cols]
+
+
+def filter_same(image, valid_func, margins, mode='constant', cval=0, out_dtype=None, out=None):
+    """
+    Ket qua 'same' (cung kich thuoc anh) cua mot phep lan can ma khong tao ban pad cua ca anh.
+    - valid_func(block, out): ghi ket qua 'valid' cua block vao out
+      (out co (tren+duoi) hang va (trai+phai) cot it hon block).
+    - margins: (tren, duoi, trai, phai), xem kernel_margins.
+    - mode: 'constant' (gia tri cval), 'reflect', 'edge', 'wrap' - cung y nghia voi np.pad.
+    - out: mang ket qua cho san (hoac tuple nhieu mang H x W cho phep tinh nhieu dau ra);
+      None thi tao mang moi kieu out_dtype.
+    Phan loi tinh truc tiep tren bo dem goc; chi 4 dai bien mong duoc doc qua read_window.
+    """
+    top, bottom, left, right = margins
+    H, W = image.shape[:2]
+    if out is None:
+        out = np.empty(image.shape, dtype=out_dtype or image.dtype)
+
+    # Anh qua nho so voi vien: pad ao ca anh (ban sao nho)
+    if H <= top + bottom or W <= left + right:
+        valid_func(read_window(image, -top, H + bottom, -left, W + right, mode, cval), out)
+        return out
+
+    valid_func(image, _sub(out, slice(top, H - bottom), slice(left, W - right)))
+
+    def strip(r0, r1, c0, c1):
+        # Ket qua cho vung ra [r0:r1, c0:c1] tu cua so vao co vien
+        block = read_window(image, r0 - top, r1 + bottom, c0 - left, c1 + right, mode, cval)
+        valid_func(block, _sub(out, slice(r0, r1), slice(c0, c1)))
+
+    if top:
+        strip(0, top, 0, W)
+    if bottom:
+        strip(H - bottom, H, 0, W)
+    if left:
+        strip(top, H - bottom, 0, left)
+    if right:
+        strip(top, H - bottom, W - right, W)
+
+    return out
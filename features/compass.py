@@ -0,0 +1,167 @@
+import numpy as np
+
+from features import border
+
+# Thu tu huong, trung voi edge_detection.KIRSCH
+DIRECTIONS = ('N', 'NW', 'W', 'SW', 'S', 'SE', 'E', 'NE')
+
+# 8 lang gieng theo vong nguoc chieu kim dong ho, bat dau tu NE.
+# Mat na huong d cua Kirsch co he so 5 tai RING[d], RING[d+1], RING[d+2].
+RING = ((-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1))
+
+_S2 = np.sqrt(2.0)
+
+# So hang moi luot: giu cac bo dem tam trong cache
+_ROWS = 64
+
+
+def _neighbors(block, h, w):
+    # 8 view lang gieng (khong copy) va pixel tam cua vung 'valid' h x w
+    ring = [block[1 + dr:1 + dr + h, 1 + dc:1 + dc + w] for dr, dc in RING]
+    return ring, block[1:1 + h, 1:1 + w]
+
+
+def _kirsch_valid(dtype):
+    """
+    Kirsch: R_d = 5*S_d - 3*(T - S_d) = 8*S_d - 3*T, voi S_d la tong 3 lang gieng lien tiep
+    va T la tong ca 8 lang gieng. S_{d+1} = S_d + RING[d+3] - RING[d]: moi huong chi them 2 phep cong.
+    T khong doi theo huong nen max_d R_d = 8*max_d S_d - 3*T: chi can theo doi max cua S_d.
+    """
+
+    def valid(block, out):
+        best, direction = out
+        h, w = best.shape
+        ring, _ = _neighbors(block, h, w)
+
+        s = np.add(ring[0], ring[1], dtype=dtype)
+        s += ring[2]
+        np.copyto(best, s)
+        direction[...] = 0
+        for d in range(1, 8):
+            s += ring[(d + 2) % 8]
+            s -= ring[d - 1]
+            # So sanh chat: hoa thi giu huong dau tien (giong np.argmax tren 8 mat na)
+            np.copyto(direction, d, where=s > best)
+            np.maximum(best, s, out=best)
+
+        # s quay lai S_0 sau 8 buoc; dung lai lam bo dem cho T
+        s[...] = 0
+        for n in ring:
+            s += n
+        best *= 8
+        best -= 3 * s
+
+    return valid
+
+
+def _robinson_valid(dtype):
+    """
+    Robinson (Sobel xoay 8 huong): R_d = D_d + 2*D_{d+1} + D_{d+2} voi D_k = RING[k] - RING[k+4].
+    Vi D_{k+4} = -D_k nen R_{d+4} = -R_d: chi tinh 4 dap ung, 4 huong con lai la doi dau.
+    """
+
+    def valid(block, out):
+        best, direction = out
+        h, w = best.shape
+        ring, _ = _neighbors(block, h, w)
+
+        D = [np.subtract(ring[k], ring[k + 4], dtype=dtype) for k in range(4)]
+        D += [-x for x in D]
+
+        R = []
+        for k in range(4):
+            r = D[k] + 2 * D[k + 1]
+            r += D[k + 2]
+            R.append(r)
+
+        np.copyto(best, R[0])
+        direction[...] = 0
+        for d in range(1, 8):
+            resp = R[d] if d < 4 else np.negative(R[d - 4])
+            np.copyto(direction, d, where=resp > best)
+            np.maximum(best, resp, out=best)
+
+    return valid
+
+
+def _frei_chen_valid(dtype):
+    """
+    Frei-Chen: chieu cua so 3x3 len 4 mat na co so 'canh' (truc chuan).
+    Dap ung = sqrt(M / S), M = tong binh phuong 4 hinh chieu canh, S = tong binh phuong 9 pixel
+    (bang tong binh phuong tren ca 9 mat na do co so truc chuan). Huong = mat na canh co |hinh chieu| lon nhat.
+    """
+
+    def valid(block, out):
+        best, direction = out
+        h, w = best.shape
+        ring, center = _neighbors(block, h, w)
+        ne, n, nw, w_, sw, s, se, e = [x.astype(dtype) for x in ring]
+        c = 1.0 / (2 * _S2)
+
+        g = [
+            c * ((nw + _S2 * n + ne) - (sw + _S2 * s + se)),
+            c * ((nw + _S2 * w_ + sw) - (ne + _S2 * e + se)),
+            c * ((_S2 * ne + w_ + s) - (n + e + _S2 * sw)),
+            c * ((_S2 * nw + e + s) - (n + w_ + _S2 * se)),
+        ]
+
+        m = np.zeros((h, w), dtype=dtype)
+        total = np.square(center, dtype=dtype)
+        for x in (ne, n, nw, w_, sw, s, se, e):
+            total += x * x
+
+        best[...] = 0
+        direction[...] = 0
+        for k, gk in enumerate(g):
+            m += gk * gk
+            mag = np.abs(gk)
+            np.copyto(direction, k, where=mag > best)
+            np.maximum(best, mag, out=best)
+
+        # best <- sqrt(M / S), 0 khi cua so toan 0
+        np.divide(m, total, out=best, where=total > 0)
+        best[total == 0] = 0
+        np.sqrt(best, out=best)
+
+    return valid
+
+
+_ENGINES = {
+    'kirsch': _kirsch_valid,
+    'robinson': _robinson_valid,
+    'frei_chen': _frei_chen_valid,
+}
+
+
+def compass(image, operator='kirsch', mode='constant'):
+    """
+    Toan tu la ban 3x3 tinh trong mot luot: tra ve (dap ung lon nhat, chi so huong thang).
+    - operator: 'kirsch', 'robinson' (huong theo DIRECTIONS) hoac 'frei_chen'
+      (dap ung cos = sqrt(M/S) trong [0, 1], huong 0..3 la mat na canh G1..G4).
+    - mode: xu ly bien (xem features.border); 'constant' = padding 0 nhu my_convolution.
+    Kirsch, Robinson tren anh nguyen tinh chinh xac bang so nguyen (int16 cho uint8, du cho
+    |8*S - 3*T| <= 6120); Frei-Chen luon float64.
+    """
+    if operator not in _ENGINES:
+        raise ValueError(f"Unknown operator {operator}")
+
+    if operator == 'frei_chen' or not np.issubdtype(image.dtype, np.integer):
+        dtype = np.dtype(float)
+    elif image.dtype == np.uint8:
+        dtype = np.dtype(np.int16)
+    else:
+        dtype = np.dtype(np.int32)
+
+    valid = _ENGINES[operator](dtype)
+
+    def chunked(block, out):
+        best, direction = out
+        for r0 in range(0, best.shape[0], _ROWS):
+            r1 = min(r0 + _ROWS, best.shape[0])
+            valid(block[r0:r1 + 2], (best[r0:r1], direction[r0:r1]))
+
+    H, W = image.shape
+    best = np.empty((H, W), dtype=dtype)
+    direction = np.empty((H, W), dtype=np.uint8)
+    border.filter_same(image, chunked, border.kernel_margins(3, 3), mode, out=(best, direction))
+    return best, direction
@@ -1,5 +1,23 @@
 import numpy as np
 
+from features import border, kernel_cache
+
+# He so cua mo hinh chi phi chon spatial / FFT trong my_convolution(method='auto').
+# Don vi: chi phi 1 "don vi FFT" (P*Q*log2(P*Q)) so voi 1 phep nhan-cong spatial.
+# Do lai tren tung may bang: python -m benchmarks.bench_fft_crossover
+FFT_COST_FACTOR = 0.84
+# Luot 1-D cua duong tach duoc: chi phi moi phep nhan-cong (so voi duong 2-D) va chi phi co dinh
+# moi pixel cua moi luot (doc/ghi anh trung gian), cung do bang bench_fft_crossover
+SEPARABLE_COST_FACTOR = 0.86
+SEPARABLE_PASS_COST = 1.0
+# Anh nguyen qua duong FFT: ket qua cach so nguyen gan nhat trong FFT_SNAP_RTOL * (bien do lon nhat)
+# duoc coi la so nguyen (sai so lam tron FFT), de khop voi duong spatial sau khi cat ve uint8
+FFT_SNAP_RTOL = 1e-9
+# Kernel nho hon dien tich nay luon chay spatial
+FFT_MIN_KERNEL_AREA = 25
+# So hang moi khoi cua saturate_convolution (bo dem tich luy nho, nam trong cache)
+SATURATE_ROWS = 64
+
 def get_sample_matrices():
     I = np.array([
         [10, 10, 10, 0, 0],
@@ -32,36 +50,440 @@ def convolve_step(image, kernel):
             
     return output
 
-def my_convolution(image, kernel):
-    # 1. Lay kich thuoc anh va kernel
+def _correlate_valid(block, kernel, out):
+    """
+    Tich chap (dang tuong quan, khong lat kernel) 'valid' bang cach cong don cac lat cat dich chuyen.
+    Moi he so kernel[a, b] nhan voi ca anh con block[a:a+H, b:b+W] mot lan,
+    thay vi lay vung k x k cho tung pixel. Ket qua ghi thang vao out (H x W, hoac H x W x C
+    voi anh nhieu kenh: kernel ap dung cho tung kenh).
+    Thu tu cong khac np.sum(region * kernel) cua my_convolution_loop: chi trung tung bit voi anh va
+    kernel nguyen (tong nguyen chinh xac); voi so thuc chi sai khac lam tron (~1e-12 tuong doi
+    voi float64, ~1e-7 voi float32).
+    """
+    H, W = out.shape[:2]
+    kh, kw = kernel.shape
+
+    out[...] = 0
+    tmp = np.empty(out.shape, dtype=out.dtype)
+    coeffs = np.asarray(kernel, dtype=out.dtype)
+
+    for a in range(kh):
+        for b in range(kw):
+            c = coeffs[a, b]
+            if c == 0:
+                continue
+            # block[a:a+H, b:b+W] la view, khong copy
+            np.multiply(block[a:a+H, b:b+W], c, out=tmp)
+            np.add(out, tmp, out=out)
+
+    return out
+
+def _correlate_same(image, kernel, acc_dtype, mode='constant'):
+    """Tuong quan 'same' qua lop bien ao (mac dinh padding 0): khong tao ban pad cua ca anh."""
+    kh, kw = kernel.shape
+    return border.filter_same(image, lambda block, out: _correlate_valid(block, kernel, out),
+                              border.kernel_margins(kh, kw), mode, out_dtype=acc_dtype)
+
+def _acc_dtype(image_dtype, *kernel_dtypes):
+    # Kieu tich luy giong np.sum(region * kernel); anh uint8 voi kernel nguyen cong thang
+    # bang float64 (chinh xac toi 2^53) de khoi phai doi kieu ca mang ket qua
+    acc = np.result_type(image_dtype, *kernel_dtypes)
+    if image_dtype == np.uint8 and np.issubdtype(acc, np.integer):
+        acc = np.dtype(float)
+    return acc
+
+def separate_kernel(kernel, rtol=1e-9):
+    """
+    Tach kernel hang 1 (rank-1) thanh tich ngoai: kernel = outer(col, row).
+    Voi kernel so nguyen, chi chap nhan khi col va row deu nguyen (giu ket qua chinh xac).
+    Tra ve (col, row) hoac None neu kernel khong tach duoc.
+    """
+    kernel = np.asarray(kernel)
+    if kernel.ndim != 2 or not np.any(kernel):
+        return None
+
+    is_int = np.issubdtype(kernel.dtype, np.integer)
+
+    # Cot co tri tuyet doi lon nhat lam vector cot
+    j0 = int(np.argmax(np.abs(kernel).max(axis=0)))
+    col = kernel[:, j0]
+    if is_int:
+        g = np.gcd.reduce(col)
+        col = col // g
+    i0 = int(np.argmax(np.abs(col)))
+    row = kernel[i0, :] / col[i0]
+
+    if is_int:
+        if not np.all(np.mod(row, 1) == 0):
+            return None
+        row = row.astype(kernel.dtype)
+        if not np.array_equal(np.outer(col, row), kernel):
+            return None
+    else:
+        col = col.astype(float)
+        scale = np.abs(kernel).max()
+        if not np.allclose(np.outer(col, row), kernel, rtol=0, atol=rtol * scale):
+            return None
+
+    return col, row
+
+def prepared_factors(kernel):
+    """separate_kernel co cache theo noi dung kernel."""
+    return kernel_cache.prepare('separable', kernel, lambda: separate_kernel(kernel))
+
+def prepared_fixed_point(kernel):
+    """fixed_point_kernel co cache theo noi dung kernel."""
+    return kernel_cache.prepare('fixed_point', kernel, lambda: fixed_point_kernel(kernel))
+
+def _use_separable(kernel, factors):
+    # Chi dung 2 luot 1-D khi so phep nhan-cong that su giam (bo qua he so 0)
+    col, row = factors
+    return np.count_nonzero(col) + np.count_nonzero(row) < np.count_nonzero(kernel)
+
+def correlate_1d(image, kernel, axis, mode='constant', out=None):
+    """
+    1 luot tuong quan 1-D 'same' theo truc axis (0: doc theo cot, 1: ngang theo hang).
+    out: mang ket qua cho san (vd bo dem theo khoi hang, dung lai giua cac khoi); None thi tao moi.
+    Luot ngang (axis=1) khong can hang lan can nen co the chay rieng tung khoi hang.
+    """
+    kernel = np.asarray(kernel)
+    k2 = kernel.reshape(-1, 1) if axis == 0 else kernel.reshape(1, -1)
+    acc_dtype = out.dtype if out is not None else _acc_dtype(image.dtype, kernel.dtype)
+    return border.filter_same(image, lambda block, o: _correlate_valid(block, k2, o),
+                              border.kernel_margins(*k2.shape), mode, out_dtype=acc_dtype, out=out)
+
+def convolve_separable(image, col, row, mode='constant'):
+    """
+    Tich chap voi kernel tach duoc outer(col, row): 1 luot doc theo cot roi 1 luot ngang theo hang.
+    Padding 0 va kich thuoc ket qua giong my_convolution(image, np.outer(col, row)).
+    mode: cach xu ly bien (xem features.border); pad theo tung truc nen 2 luot van chinh xac.
+    """
+    col = np.asarray(col)
+    row = np.asarray(row)
+
+    dtype = image.dtype
+    if dtype == np.uint8:
+        dtype = float
+
+    acc_dtype = _acc_dtype(image.dtype, col.dtype, row.dtype)
+    # Padding 0 cua anh trung gian dung bang luot doc tren cot 0 -> ghep 2 luot 'same' la chinh xac
+    # (reflect/edge/wrap cung vay: pad 2D cua cac mode nay la pad lan luot theo hang roi theo cot)
+    tmp = _correlate_same(image, col.reshape(-1, 1), acc_dtype, mode)
+    acc = _correlate_same(tmp, row.reshape(1, -1), acc_dtype, mode)
+
+    return acc.astype(dtype, copy=False)
+
+def _next_fast_len(n):
+    """So nho nhat >= n chi co uoc nguyen to 2, 3, 5 (kich thuoc FFT nhanh)."""
+    best = None
+    p5 = 1
+    while p5 < 2 * n:
+        p35 = p5
+        while p35 < 2 * n:
+            p = p35
+            while p < n:
+                p *= 2
+            if best is None or p < best:
+                best = p
+            p35 *= 3
+        p5 *= 5
+    return best
+
+def fft_convolution(image, kernel, padding='zero'):
+    """
+    Tich chap bang FFT, ket qua "same" (cung kich thuoc anh), cung quy uoc voi my_convolution
+    (tuong quan, khong lat kernel). padding: 'zero' hoac 'reflect'.
+    Anh va kernel deu nguyen thi ket qua duoc lam tron ve so nguyen (chinh xac nhu spatial);
+    anh nguyen voi kernel thuc: gia tri chi lech so nguyen do sai so FFT (vd 199.99999...) duoc
+    lam tron, tranh bi cat thanh 199 khi doi ve uint8.
+    """
+    kernel = np.asarray(kernel)
+    H, W = image.shape
+    kh, kw = kernel.shape
+    pad_h, pad_w = kh // 2, kw // 2
+
+    if padding == 'zero':
+        padded_image = np.pad(image, ((pad_h, pad_h), (pad_w, pad_w)), mode='constant', constant_values=0)
+    elif padding == 'reflect':
+        padded_image = np.pad(image, ((pad_h, pad_h), (pad_w, pad_w)), mode='reflect')
+    else:
+        raise ValueError(f"Unknown padding {padding}")
+
+    # Kich thuoc FFT >= anh da pad la du: phan bi chong lap vong chi roi vao vung bi cat bo
+    Ph, Pw = padded_image.shape
+    L1, L2 = _next_fast_len(Ph), _next_fast_len(Pw)
+
+    # Tuong quan = tich chap voi kernel lat 180 do
+    F_img = np.fft.rfft2(padded_image, s=(L1, L2))
+    F_ker = kernel_cache.prepare('fft_spectrum', kernel, lambda: np.fft.rfft2(kernel[::-1, ::-1], s=(L1, L2)),
+                                 shape=(L1, L2))
+    full = np.fft.irfft2(F_img * F_ker, s=(L1, L2))
+
+    acc = full[kh - 1:kh - 1 + H, kw - 1:kw - 1 + W]
+
+    dtype = image.dtype
+    if dtype == np.uint8:
+        dtype = float
+
+    if np.issubdtype(image.dtype, np.integer):
+        snapped = np.rint(acc)
+        if np.issubdtype(kernel.dtype, np.integer):
+            acc = snapped
+        else:
+            bound = float(np.abs(image).max(initial=0)) * float(np.abs(kernel).sum())
+            tol = FFT_SNAP_RTOL * max(1.0, bound)
+            acc = np.where(np.abs(acc - snapped) <= tol, snapped, acc)
+
+    return acc.astype(dtype)
+
+def separable_cost(image_shape, col_taps, row_taps):
+    """Chi phi 2 luot 1-D (col_taps he so doc, row_taps he so ngang), cung don vi voi method_costs."""
+    H, W = image_shape[:2]
+    return SEPARABLE_COST_FACTOR * H * W * (col_taps + row_taps) + 2 * SEPARABLE_PASS_COST * H * W
+
+def method_costs(image_shape, kernel, factors=None):
+    """
+    Mo hinh chi phi (don vi: 1 phep nhan-cong cua duong 2-D): spatial ~ H*W*(so he so khac 0),
+    tach duoc ~ SEPARABLE_COST_FACTOR * (so phep nhan-cong 2 luot) + SEPARABLE_PASS_COST * H*W
+    moi luot, FFT ~ FFT_COST_FACTOR * P*Q*log2(P*Q). Tra ve dict {'spatial': ..., 'fft': ...}.
+    """
+    H, W = image_shape
+    kh, kw = kernel.shape
+
+    if factors is not None and _use_separable(kernel, factors):
+        col, row = factors
+        spatial = separable_cost(image_shape, np.count_nonzero(col), np.count_nonzero(row))
+    else:
+        spatial = H * W * np.count_nonzero(kernel)
+
+    P = _next_fast_len(H + 2 * (kh // 2))
+    Q = _next_fast_len(W + 2 * (kw // 2))
+    fft = FFT_COST_FACTOR * P * Q * np.log2(P * Q)
+
+    return {'spatial': spatial, 'fft': fft}
+
+def choose_method(image_shape, kernel, factors=None):
+    """Tra ve 'spatial' hoac 'fft' theo method_costs (kernel nho luon spatial)."""
+    kh, kw = kernel.shape
+    if kh * kw < FFT_MIN_KERNEL_AREA:
+        return 'spatial'
+
+    costs = method_costs(image_shape, kernel, factors)
+    return 'fft' if costs['fft'] < costs['spatial'] else 'spatial'
+
+def my_convolution(image, kernel, separable=None, method='auto'):
+    """
+    Tich chap padding 0, ket qua cung kich thuoc anh.
+    separable: None = tu dong dung 2 luot 1-D neu kernel hang 1 va re hon,
+               True = bat buoc tach (loi neu kernel khong tach duoc),
+               False = luon dung duong 2-D (de doi chieu ket qua).
+    method: 'auto' (chon theo mo hinh chi phi), 'spatial' hoac 'fft'.
+    """
+    kernel = np.asarray(kernel)
+
+    factors = None
+    if separable is not False:
+        factors = prepared_factors(kernel)
+        if factors is None and separable:
+            raise ValueError("Kernel khong tach duoc (khong phai hang 1)")
+
+    if method == 'auto':
+        method = 'spatial' if separable else choose_method(image.shape, kernel, factors)
+    if method == 'fft':
+        return fft_convolution(image, kernel)
+    if method != 'spatial':
+        raise ValueError(f"Unknown method {method}")
+
+    if factors is not None and (separable or _use_separable(kernel, factors)):
+        return convolve_separable(image, *factors)
+
+    dtype = image.dtype
+    if dtype == np.uint8:
+        dtype = float
+
+    # Cong don theo tung he so kernel (vector hoa); bien 0 xu ly bang lop bien ao (border)
+    acc_dtype = _acc_dtype(image.dtype, kernel.dtype)
+    acc = _correlate_same(image, kernel, acc_dtype)
+
+    return acc.astype(dtype, copy=False)
+
+def fixed_point_kernel(kernel, max_shift=16):
+    """
+    Bieu dien kernel duoi dang so nguyen: kernel = kernel_int / 2^shift.
+    Kernel nguyen -> shift = 0; vd Gaussian [[1,2,1],[2,4,2],[1,2,1]]/16 -> shift = 4.
+    Tra ve (kernel_int, shift) hoac None neu khong bieu dien duoc.
+    """
+    kernel = np.asarray(kernel)
+    if np.issubdtype(kernel.dtype, np.integer):
+        return kernel.astype(np.int64), 0
+
+    for shift in range(max_shift + 1):
+        scaled = kernel * float(1 << shift)
+        if np.all(scaled == np.round(scaled)):
+            return scaled.astype(np.int64), shift
+    return None
+
+def _int_acc_dtype(bound):
+    # Kieu tich luy nho nhat chua duoc |gia tri| <= bound
+    for dt in (np.int16, np.int32):
+        if bound <= np.iinfo(dt).max:
+            return dt
+    return np.int64
+
+def integer_convolution(image, kernel, rounding='floor'):
+    """
+    Tich chap padding 0 cho anh uint8 bang so nguyen (int16/int32 thay vi float64).
+    kernel: nguyen, hoac nguyen / 2^shift (kernel da chuan hoa) -> ket qua dich phai shift bit.
+    rounding (chi dung khi shift > 0): 'floor' (giong astype(uint8) sau khi chia voi gia tri >= 0)
+    hoac 'nearest'. Ket qua chinh xac, kieu int16 hoac int32.
+    """
+    if image.dtype != np.uint8:
+        raise ValueError("integer_convolution chi ho tro anh uint8")
+    fixed = prepared_fixed_point(kernel)
+    if fixed is None:
+        raise ValueError("Kernel khong phai so nguyen / 2^k")
+    k_int, shift = fixed
+
+    bound = 255 * int(np.abs(k_int).sum()) + (1 << shift)
+    acc_dtype = _int_acc_dtype(bound)
+
+    factors = prepared_factors(k_int)
+    if factors is not None and _use_separable(k_int, factors):
+        col, row = factors
+        tmp = _correlate_same(image, col.reshape(-1, 1), acc_dtype)
+        acc = _correlate_same(tmp, row.reshape(1, -1), acc_dtype)
+    else:
+        acc = _correlate_same(image, k_int, acc_dtype)
+
+    if shift:
+        if rounding == 'nearest':
+            acc += 1 << (shift - 1)
+        elif rounding != 'floor':
+            raise ValueError(f"Unknown rounding {rounding}")
+        np.right_shift(acc, shift, out=acc)
+
+    return acc
+
+def saturate_convolution(image, kernel, out=None, rounding='floor'):
+    """
+    Tich chap padding 0 ghi thang vao mang uint8 (cat 0..255) theo khoi hang: chi giu bo dem
+    tich luy vai chuc hang, khong tao ket qua trung gian ca anh. out: mang uint8 cho san (tuy chon).
+    Anh uint8 voi kernel nguyen / 2^k tich luy so nguyen (chinh xac), con lai float64.
+    Anh nhieu kenh (H, W, C) duoc xu ly trong cung 1 luot.
+    rounding: 'floor' (giong clip(...).astype(uint8)) hoac 'nearest'.
+    """
+    if rounding not in ('floor', 'nearest'):
+        raise ValueError(f"Unknown rounding {rounding}")
+    kernel = np.asarray(kernel)
+    kh, kw = kernel.shape
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+
+    fixed = prepared_fixed_point(kernel) if image.dtype == np.uint8 else None
+    if fixed is not None:
+        coeffs, shift = fixed
+        acc_dtype = np.dtype(_int_acc_dtype(255 * int(np.abs(coeffs).sum()) + (1 << shift)))
+    else:
+        coeffs, shift = kernel, 0
+        acc_dtype = np.dtype(float)
+
+    def valid(block, dst):
+        for r0 in range(0, dst.shape[0], SATURATE_ROWS):
+            r1 = min(r0 + SATURATE_ROWS, dst.shape[0])
+            acc = np.empty(dst[r0:r1].shape, dtype=acc_dtype)
+            _correlate_valid(block[r0:r1 + kh - 1], coeffs, acc)
+            if shift:
+                if rounding == 'nearest':
+                    acc += 1 << (shift - 1)
+                np.right_shift(acc, shift, out=acc)
+            elif rounding == 'nearest' and acc_dtype.kind == 'f':
+                np.rint(acc, out=acc)
+            np.clip(acc, 0, 255, out=acc)
+            dst[r0:r1] = acc
+
+    return border.filter_same(image, valid, border.kernel_margins(kh, kw), 'constant', out=out)
+
+def filter_bank(image, kernels, reduce=None):
+    """
+    Ap nhieu kernel (cung kich thuoc) len anh trong mot luot, padding 0 nhu my_convolution.
+    Moi dai hang chi trich vung lan can mot lan (ma tran patch) roi nhan voi ma tran kernel.
+    reduce:
+        None     -> mang (N, H, W) gom tat ca dap ung,
+        'max'    -> dap ung lon nhat (H, W),
+        'argmax' -> (max, chi so kernel thang),
+        'sumsq'  -> tong binh phuong cac dap ung (H, W).
+    Voi reduce khac None, khong luc nao giu du N mat phang kich thuoc anh trong bo nho.
+    """
+    kernels = np.asarray(kernels)
+    N, kh, kw = kernels.shape
+    H, W = image.shape
+    top, bottom, left, right = border.kernel_margins(kh, kw)
+
+    dtype = image.dtype
+    if dtype == np.uint8:
+        dtype = float
+    if reduce == 'sumsq':
+        dtype = np.result_type(dtype, float)
+
+    # Tinh bang float64 (BLAS); so nguyen van chinh xac trong pham vi 2^53
+    K = kernel_cache.prepare('bank_matrix', kernels, lambda: kernels.reshape(N, kh * kw).T.astype(float))
+
+    if reduce is None:
+        out = np.empty((N, H, W), dtype=dtype)
+    elif reduce in ('max', 'sumsq', 'argmax'):
+        out = np.empty((H, W), dtype=dtype)
+        if reduce == 'argmax':
+            idx = np.empty((H, W), dtype=np.intp)
+    else:
+        raise ValueError(f"Unknown reduce {reduce}")
+
+    # So hang moi dai: gioi han bo nho tam (hang * W * (kh*kw + N)) khoang 2^21 phan tu
+    rows = max(1, (1 << 21) // max(1, W * (kh * kw + N)))
+
+    for r0 in range(0, H, rows):
+        r1 = min(r0 + rows, H)
+        # Dai hang co vien doc qua lop bien ao (chi copy dai nay, khong pad ca anh)
+        block = border.read_window(image, r0 - top, r1 + bottom, -left, W + right, 'constant')
+        patches = np.lib.stride_tricks.sliding_window_view(block, (kh, kw)).reshape(-1, kh * kw)
+        resp = patches.astype(float) @ K          # ((r1 - r0) * W, N)
+
+        if reduce is None:
+            out[:, r0:r1] = resp.T.reshape(N, r1 - r0, W)
+        elif reduce == 'max':
+            out[r0:r1] = resp.max(axis=1).reshape(r1 - r0, W)
+        elif reduce == 'argmax':
+            best = resp.argmax(axis=1)
+            idx[r0:r1] = best.reshape(r1 - r0, W)
+            out[r0:r1] = resp[np.arange(len(best)), best].reshape(r1 - r0, W)
+        else:
+            out[r0:r1] = np.einsum('ij,ij->i', resp, resp).reshape(r1 - r0, W)
+
+    if reduce == 'argmax':
+        return out, idx
+    return out
+
+def my_convolution_loop(image, kernel):
+    """
+    Ban cai dat 2 vong lap ban dau, giu lai de doi chieu va benchmark.
+    my_convolution cho ket qua giong tung bit voi anh/kernel nguyen; voi so thuc chi gan dung (sai so lam tron).
+    """
     H, W = image.shape
     k = kernel.shape[0] # Gia su kernel vuong k x k
-    
-    # 2. Tao anh dem (padding) voi so 0
+
     pad = k // 2
     padded_image = np.pad(image, ((pad, pad), (pad, pad)), mode='constant', constant_values=0)
-    
+
     dtype = image.dtype
     if dtype == np.uint8:
         dtype = float
-    
+
     result = np.zeros((H, W), dtype=dtype)
-    
-    # 3. Hai vong lap for de truot kernel
+
     for i in range(H):
         for j in range(W):
-            # 4. Lay vung anh tuong ung va nhan tich chap
-            # Vung anh se duoc lay tu padded_image
-            # a[i, j] tuong ung voi padded_image[i+pad, j+pad]
-            # Vung lan can k x k se la:
             region = padded_image[i:i+k, j:j+k]
-            
-            # Tinh tong sau khi nhan element-wise
-            val = np.sum(region * kernel)
-            
-            result[i, j] = val
-            
-    # 5. Tra ve ket qua
+            result[i, j] = np.sum(region * kernel)
+
     return result
 
 def manual_verification(image, kernel, center_x=2, center_y=2):
@@ -1,82 +1,229 @@
+from collections import OrderedDict
+
 import numpy as np
-from features import convolution
+from features import compass, gradient
 
-def apply_sobel(image, threshold=None):
-    # Sobel kernels
-    Gx = np.array([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]])
-    Gy = np.array([[-1, -2, -1], [0, 0, 0], [1, 2, 1]])
-    
-    # Calculate derivatives using my_convolution
-    Ix = convolution.my_convolution(image, Gx)
-    Iy = convolution.my_convolution(image, Gy)
-    
-    # Combine (Gradient magnitude)
-    magnitude = np.sqrt(Ix**2 + Iy**2)
-    
-    # Apply Threshold if provided
+def _const(rows):
+    k = np.array(rows)
+    k.flags.writeable = False
+    return k
+
+# Kernels are built once at import time and shared (read-only) between calls.
+# Gradient kernels are owned by features.gradient (the fused operator derives its weights from them)
+SOBEL_X, SOBEL_Y = gradient.SOBEL_X, gradient.SOBEL_Y
+PREWITT_X, PREWITT_Y = gradient.PREWITT_X, gradient.PREWITT_Y
+ROBERTS_X, ROBERTS_Y = gradient.ROBERTS_X, gradient.ROBERTS_Y
+# 8 Kirsch kernels
+KIRSCH = _const([
+    [[5, 5, 5], [-3, 0, -3], [-3, -3, -3]],   # North
+    [[5, 5, -3], [5, 0, -3], [-3, -3, -3]],   # North West
+    [[5, -3, -3], [5, 0, -3], [5, -3, -3]],   # West
+    [[-3, -3, -3], [5, 0, -3], [5, 5, -3]],   # South West
+    [[-3, -3, -3], [-3, 0, -3], [5, 5, 5]],   # South
+    [[-3, -3, -3], [-3, 0, 5], [-3, 5, 5]],   # South East
+    [[-3, -3, 5], [-3, 0, 5], [-3, -3, 5]],   # East
+    [[-3, 5, 5], [-3, 0, 5], [-3, -3, -3]]    # North East
+])
+
+def _sobel_magnitude(image):
+    # Sobel (SOBEL_X, SOBEL_Y) via the fused gradient operator: Ix, Iy and magnitude in float32 buffers
+    return gradient.gradient(image, ('magnitude',), 'sobel')['magnitude']
+
+def _prewitt_magnitude(image):
+    # Prewitt kernels (PREWITT_X, PREWITT_Y)
+    return gradient.gradient(image, ('magnitude',), 'prewitt')['magnitude']
+
+def _roberts_magnitude(image):
+    # Robert kernels (2x2: ROBERTS_X, ROBERTS_Y)
+    return gradient.gradient(image, ('magnitude',), 'roberts')['magnitude']
+
+def _kirsch_magnitude(image):
+    # Max response across the 8 KIRSCH directions in one incremental pass (features.compass)
+    return compass.compass(image, 'kirsch')[0]
+
+# Unthresholded magnitude map of each operator
+MAGNITUDE_FUNCS = {
+    'sobel': _sobel_magnitude,
+    'prewitt': _prewitt_magnitude,
+    'roberts': _roberts_magnitude,
+    'kirsch': _kirsch_magnitude,
+}
+
+def render_threshold(magnitude, threshold=None, out=None):
+    # Magnitude -> uint8 edge map: 255 where magnitude > threshold (a single compare),
+    # or the magnitude clipped to 0..255 without threshold. `out` reuses a uint8 buffer.
+    if out is None:
+        out = np.empty(magnitude.shape, dtype=np.uint8)
     if threshold is not None:
-        result = np.where(magnitude > threshold, 255, 0).astype(np.uint8)
+        np.greater(magnitude, threshold, out=out.view(bool))
+        out *= 255
     else:
-        # Normalize to 0-255
-        result = np.clip(magnitude, 0, 255).astype(np.uint8)
-        
-    return result
+        np.copyto(out, np.clip(magnitude, 0, 255), casting='unsafe')
+    return out
+
+def apply_sobel(image, threshold=None):
+    return render_threshold(_sobel_magnitude(image), threshold)
 
 def apply_prewitt(image, threshold=None):
-    # Prewitt kernels
-    Gx = np.array([[-1, 0, 1], [-1, 0, 1], [-1, 0, 1]])
-    Gy = np.array([[-1, -1, -1], [0, 0, 0], [1, 1, 1]])
-    
-    Ix = convolution.my_convolution(image, Gx)
-    Iy = convolution.my_convolution(image, Gy)
-    
-    magnitude = np.sqrt(Ix**2 + Iy**2)
-    
-    if threshold is not None:
-        result = np.where(magnitude > threshold, 255, 0).astype(np.uint8)
-    else:
-        result = np.clip(magnitude, 0, 255).astype(np.uint8)
-    return result
+    return render_threshold(_prewitt_magnitude(image), threshold)
 
 def apply_roberts(image, threshold=None):
-    # Robert kernels (2x2)
-    Gx = np.array([[1, 0], [0, -1]])
-    Gy = np.array([[0, 1], [-1, 0]])
-    
-    Ix = convolution.my_convolution(image, Gx)
-    Iy = convolution.my_convolution(image, Gy)
-    
-    magnitude = np.sqrt(Ix**2 + Iy**2)
-    
-    if threshold is not None:
-        result = np.where(magnitude > threshold, 255, 0).astype(np.uint8)
-    else:
-        result = np.clip(magnitude, 0, 255).astype(np.uint8)
-    return result
+    return render_threshold(_roberts_magnitude(image), threshold)
 
 def apply_kirsch(image, threshold=None):
-    # 8 Kirsh kernels
-    kernels = [
-        np.array([[5, 5, 5], [-3, 0, -3], [-3, -3, -3]]),   # North
-        np.array([[5, 5, -3], [5, 0, -3], [-3, -3, -3]]),   # North West
-        np.array([[5, -3, -3], [5, 0, -3], [5, -3, -3]]),   # West
-        np.array([[-3, -3, -3], [5, 0, -3], [5, 5, -3]]),   # South West
-        np.array([[-3, -3, -3], [-3, 0, -3], [5, 5, 5]]),   # South
-        np.array([[-3, -3, -3], [-3, 0, 5], [-3, 5, 5]]),   # South East
-        np.array([[-3, -3, 5], [-3, 0, 5], [-3, -3, 5]]),   # East
-        np.array([[-3, 5, 5], [-3, 0, 5], [-3, -3, -3]])    # North East
-    ]
-    
-    results = []
-    for k in kernels:
-        res = convolution.my_convolution(image, k)
-        results.append(res)
-        
-    # Take max response across all directions
-    max_response = np.max(np.stack(results), axis=0)
-    
-    if threshold is not None:
-        result = np.where(max_response > threshold, 255, 0).astype(np.uint8)
-    else:
-        result = np.clip(max_response, 0, 255).astype(np.uint8)
-    return result
+    return render_threshold(_kirsch_magnitude(image), threshold)
+
+# Magnitude cache for interactive thresholding, keyed by (operator, image object).
+# The image itself is kept in the entry so its id cannot be reused while cached;
+# an image modified in place must be dropped with clear_magnitude_cache().
+MAX_CACHED_MAGNITUDES = 8
+_magnitude_cache = OrderedDict()
+
+def edge_magnitude(image, operator='sobel'):
+    # Cached unthresholded magnitude (read-only) of `image` for `operator`
+    if operator not in MAGNITUDE_FUNCS:
+        raise ValueError(f"Unknown operator {operator}")
+    key = (operator, id(image))
+    entry = _magnitude_cache.get(key)
+    if entry is not None and entry[0] is image:
+        _magnitude_cache.move_to_end(key)
+        return entry[1]
+
+    magnitude = MAGNITUDE_FUNCS[operator](image)
+    magnitude.flags.writeable = False
+    _magnitude_cache[key] = (image, magnitude)
+    while len(_magnitude_cache) > MAX_CACHED_MAGNITUDES:
+        _magnitude_cache.popitem(last=False)
+    return magnitude
+
+def clear_magnitude_cache():
+    _magnitude_cache.clear()
+
+def reduce_magnitude(magnitude, size):
+    # Magnitude shrunk to display size = (W, H) by the max of each block, so a 1-pixel edge
+    # still passes the threshold in a preview (averaging first would wash thin edges out).
+    # Thresholding this small map is what keeps a live threshold slider cheap.
+    H, W = magnitude.shape
+    rows = np.arange(size[1]) * H // size[1]
+    cols = np.arange(size[0]) * W // size[0]
+    return np.maximum.reduceat(np.maximum.reduceat(magnitude, rows, axis=0), cols, axis=1)
+
+# tan(22.5 deg): bins the gradient direction into 4 orientations without arctan
+_TAN_22_5 = np.tan(np.pi / 8)
+# Rows per block in non-maximum suppression (keeps temporaries small on large frames)
+_NMS_ROWS = 256
+
+def _non_max_suppression(ix, iy, magnitude, low):
+    # Keep pixels that are a maximum along the quantized gradient direction (strict towards the
+    # left/upper neighbour so a plateau of two equal pixels yields a 1-pixel edge).
+    # Border pixels have no full neighbourhood and are suppressed.
+    H, W = magnitude.shape
+    keep = np.zeros((H, W), dtype=bool)
+    if H < 3 or W < 3:
+        return keep
+
+    for r0 in range(1, H - 1, _NMS_ROWS):
+        r1 = min(r0 + _NMS_ROWS, H - 1)
+        m = magnitude[r0:r1, 1:-1]
+        gx = ix[r0:r1, 1:-1]
+        gy = iy[r0:r1, 1:-1]
+        ax, ay = np.abs(gx), np.abs(gy)
+
+        horizontal = ay <= _TAN_22_5 * ax   # gradient along x: compare left/right
+        vertical = ax <= _TAN_22_5 * ay     # gradient along y: compare up/down
+        # Diagonal: y grows downwards, so same signs means down-right / up-left
+        down_right = (gx * gy) > 0
+
+        def shifted(dr, dc):
+            return magnitude[r0 + dr:r1 + dr, 1 + dc:W - 1 + dc]
+
+        n1 = np.where(horizontal, shifted(0, -1),
+             np.where(vertical, shifted(-1, 0),
+             np.where(down_right, shifted(-1, -1), shifted(-1, 1))))
+        n2 = np.where(horizontal, shifted(0, 1),
+             np.where(vertical, shifted(1, 0),
+             np.where(down_right, shifted(1, 1), shifted(1, -1))))
+
+        keep[r0:r1, 1:-1] = (m > low) & (m > n1) & (m >= n2)
+    return keep
+
+def _label_runs(mask):
+    # Horizontal runs of True pixels; 8-connected runs on consecutive rows are joined
+    # with a vectorized union-find. Returns (starts, ends, parent) in flat coordinates
+    # of the mask padded with one False column (so runs never wrap across rows).
+    H, W = mask.shape
+    stride = W + 1
+    flat = np.zeros((H, stride), dtype=np.int8)
+    flat[:, :W] = mask
+    d = np.diff(flat.ravel(), prepend=0)
+    starts = np.flatnonzero(d == 1)
+    ends = np.flatnonzero(d == -1)   # exclusive; always exists thanks to the False column
+    n = starts.size
+    parent = np.arange(n)
+    if n == 0:
+        return starts, ends, parent
+
+    # Run b on row r+1 touches run a on row r (8-connectivity) when
+    # s_a <= e_b and e_a >= s_b (e exclusive). Runs are sorted, so both bounds are searchsorted.
+    up_s = starts - stride           # run b's columns moved to the previous row
+    up_e = ends - stride
+    lo = np.searchsorted(ends, up_s, side='left')
+    hi = np.searchsorted(starts, up_e, side='right')
+    count = np.maximum(hi - lo, 0)
+    b = np.repeat(np.arange(n), count)
+    a = np.repeat(lo, count) + (np.arange(b.size) - np.repeat(np.cumsum(count) - count, count))
+
+    # Hook larger root onto smaller root, then compress fully; repeat until no edge spans two trees
+    while a.size:
+        ra, rb = parent[a], parent[b]
+        diff = ra != rb
+        if not diff.any():
+            break
+        a, b, ra, rb = a[diff], b[diff], ra[diff], rb[diff]
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+        while True:
+            p2 = parent[parent]
+            if np.array_equal(p2, parent):
+                break
+            parent = p2
+    return starts, ends, parent
+
+def _hysteresis(weak, strong):
+    # Keep weak components (8-connected) that contain at least one strong pixel
+    H, W = weak.shape
+    stride = W + 1
+    starts, ends, parent = _label_runs(weak)
+    if starts.size == 0:
+        return np.zeros((H, W), dtype=bool)
+
+    # Does each run contain a strong pixel? (OR over [start, end) of every run)
+    flat = np.zeros((H, stride), dtype=bool)
+    flat[:, :W] = strong
+    bounds = np.column_stack((starts, ends)).ravel()
+    run_strong = np.logical_or.reduceat(flat.ravel(), bounds)[::2]
+
+    root_strong = np.zeros(starts.size, dtype=bool)
+    root_strong[parent[run_strong]] = True
+    kept = root_strong[parent]
+
+    # Paint kept runs with +1/-1 markers and a running sum
+    result = np.zeros(H * stride + 1, dtype=np.int8)
+    result[starts[kept]] = 1
+    result[ends[kept]] = -1
+    np.cumsum(result, out=result)
+    return result[:-1].reshape(H, stride)[:, :W].astype(bool)
+
+def apply_canny(image, low_threshold=50, high_threshold=100):
+    # Canny: Gaussian smoothing -> Sobel -> non-maximum suppression -> hysteresis.
+    # Thresholds apply to the Sobel magnitude (same scale as apply_sobel).
+    from features import laplace_processing   # imports this module at load time
+
+    smooth = laplace_processing.apply_gaussian_smooth(image)
+    # Replicated border: zero padding would put a strong edge around the frame
+    g = gradient.gradient(smooth, ('ix', 'iy', 'magnitude'), 'sobel', mode='edge')
+    magnitude = g['magnitude']
+
+    weak = _non_max_suppression(g['ix'], g['iy'], magnitude, low_threshold)
+    strong = weak & (magnitude > high_threshold)
+    edges = _hysteresis(weak, strong)
+    return np.where(edges, 255, 0).astype(np.uint8)
@@ -0,0 +1,332 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Thua so lon nhat cua moi buoc Cooley-Tukey: moi buoc la 1 phep nhan ma tran DFT nho (BLAS)
+# voi ca khoi du lieu. Do lai bang: python -m benchmarks.bench_fft
+MAX_RADIX = 16
+
+# Thua so nguyen to lon hon MAX_RADIX nhung khong qua gia tri nay van nhan ma tran DFT truc tiep;
+# do dai co thua so nguyen to lon hon thi dung Bluestein (tich chap qua FFT do dai 2^k)
+MAX_DIRECT = 64
+
+# Gioi han cache ke hoach (ma tran DFT nho, twiddle, pho chirp Bluestein): so ke hoach va tong dung luong
+MAX_PLANS = 64
+MAX_PLAN_BYTES = 128 * 1024 * 1024
+
+_plans = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'bytes': 0}
+
+
+def _smallest_factor(n):
+    d = 2
+    while d * d <= n:
+        if n % d == 0:
+            return d
+        d += 1
+    return n
+
+
+def _radices(n):
+    """Cac thua so (lon truoc) cho FFT do dai n, hoac None neu can Bluestein."""
+    radices = []
+    while n > 1:
+        r = next((r for r in range(min(MAX_RADIX, n), 1, -1) if n % r == 0), None)
+        if r is None:
+            r = _smallest_factor(n)
+            if r > MAX_DIRECT:
+                return None
+        radices.append(r)
+        n //= r
+    return radices
+
+
+def _dft_matrix(n, sign, dtype):
+    # W[k, j] = exp(sign * 2 pi i * k * j / n); goc lay theo (k * j) mod n de giu do chinh xac
+    k = np.arange(n)
+    return np.exp(sign * 2j * np.pi * (np.outer(k, k) % n) / n).astype(dtype)
+
+
+def _work_dtype(x):
+    # float32/complex64 tinh bang complex64, con lai complex128
+    return np.dtype(np.complex64 if x.dtype in (np.float32, np.complex64) else np.complex128)
+
+
+def _plan_bytes(plan):
+    # Chi tinh mang cua chinh ke hoach (ke hoach con cua Bluestein la muc cache rieng)
+    if plan[0] == 'ct':
+        return sum(W.nbytes + twiddle.nbytes for _, _, W, twiddle in plan[2])
+    if plan[0] == 'real':
+        return plan[1].nbytes + plan[2].nbytes
+    return plan[3].nbytes + plan[4].nbytes
+
+
+def _lookup(key):
+    plan = _plans.get(key)
+    if plan is not None:
+        _plans.move_to_end(key)
+        _stats['hits'] += 1
+    else:
+        _stats['misses'] += 1
+    return plan
+
+
+def _store(key, plan):
+    # Them vao cache LRU (ke hoach qua lon thi chi dung 1 lan, khong giu)
+    size = _plan_bytes(plan)
+    if size > MAX_PLAN_BYTES:
+        return plan
+    _plans[key] = plan
+    _stats['bytes'] += size
+    while len(_plans) > MAX_PLANS or _stats['bytes'] > MAX_PLAN_BYTES:
+        _, old = _plans.popitem(last=False)
+        _stats['bytes'] -= _plan_bytes(old)
+    return plan
+
+
+def _build_plan(n, sign, dtype):
+    radices = _radices(n)
+    if radices is not None:
+        steps = []
+        m = n
+        for r in radices:
+            m //= r
+            k, j = np.arange(r)[:, None], np.arange(m)[None, :]
+            twiddle = np.exp(sign * 2j * np.pi * ((k * j) % (r * m)) / (r * m))[:, :, None].astype(dtype)
+            steps.append((r, m, _dft_matrix(r, sign, dtype), twiddle))
+        return ('ct', tuple(radices), steps)
+
+    L = 1 << (2 * n - 2).bit_length()
+    j = np.arange(n)
+    chirp = np.exp(sign * 1j * np.pi * ((j * j) % (2 * n)) / n)
+    b = np.zeros(L, dtype=complex)
+    b[:n] = np.conj(chirp)
+    b[L - n + 1:] = np.conj(chirp[1:])[::-1]
+    spectrum = _transform(b[None, :, None], _plan(L, -1))[0, :, 0]
+    return ('bluestein', n, L, chirp[:, None].astype(dtype), spectrum[:, None].astype(dtype),
+            _plan(L, -1, dtype), _plan(L, 1, dtype))
+
+
+def _plan(n, sign, dtype=np.complex128):
+    """
+    Ke hoach FFT do dai n theo chieu sign (-1 thuan, +1 nguoc) cho kieu dtype, lay tu cache
+    (khoa (n, chieu, dtype)) - lan bien doi sau cung kich thuoc khong tinh lai twiddle:
+    - ('ct', radices, steps): moi buoc (r, m, W_r, twiddle (r, m, 1));
+    - ('bluestein', n, L, chirp, pho chirp, ke hoach L thuan, ke hoach L nguoc).
+    Cache LRU gioi han theo MAX_PLANS va MAX_PLAN_BYTES; cac mang trong ke hoach chi doc.
+    """
+    dtype = np.dtype(dtype)
+    key = (n, 'forward' if sign < 0 else 'inverse', dtype.name)
+    plan = _lookup(key)
+    if plan is not None:
+        return plan
+
+    plan = _build_plan(n, sign, dtype)
+    for part in plan:
+        if isinstance(part, np.ndarray):
+            part.flags.writeable = False
+        elif isinstance(part, list):
+            for step in part:
+                step[2].flags.writeable = False
+                step[3].flags.writeable = False
+    return _store(key, plan)
+
+
+def cache_info():
+    """So lan trung/truot cache ke hoach, so ke hoach, dung luong dang giu va cac khoa (n, chieu, dtype)."""
+    return {
+        'hits': _stats['hits'],
+        'misses': _stats['misses'],
+        'entries': len(_plans),
+        'bytes': _stats['bytes'],
+        'keys': list(_plans),
+    }
+
+
+def clear_cache():
+    _plans.clear()
+    _stats.update(hits=0, misses=0, bytes=0)
+
+
+def _transform(x, plan, transpose=False):
+    """
+    DFT (khong chia n) theo truc giua cua x dang (B, n, K), moi buoc nhan ma tran tren ca khoi
+    (n, K) nen BLAS luon co chieu trong >= K. Ket qua (B, n, K), hoac (B, K, n) neu transpose
+    (chuyen vi gop luon vao buoc sap xep lai chi so, khong ton them ban sao).
+    """
+    B, n, K = x.shape
+    if plan[0] == 'bluestein':
+        _, n, L, chirp, spectrum, forward, backward = plan
+        a = np.zeros((B, L, K), dtype=chirp.dtype)
+        np.multiply(x, chirp, out=a[:, :n])
+        a = _transform(a, forward)
+        a *= spectrum
+        a = _transform(a, backward)[:, :n]
+        a *= chirp / L
+        return np.ascontiguousarray(a.transpose(0, 2, 1)) if transpose else a
+
+    _, radices, steps = plan
+    dtype = steps[0][2].dtype if steps else _work_dtype(x)
+    src = x
+    bufs = [np.empty(B * n * K, dtype=dtype), np.empty(B * n * K, dtype=dtype)]
+    for i, (r, m, W, twiddle) in enumerate(steps):
+        dst = bufs[i % 2].reshape(-1, r, m * K)
+        np.matmul(W, src.reshape(-1, r, m * K), out=dst)
+        if m > 1:
+            dst.reshape(-1, r, m, K)[...] *= twiddle
+        src = dst
+
+    # Sau cac buoc, chi so ra k = k1 + r1 * (k2 + r2 * (...)) nam o cac truc (r1, r2, ...):
+    # dao nguoc thu tu cac truc do de ve thu tu tu nhien
+    depth = len(radices)
+    digits = src.reshape((B,) + radices + (K,))
+    digits = digits.transpose((0,) + tuple(range(depth, 0, -1)) + (depth + 1,))
+    out = bufs[len(steps) % 2]
+    if transpose:
+        view = out.reshape((B, K) + radices[::-1])
+        np.copyto(view.transpose((0,) + tuple(range(2, depth + 2)) + (1,)), digits)
+        return out.reshape(B, K, n)
+    np.copyto(out.reshape((B,) + radices[::-1] + (K,)), digits)
+    return out.reshape(B, n, K)
+
+
+def _dft_axis(x, axis, sign):
+    x = np.asarray(x)
+    moved = np.moveaxis(x, axis, 0)
+    n = moved.shape[0]
+    flat = np.ascontiguousarray(moved).reshape(1, n, -1)
+    out = _transform(flat, _plan(n, sign, _work_dtype(x))).reshape(moved.shape)
+    return np.moveaxis(out, 0, axis)
+
+
+def fft(x, axis=-1):
+    """DFT 1-D theo truc axis (giong np.fft.fft), cac truc con lai xu ly cung luc."""
+    return _dft_axis(x, axis, -1)
+
+
+def ifft(x, axis=-1):
+    """DFT nguoc 1-D theo truc axis, co chia n (giong np.fft.ifft)."""
+    x = np.asarray(x)
+    out = _dft_axis(x, axis, 1)
+    out /= x.shape[axis]
+    return out
+
+
+def _dft2(x, sign):
+    x = np.asarray(x)
+    M, N = x.shape[-2:]
+    flat = x.reshape(-1, M, N)
+    dtype = _work_dtype(x)
+    # Cot truoc (ra dang chuyen vi (B, N, M)), roi hang (ra lai (B, M, N)): 2 lan chuyen vi deu gop
+    # vao buoc sap xep chi so
+    cols = _transform(flat, _plan(M, sign, dtype), transpose=True)
+    return _transform(cols, _plan(N, sign, dtype), transpose=True).reshape(x.shape)
+
+
+def fft2(x):
+    """DFT 2-D tren 2 truc cuoi (giong np.fft.fft2); cac truc dau (anh RGB, chong anh) tinh cung luc."""
+    return _dft2(x, -1)
+
+
+def ifft2(x):
+    """DFT nguoc 2-D tren 2 truc cuoi, co chia M * N (giong np.fft.ifft2)."""
+    out = _dft2(x, 1)
+    out /= out.shape[-2] * out.shape[-1]
+    return out
+
+
+def _real_twiddles(n, sign, dtype):
+    """
+    He so ghep/tach cho FFT thuc do dai chan n qua FFT phuc do dai h = n/2 (cache chung voi ke hoach):
+    thuan X[k] = Z[k mod h] * a[k] + conj(Z[(h - k) mod h]) * b[k], k = 0..h, voi Z = FFT(x chan + i x le);
+    nguoc Z[k] = X[k] * a[k] + conj(X[h - k]) * b[k], k = 0..h-1 (cung cong thuc, w mang dau nguoc).
+    """
+    dtype = np.dtype(dtype)
+    key = (n, 'real_forward' if sign < 0 else 'real_inverse', dtype.name)
+    plan = _lookup(key)
+    if plan is not None:
+        return plan
+
+    w = np.exp(sign * 2j * np.pi * np.arange(n // 2 + 1) / n)
+    # thuan: 1/(2i) = -i/2; nguoc: chia cho w^k (= nhan w^-k)
+    a = (0.5 * (1 + sign * 1j * w)).astype(dtype)
+    b = (0.5 * (1 - sign * 1j * w)).astype(dtype)
+    a.flags.writeable = False
+    b.flags.writeable = False
+    return _store(key, ('real', a, b))
+
+
+def _rfft_rows(x, dtype):
+    # Pho 1-D cua tung hang anh thuc x (B, M, N), chi N//2 + 1 tan so, dang (B, M, N//2 + 1)
+    B, M, N = x.shape
+    Nh = N // 2 + 1
+    if N % 2:
+        z = np.empty((B, N, M), dtype=dtype)
+        z[...] = x.transpose(0, 2, 1)
+        return np.ascontiguousarray(_transform(z, _plan(N, -1, dtype), transpose=True)[:, :, :Nh])
+
+    # N chan: ghep mau chan/le thanh 1 tin hieu phuc do dai h = N/2 (1 lan doc, gop luon chuyen vi)
+    h = N // 2
+    z = np.empty((B, h, M), dtype=dtype)
+    z.real[...] = x[:, :, 0::2].transpose(0, 2, 1)
+    z.imag[...] = x[:, :, 1::2].transpose(0, 2, 1)
+    Z = _transform(z, _plan(h, -1, dtype), transpose=True)
+    _, a, b = _real_twiddles(N, -1, dtype)
+    out = np.empty((B, M, Nh), dtype=dtype)
+    np.multiply(Z, a[:h], out=out[:, :, :h])
+    np.multiply(Z[:, :, 0], a[h], out=out[:, :, h])
+    # conj(Z[(h - k) mod h]): k = 0 -> Z[0], k = 1..h -> Z[h-1], ..., Z[0]
+    out[:, :, 0] += np.conj(Z[:, :, 0]) * b[0]
+    C = np.conj(Z[:, :, ::-1])
+    C *= b[1:]
+    out[:, :, 1:] += C
+    return out
+
+
+def rfft2(x):
+    """
+    DFT 2-D cua anh thuc tren 2 truc cuoi, chi giu nua pho khong thua (..., M, N//2 + 1)
+    (giong np.fft.rfft2): F(u, N - v) = conj(F(-u, v)). Khoang mot nua thoi gian va bo nho cua fft2.
+    """
+    x = np.asarray(x)
+    *lead, M, N = x.shape
+    dtype = _work_dtype(x)
+    rows = _rfft_rows(x.reshape(-1, M, N), dtype)
+    return _transform(rows, _plan(M, -1, dtype)).reshape(tuple(lead) + (M, N // 2 + 1))
+
+
+def irfft2(F, width):
+    """Nguoc cua rfft2: nua pho (..., M, width//2 + 1) -> anh thuc (..., M, width), co chia M * width."""
+    F = np.asarray(F)
+    *lead, M, Nh = F.shape
+    N = width
+    if Nh != N // 2 + 1:
+        raise ValueError(f"Nua pho co {Nh} cot, can {N // 2 + 1} cho chieu rong {N}")
+    dtype = _work_dtype(F)
+    real = np.float32 if dtype == np.complex64 else np.float64
+    # Theo cot truoc, ra dang chuyen vi (B, Nh, M): moi hang la nua pho 1-D cua mot hang anh
+    Y = _transform(F.reshape(-1, M, Nh), _plan(M, 1, dtype), transpose=True)
+    B = Y.shape[0]
+    out = np.empty((B, M, N), dtype=real)
+
+    if N % 2:
+        full = np.empty((B, N, M), dtype=dtype)
+        full[:, :Nh] = Y
+        np.conjugate(Y[:, Nh - 1:0:-1], out=full[:, Nh:])
+        z = _transform(full, _plan(N, 1, dtype))
+        out[...] = z.real.transpose(0, 2, 1)
+        out /= M * N
+        return out.reshape(tuple(lead) + (M, N))
+
+    h = N // 2
+    _, p, q = _real_twiddles(N, 1, dtype)
+    Z = Y[:, :h] * p[:h, None]
+    C = np.conj(Y[:, h:0:-1])
+    C *= q[:h, None]
+    Z += C
+    # Theo hang (do dai h), ra dang (B, M, h): mau chan = phan thuc, mau le = phan ao
+    z = _transform(Z, _plan(h, 1, dtype), transpose=True)
+    out[:, :, 0::2] = z.real
+    out[:, :, 1::2] = z.imag
+    out /= M * h
+    return out.reshape(tuple(lead) + (M, N))
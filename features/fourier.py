@@ -1,164 +1,201 @@
+from math import gcd
+
 import numpy as np
 
-def DFT_Fourier(image):
+from features import fft
+
+def DFT_Fourier(image, centered=False):
     """
-    Thực hiện biến đổi DFT 2D thủ công.
-    Để tối ưu, sử dụng tính chất tách biến (Separability):
-    DFT 2D có thể tính bằng cách:
-    1. Tính DFT 1D cho từng hàng.
-    2. Tính DFT 1D cho từng cột của kết quả bước 1.
-    Hoặc dùng ma trận transform: F = W_M . I . W_N
+    Biến đổi DFT 2D: F(u,v) = sum_x sum_y f(x,y) * exp(-j*2pi*(ux/M + vy/N)).
+    Tính bằng FFT (features.fft): tách biến theo cột rồi theo hàng, mỗi chiều phân tích
+    M = r1 * r2 * ... (Cooley-Tukey, mỗi bước là phép nhân ma trận DFT nhỏ r x r);
+    độ dài có thừa số nguyên tố lớn dùng Bluestein. Chi phí O(MN log(MN)) thay vì O(MN(M+N))
+    của cách nhân ma trận F = W_M . I . W_N; kết quả trùng khớp (sai số ~1e-15).
+    Ảnh thực nên chỉ tính nửa phổ (RDFT_Fourier) rồi điền nửa còn lại theo đối xứng Hermite.
+    Hỗ trợ mảng (..., M, N): các ảnh/kênh ở các trục đầu được biến đổi cùng lúc.
+    centered: trả về phổ đã dịch tâm (= shifted(F)) với mọi M, N; phép dịch gộp vào bước điền
+    đối xứng Hermite nên không tốn thêm mảng phổ đầy đủ nào.
     """
-    image = np.array(image, dtype=float)
-    M, N = image.shape
-    
-    # Tạo ma trận DFT cho hàng và cột
-    
-    # Ma trận W_M (M x M): W_M[u, x] = exp(-j * 2*pi * u * x / M)
-    x = np.arange(M)
-    u = np.arange(M)
-    # Outer product for grid
-    U, X = np.meshgrid(u, x, indexing='ij')
-    W_M = np.exp(-1j * 2 * np.pi * U * X / M)
-    
-    # Ma trận W_N (N x N): W_N[y, v] = exp(-j * 2*pi * y * v / N)
-    v = np.arange(N)
-    y = np.arange(N)
-    V, Y = np.meshgrid(v, y, indexing='ij')
-    W_N = np.exp(-1j * 2 * np.pi * Y * V / N)
-    
-    y = np.arange(N).reshape(-1, 1) # col vector 0..N-1
-    v = np.arange(N).reshape(1, -1) # row vector 0..N-1
-    D_N = np.exp(-1j * 2 * np.pi * y * v / N)
-    
-    # Matrix for rows (M x M)
-    # We need to sum over x.
-    # F = W_M @ (I @ D_N)
-    # Entry (u, x) -> exp(-j 2 pi u x / M)
-    u = np.arange(M).reshape(-1, 1)
-    x = np.arange(M).reshape(1, -1)
-    W_M = np.exp(-1j * 2 * np.pi * u * x / M)
-    
-    F = W_M @ (image @ D_N)
-    
+    image = np.asarray(image, dtype=float)
+    M, N = image.shape[-2:]
+    shift = (M // 2, N // 2) if centered else (0, 0)
+    return full_spectrum(fft.rfft2(image), N, shift)
+
+def RDFT_Fourier(image):
+    """
+    DFT 2D của ảnh thực, chỉ giữ nửa phổ không thừa: mảng (..., M, N//2 + 1) gồm các cột v = 0..N/2
+    (cột còn lại suy ra từ F(u, N - v) = conj(F(-u, v))). Tốn khoảng một nửa bộ nhớ và thời gian
+    so với DFT_Fourier. Các hàm shifted, I_shifted, compute_spectrum nhận bố cục này qua tham số width.
+    """
+    image = np.asarray(image, dtype=float)
+    return fft.rfft2(image)
+
+def IRDFT_Fourier(F_half, width):
+    """Biến đổi ngược của RDFT_Fourier: nửa phổ (..., M, width//2 + 1) -> ảnh thực (..., M, width)."""
+    return fft.irfft2(F_half, width)
+
+def _put_rolled(dst, src, a, b, conj=False):
+    # Ghi src (..., m, n) vào dst (..., M, N) bắt đầu từ hàng a, cột b, cuộn vòng qua biên (tối đa 4 khối)
+    M, N = dst.shape[-2:]
+    m, n = src.shape[-2:]
+    a, b = a % M, b % N
+    ra, cb = min(m, M - a), min(n, N - b)
+
+    def put(d, s):
+        if conj:
+            np.conjugate(s, out=d)
+        else:
+            d[...] = s
+
+    put(dst[..., a:a + ra, b:b + cb], src[..., :ra, :cb])
+    put(dst[..., a:a + ra, :n - cb], src[..., :ra, cb:])
+    put(dst[..., :m - ra, b:b + cb], src[..., ra:, :cb])
+    put(dst[..., :m - ra, :n - cb], src[..., ra:, cb:])
+
+def _roll_inplace(F, a, b):
+    # Cuộn tại chỗ F[(u + a) % M, (v + b) % N] <- F[u, v]: dời các hàng theo chu trình (u -> u + a),
+    # mỗi hàng cuộn cột b khi chép; chỉ cần bộ đệm 1 hàng cho đầu mỗi chu trình
+    M, N = F.shape[-2:]
+    a, b = a % M, b % N
+    if a == 0 and b == 0:
+        return F
+    row = np.empty(F.shape[:-2] + (N,), dtype=F.dtype)
+
+    def move(i, src):
+        dst = F[..., i, :]
+        dst[..., b:] = src[..., :N - b]
+        dst[..., :b] = src[..., N - b:]
+
+    for start in range(gcd(M, a)):
+        row[...] = F[..., start, :]
+        i, j = start, (start - a) % M
+        while j != start:
+            move(i, F[..., j, :])
+            i, j = j, (j - a) % M
+        move(i, row)
     return F
 
-def shifted(F):
+def _shift(F, a, b, out):
+    F = np.asarray(F)
+    if out is F:
+        return _roll_inplace(F, a, b)
+    if out is None:
+        out = np.empty_like(F)
+    _put_rolled(out, F, a, b)
+    return out
+
+def full_spectrum(F_half, width, shift=(0, 0), out=None):
     """
-    Dịch chuyển tâm phổ:
-    Chia F thành 4 góc phần tư và tráo đổi chéo.
-    Q1 | Q2
-    -------
-    Q3 | Q4
-    
-    Result:
-    Q4 | Q3
-    -------
-    Q2 | Q1
+    Phổ đầy đủ (..., M, width) từ nửa phổ (RDFT_Fourier): F(u, v) = conj(F(-u, width - v)) với v > width/2.
+    shift = (a, b): ghi thẳng F(u, v) vào vị trí ((u + a) % M, (v + b) % width) - (M//2, width//2) cho
+    phổ đã dịch tâm mà không cần mảng trung gian; out: mảng kết quả có sẵn.
     """
-    M, N = F.shape
-    cM, cN = M // 2, N // 2
-    
-    F_shifted = np.zeros_like(F)
-    
-    # Q1 (Top-Left) -> Q4 (Bottom-Right)
-    F_shifted[cM:, cN:] = F[:cM, :cN]
-    
-    # Q4 (Bottom-Right) -> Q1 (Top-Left)
-    F_shifted[:cM, :cN] = F[cM:, cN:]
-    
-    # Q2 (Top-Right) -> Q3 (Bottom-Left)
-    F_shifted[cM:, :cN] = F[:cM, cN:]
-    
-    # Q3 (Bottom-Left) -> Q2 (Top-Right)
-    F_shifted[:cM, cN:] = F[cM:, :cN]
-    
-    return F_shifted
+    M, Nh = F_half.shape[-2:]
+    a, b = shift
+    if out is None:
+        out = np.empty(F_half.shape[:-1] + (width,), dtype=F_half.dtype)
+    conj = np.iscomplexobj(out)
+    _put_rolled(out, F_half, a, b)
+    # Cột v = Nh..width-1 lấy từ cột width - v (= width-Nh..1), hàng -u mod M (= 0, M-1, ..., 1)
+    right = F_half[..., width - Nh:0:-1]
+    _put_rolled(out, right[..., :1, :], a, b + Nh, conj)
+    _put_rolled(out, right[..., :0:-1, :], a + 1, b + Nh, conj)
+    return out
+
+def shifted(F, width=None, out=None):
+    """
+    Dịch chuyển tâm phổ: out[(u + M//2) % M, (v + N//2) % N] = F[u, v] (như np.fft.fftshift), đúng với
+    mọi M, N - khi M, N chẵn chính là chia F thành 4 góc phần tư và tráo đổi chéo:
+    Q1 | Q2        Q4 | Q3
+    -------   ->   -------
+    Q3 | Q4        Q2 | Q1
+    out: mảng kết quả cho sẵn (không được chồng lên F); out=F dịch tại chỗ, chỉ tốn bộ đệm 1 hàng.
+    width: F là nửa phổ của RDFT_Fourier cho ảnh rộng width cột; khi đó chỉ dời các hàng,
+    vì các cột v = 0..width/2 vốn đã là nửa phải tính từ tâm.
+    Hỗ trợ mảng (..., M, N).
+    """
+    M, N = np.shape(F)[-2:]
+    return _shift(F, M // 2, 0 if width is not None else N // 2, out)
     
 
 def F_shifted_transform(image):
     """
     Biến đổi Fourier kết hợp dịch chuyển tâm phổ bằng cách nhân (-1)^(x+y) trước.
     F_shifted(u,v) = DFT{ f(x,y) * (-1)^(x+y) }
+    (-1)^x = exp(j*pi*x) chỉ dời phổ đúng M/2 khi M chẵn; trục có độ dài lẻ được dời M//2 ngay lúc
+    điền nửa phổ (full_spectrum), nên kết quả luôn bằng shifted(DFT_Fourier(image)).
     """
     image = np.array(image, dtype=float)
-    M, N = image.shape
-    
-    # Create multiplication matrix (-1)^(x+y)
-    x = np.arange(M).reshape(-1, 1)
-    y = np.arange(N).reshape(1, -1)
-    
-    # (-1)^(x+y) = (-1)^x * (-1)^y
-    # This creates a checkerboard pattern
-    scaler = np.power(-1.0, x + y)
+    M, N = image.shape[-2:]
     
-    processed_image = image * scaler
+    # (-1)^(x+y) = (-1)^x * (-1)^y: đổi dấu tại chỗ các hàng lẻ rồi các cột lẻ
+    # (mẫu bàn cờ, không cần tạo mảng hệ số)
+    if M % 2 == 0:
+        image[..., 1::2, :] *= -1
+    if N % 2 == 0:
+        image[..., 1::2] *= -1
     
-    # Apply standard DFT
-    Fs2 = DFT_Fourier(processed_image)
-    
-    return Fs2
+    # Apply standard DFT (nửa phổ, ảnh vẫn là ảnh thực)
+    return full_spectrum(fft.rfft2(image), N, ((M % 2) * (M // 2), (N % 2) * (N // 2)))
 
-def compute_spectrum(F):
+def compute_spectrum(F, width=None, centered=False):
     """
     Tính ảnh phổ biên độ (Magnitude Spectrum) để hiển thị.
     Spectrum = log(1 + |F|)
+    width: F là nửa phổ (RDFT_Fourier) của ảnh rộng width cột - chỉ tính log trên nửa phổ rồi lật
+    ra đủ chiều rộng (|F(u, v)| = |F(-u, width - v)|) trên ảnh uint8; centered: nửa phổ đã qua
+    shifted(F, width), kết quả là ảnh phổ đầy đủ đã dịch tâm.
     """
     # Magnitude
     mag = np.abs(F)
     # Log scale
-    spectrum = np.log(1 + mag)
+    spectrum = np.log1p(mag, out=mag)
     
     # Normalize 0-255
     if spectrum.max() > 0:
-        spectrum = spectrum / spectrum.max() * 255
+        spectrum *= 255 / spectrum.max()
     else:
-        spectrum = spectrum * 0
-        
-    return spectrum.astype(np.uint8)
+        spectrum *= 0
+    spectrum = spectrum.astype(np.uint8)
+
+    if width is None:
+        return spectrum
+    if centered:
+        # Đưa các hàng về bố cục chưa dịch (tại chỗ) rồi điền nửa còn lại thẳng vào vị trí đã dịch tâm
+        shift = (spectrum.shape[-2] // 2, width // 2)
+        return full_spectrum(I_shifted(spectrum, width, out=spectrum), width, shift)
+    return full_spectrum(spectrum, width)
 
-def I_shifted(F):
+def I_shifted(F, width=None, out=None):
     """
-    Dịch chuyển ngược (Inverse shift).
-    Vì hàm shift là hoán đổi góc phần tư đối xứng qua tâm, nên inverse shift chính là shift.
-    Shift(Shift(F)) = F
+    Dịch chuyển ngược (Inverse shift): out[u, v] = F[(u + M//2) % M, (v + N//2) % N] (np.fft.ifftshift).
+    Với M, N chẵn shift là hoán đổi góc phần tư đối xứng qua tâm nên Shift(Shift(F)) = F; với M hoặc N lẻ
+    phải dời ngược (M//2 + 1 hàng) thì I_shifted(shifted(F)) mới bằng F.
+    out, width: như shifted (out=F: tại chỗ; width: nửa phổ, chỉ dời ngược các hàng).
     """
-    return shifted(F)
+    M, N = np.shape(F)[-2:]
+    return _shift(F, -(M // 2), 0 if width is not None else -(N // 2), out)
 
-def IDFT_Fourier(F):
+def IDFT_Fourier(F, centered=False):
     """
     Biến đổi Fourier Ngược 2D (IDFT).
     f(x,y) = (1/MN) * sum_u sum_v F(u,v) * exp(j * 2pi * (ux/M + vy/N))
+    Chỉ cần phần thực: Re(IDFT(F)) = IDFT(phần Hermite (F(u,v) + conj(F(-u,-v))) / 2), mà phần Hermite
+    xác định bởi nửa phổ nên dùng biến đổi ngược thực (IRDFT_Fourier), không tính phần ảo bị bỏ đi.
+    centered: F là phổ đã dịch tâm - dịch ngược gộp vào bước lấy nửa phổ (= IDFT_Fourier(I_shifted(F))).
     """
-    F = np.array(F, dtype=complex)
-    M, N = F.shape
-    
-    # Ma trận IDFT cột (N x N)
-    # D_inv[v, y] = exp(j * 2pi * v * y / N)
-    v = np.arange(N).reshape(-1, 1)
-    y = np.arange(N).reshape(1, -1)
-    D_inv_N = np.exp(1j * 2 * np.pi * v * y / N)
-    
-    # Ma trận IDFT hàng (M x M)
-    # W_inv[x, u] = exp(j * 2pi * x * u / M)
-    x = np.arange(M).reshape(-1, 1)
-    u = np.arange(M).reshape(1, -1)
-    W_inv_M = np.exp(1j * 2 * np.pi * x * u / M)
-    
-    # IDFT = W_inv_M @ F @ D_inv_N
-    # Note: F needs to be multiplied correctly.
-    # Rows first: F @ D_inv_N (Sum over v) -> Result (u, y) ?? No.
-    # D_inv_N is (N x N), entry (v, y). F is (M, N).
-    # F @ D_inv_N gives sum_v F(u,v) * exp(...) -> result(u, y). Correct.
-    
-    # Then Cols: W_inv_M @ Result
-    # W_inv_M is (M x M), entry (x, u). Result is (u, y).
-    # W_inv_M @ Result gives sum_u exp(...) * Result(u,y) -> Final(x, y). Correct.
-    
-    reconstructed = W_inv_M @ (F @ D_inv_N)
-    
-    # Scale by 1/(MN)
-    reconstructed = reconstructed / (M * N)
-    
-    # Return real part (assuming original image was real)
-    return np.real(reconstructed)
+    F = np.asarray(F)
+    M, N = F.shape[-2:]
+    Nh = N // 2 + 1
+    a, b = (M // 2, N // 2) if centered else (0, 0)
+    # Tần số u nằm ở hàng (u + a) % M, cột (v + b) % N
+    rows = (a - np.arange(M)) % M
+    cols = (b - np.arange(Nh)) % N
+    half = F[..., rows[:, None], cols]
+    np.conjugate(half, out=half)
+    if centered:
+        half += F[..., ((np.arange(M) + a) % M)[:, None], (np.arange(Nh) + b) % N]
+    else:
+        half += F[..., :Nh]
+    half *= 0.5
+    return fft.irfft2(half, N)
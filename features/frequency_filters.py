@@ -0,0 +1,198 @@
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from features import fourier
+
+KINDS = ('ideal', 'butterworth', 'gaussian')
+BANDS = ('lowpass', 'highpass', 'bandpass', 'bandreject', 'notch')
+
+# Cache ham truyen: keo thanh truot se goi lai cung (shape, loai, cutoff, bac) nhieu lan
+MAX_MASKS = 32
+MAX_MASK_BYTES = 256 * 1024 * 1024
+
+_masks = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'bytes': 0}
+
+
+def _frequencies(n, layout):
+    # Tan so nguyen theo tung chi so: 'centered' giong pho da dich tam (tam tai n // 2),
+    # 'half' giong RDFT_Fourier chua dich (0, 1, ..., -2, -1)
+    if layout == 'centered':
+        return np.arange(n) - n // 2
+    if layout == 'half':
+        return (np.arange(n) + n // 2) % n - n // 2
+    raise ValueError(f"Unknown layout {layout}")
+
+
+def _lowpass(D2, kind, cutoff, order):
+    # Thong thap theo binh phuong khoang cach D^2 (khong can lay can)
+    r2 = D2 / (cutoff * cutoff)
+    if kind == 'ideal':
+        return (r2 <= 1).astype(float)
+    if kind == 'butterworth':
+        return 1 / (1 + r2 ** order)
+    if kind == 'gaussian':
+        return np.exp(-0.5 * r2)
+    raise ValueError(f"Unknown kind {kind}")
+
+
+def _bandreject(D2, kind, low, high, order):
+    # Chan dai tam C0 = (low + high) / 2, be rong W = high - low (Gonzalez & Woods)
+    C0, W = (low + high) / 2, high - low
+    if kind == 'ideal':
+        return ((D2 < low * low) | (D2 > high * high)).astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.sqrt(D2) * W / (D2 - C0 * C0)
+        if kind == 'butterworth':
+            return 1 / (1 + (ratio * ratio) ** order)
+        if kind == 'gaussian':
+            return 1 - np.exp(-1 / (ratio * ratio))
+    raise ValueError(f"Unknown kind {kind}")
+
+
+def _build_mask(shape, layout, kind, band, cutoff, order, centers):
+    M, N = shape
+    fu = _frequencies(M, layout)[:, None].astype(float)
+    fv = (np.arange(N // 2 + 1) if layout == 'half' else _frequencies(N, layout))[None, :].astype(float)
+
+    if band == 'notch':
+        # Moi tam (du, dv) kem diem doi xung (-du, -dv) de ket qua van la anh thuc; khoang cach
+        # tinh tuan hoan (pho lap chu ky M, N) de H(-u, -v) = H(u, v) ca o hang/cot Nyquist
+        H = np.ones((M, fv.shape[1]))
+        for du, dv in centers:
+            for s in (1, -1):
+                eu = (fu - s * du + M / 2) % M - M / 2
+                ev = (fv - s * dv + N / 2) % N - N / 2
+                H *= 1 - _lowpass(eu * eu + ev * ev, kind, cutoff, order)
+        return H
+
+    D2 = fu * fu + fv * fv
+    if band in ('lowpass', 'highpass'):
+        H = _lowpass(D2, kind, cutoff, order)
+    elif band in ('bandpass', 'bandreject'):
+        H = _bandreject(D2, kind, cutoff[0], cutoff[1], order)
+    else:
+        raise ValueError(f"Unknown band {band}")
+    if band in ('highpass', 'bandpass'):
+        np.subtract(1, H, out=H)
+    return H
+
+
+def transfer_function(shape, kind='gaussian', band='lowpass', cutoff=30.0, order=2, centers=(), layout='centered'):
+    """
+    Ham truyen H(u, v) cua bo loc tan so (mang chi doc, dung chung qua cache LRU).
+    kind: 'ideal' | 'butterworth' | 'gaussian'; band: 'lowpass' | 'highpass' | 'bandpass' | 'bandreject' | 'notch'.
+    cutoff: ban kinh D0 (tinh theo chi so tan so); bandpass/bandreject nhan (D_thap, D_cao);
+    notch: cac tam centers = ((du, dv), ...) tinh tu goc tan so, ban kinh cutoff.
+    order: bac n cua Butterworth (cac loai khac bo qua).
+    layout: 'centered' - cung bo cuc (M, N) voi fourier.shifted / F_shifted_transform;
+    'half' - bo cuc (M, N//2 + 1) cua RDFT_Fourier chua dich tam.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind {kind}")
+    if band in ('bandpass', 'bandreject'):
+        low, high = (float(c) for c in cutoff)
+        if not 0 <= low < high:
+            raise ValueError("Dai tan can 0 <= D_thap < D_cao")
+        cutoff = (low, high)
+    else:
+        cutoff = float(cutoff)
+        if cutoff <= 0:
+            raise ValueError("cutoff phai > 0")
+    # Bac chi anh huong Butterworth: loai khac dung chung mot muc cache
+    order = float(order) if kind == 'butterworth' else None
+    centers = tuple((float(du), float(dv)) for du, dv in centers) if band == 'notch' else ()
+    shape = tuple(int(s) for s in shape)
+    key = (shape, layout, kind, band, cutoff, order, centers)
+
+    H = _masks.get(key)
+    if H is not None:
+        _masks.move_to_end(key)
+        _stats['hits'] += 1
+        return H
+
+    _stats['misses'] += 1
+    H = _build_mask(shape, layout, kind, band, cutoff, order, centers)
+    H.flags.writeable = False
+    if H.nbytes > MAX_MASK_BYTES:
+        return H
+    _masks[key] = H
+    _stats['bytes'] += H.nbytes
+    while len(_masks) > MAX_MASKS or _stats['bytes'] > MAX_MASK_BYTES:
+        _, old = _masks.popitem(last=False)
+        _stats['bytes'] -= old.nbytes
+    return H
+
+
+def cache_info():
+    """So lan trung/truot cache ham truyen, so muc va dung luong dang giu."""
+    return {
+        'hits': _stats['hits'],
+        'misses': _stats['misses'],
+        'entries': len(_masks),
+        'bytes': _stats['bytes'],
+    }
+
+
+def clear_cache():
+    _masks.clear()
+    _stats.update(hits=0, misses=0, bytes=0)
+
+
+def apply_centered(Fs, kind='gaussian', band='lowpass', cutoff=30.0, order=2, centers=(), out=None):
+    """Nhan pho da dich tam (..., M, N) (fourier.shifted hoac F_shifted_transform) voi H; out co the la chinh Fs."""
+    H = transfer_function(Fs.shape[-2:], kind, band, cutoff, order, centers, layout='centered')
+    return np.multiply(Fs, H, out=out)
+
+
+def spectra(arr):
+    """
+    Nua pho RDFT cua anh (M, N) hoac cua ca C kenh anh (M, N, C) cung luc -> (C, M, N//2 + 1).
+    Giu lai ket qua de loc nhieu lan (vd khi keo thanh truot) ma khong bien doi thuan lai.
+    """
+    arr = np.asarray(arr)
+    if arr.ndim == 3:
+        arr = np.moveaxis(arr, -1, 0)
+    return fourier.RDFT_Fourier(arr)
+
+
+def filter_spectra(F_half, shape, dtype=np.float64, kind='gaussian', band='lowpass', cutoff=30.0, order=2, centers=()):
+    """
+    Loc nua pho cua spectra(...) va bien doi nguoc ve anh co shape (M, N) hoac (M, N, C), kieu dtype
+    (kieu nguyen: lam tron va cat ve mien gia tri). H thuc va doi xung nen nhan thang tren nua pho.
+    """
+    M, N = shape[:2]
+    H = transfer_function((M, N), kind, band, cutoff, order, centers, layout='half')
+    out = fourier.IRDFT_Fourier(F_half * H, N)
+    if len(shape) == 3:
+        out = np.moveaxis(out, 0, -1)
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        np.rint(out, out=out)
+        np.clip(out, info.min, info.max, out=out)
+        return out.astype(dtype)
+    return out
+
+
+def filter_array(arr, kind='gaussian', band='lowpass', cutoff=30.0, order=2, centers=()):
+    """Loc anh xam (M, N) hoac anh mau (M, N, C) trong mien tan so: 1 lan RDFT va 1 lan IRDFT cho ca cac kenh."""
+    arr = np.asarray(arr)
+    return filter_spectra(spectra(arr), arr.shape, arr.dtype, kind, band, cutoff, order, centers)
+
+
+def apply_frequency_filter(image, kind='gaussian', band='lowpass', cutoff=30.0, order=2, centers=()):
+    # Anh L/RGB loc truc tiep; RGBA giu nguyen kenh alpha; che do khac chuyen sang RGB
+    alpha = None
+    if image.mode == 'RGBA':
+        alpha = image.getchannel('A')
+        image = image.convert('RGB')
+    elif image.mode not in ('L', 'RGB'):
+        image = image.convert('RGB')
+
+    result = Image.fromarray(filter_array(np.array(image), kind, band, cutoff, order, centers))
+    if alpha is not None:
+        result.putalpha(alpha)
+    return result
@@ -0,0 +1,133 @@
+import numpy as np
+
+from features import border
+
+def _const(rows):
+    k = np.array(rows)
+    k.flags.writeable = False
+    return k
+
+# Kernel goc (chi doc), dung chung voi edge_detection; cac luot hop nhat ben duoi suy trong so tu day
+SOBEL_X = _const([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]])
+SOBEL_Y = _const([[-1, -2, -1], [0, 0, 0], [1, 2, 1]])
+PREWITT_X = _const([[-1, 0, 1], [-1, 0, 1], [-1, 0, 1]])
+PREWITT_Y = _const([[-1, -1, -1], [0, 0, 0], [1, 1, 1]])
+ROBERTS_X = _const([[1, 0], [0, -1]])
+ROBERTS_Y = _const([[0, 1], [-1, 0]])
+
+KERNELS = {
+    'sobel': (SOBEL_X, SOBEL_Y),
+    'prewitt': (PREWITT_X, PREWITT_Y),
+    'roberts': (ROBERTS_X, ROBERTS_Y),
+}
+
+
+def _center_weight(kx, ky):
+    # Trong so o giua c cua vector lam tron [1, c, 1]: kx = [1, c, 1]^T x [-1, 0, 1], ky = kx^T
+    c = kx[1, 2]
+    if not (np.array_equal(kx, np.outer([1, c, 1], [-1, 0, 1])) and np.array_equal(ky, kx.T)):
+        raise ValueError("Kernel 3x3 khong co dang [1, c, 1]^T x [-1, 0, 1]")
+    return c
+
+
+def _taps(k):
+    # Vi tri he so +1 va -1 cua kernel Roberts 2x2
+    if np.count_nonzero(k == 1) != 1 or np.count_nonzero(k == -1) != 1 or np.count_nonzero(k) != 2:
+        raise ValueError("Kernel 2x2 phai co dung mot he so +1 va mot he so -1")
+    return tuple(np.argwhere(k == 1)[0]), tuple(np.argwhere(k == -1)[0])
+
+OUTPUTS = ('ix', 'iy', 'magnitude', 'magnitude_sq', 'orientation')
+
+_ROWS = 256
+
+
+def _valid_3x3(c, dtype):
+    """Sobel/Prewitt tach duoc: Ix = [1, c, 1]^T x [-1, 0, 1], Iy = [-1, 0, 1]^T x [1, c, 1]."""
+
+    def valid(block, out):
+        ix, iy = out
+        h, w = ix.shape
+
+        # Luot doc dung chung cho Ix va Iy: lam tron vs (cho Ix) va hieu vd (cho Iy)
+        vs = np.multiply(block[1:h + 1], c, dtype=dtype)
+        vs += block[0:h]
+        vs += block[2:h + 2]
+        vd = np.subtract(block[2:h + 2], block[0:h], dtype=dtype)
+
+        # Luot ngang ghi thang vao bo dem ket qua
+        np.subtract(vs[:, 2:], vs[:, :w], out=ix)
+        np.multiply(vd[:, 1:w + 1], c, out=iy)
+        iy += vd[:, :w]
+        iy += vd[:, 2:]
+
+    return valid
+
+
+def _valid_roberts(kx, ky, dtype):
+    """
+    Roberts 2x2 (cua so [i-1, i] x [j-1, j]), moi dao ham la hieu 2 pixel tai vi tri he so +1 va -1
+    cua kernel: voi ROBERTS_X/Y la Ix = f(i-1,j-1) - f(i,j), Iy = f(i-1,j) - f(i,j-1).
+    """
+    taps = (_taps(kx), _taps(ky))
+
+    def valid(block, out):
+        h, w = out[0].shape
+        for res, ((pr, pc), (mr, mc)) in zip(out, taps):
+            np.subtract(block[pr:pr + h, pc:pc + w], block[mr:mr + h, mc:mc + w], out=res, dtype=dtype)
+
+    return valid
+
+
+def gradient(image, outputs=('magnitude',), operator='sobel', mode='constant', dtype=np.float32, out=None):
+    """
+    Toan tu gradient hop nhat: tinh Ix, Iy roi cac dai luong dan xuat trong mot luot,
+    vao cac bo dem cap san (kieu dtype, mac dinh float32).
+    - outputs: tap con cua OUTPUTS ('ix', 'iy', 'magnitude', 'magnitude_sq', 'orientation').
+    - operator: 'sobel', 'prewitt' hoac 'roberts' (cung quy uoc voi edge_detection).
+    - mode: cach xu ly bien (xem features.border), 'constant' = padding 0 nhu my_convolution.
+    - out: dict ten -> mang cho san de dung lai giua cac lan goi (thieu thi tao moi).
+    Tra ve dict ten -> mang H x W.
+    """
+    for name in outputs:
+        if name not in OUTPUTS:
+            raise ValueError(f"Unknown output {name}")
+
+    H, W = image.shape
+    out = dict(out or {})
+
+    def buffer(name):
+        if name not in out:
+            out[name] = np.empty((H, W), dtype=dtype)
+        return out[name]
+
+    ix, iy = buffer('ix'), buffer('iy')
+
+    if operator not in KERNELS:
+        raise ValueError(f"Unknown operator {operator}")
+    kx, ky = KERNELS[operator]
+    if operator == 'roberts':
+        valid, margins = _valid_roberts(kx, ky, dtype), border.kernel_margins(2, 2)
+    else:
+        valid, margins = _valid_3x3(_center_weight(kx, ky), dtype), border.kernel_margins(3, 3)
+
+    border.filter_same(image, valid, margins, mode, out=(ix, iy))
+
+    if 'magnitude' in outputs or 'magnitude_sq' in outputs:
+        # Dung chung 1 bo dem: magnitude_sq roi lay can tai cho neu chi can magnitude
+        name = 'magnitude_sq' if 'magnitude_sq' in outputs else 'magnitude'
+        sq = buffer(name)
+        np.multiply(ix, ix, out=sq)
+        # Theo khoi hang de mang tam iy*iy nho
+        for r0 in range(0, H, _ROWS):
+            t = iy[r0:r0 + _ROWS]
+            sq[r0:r0 + _ROWS] += t * t
+        if 'magnitude' in outputs:
+            if name == 'magnitude_sq':
+                np.sqrt(sq, out=buffer('magnitude'))
+            else:
+                np.sqrt(sq, out=sq)
+
+    if 'orientation' in outputs:
+        np.arctan2(iy, ix, out=buffer('orientation'))
+
+    return {name: out[name] for name in outputs}
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Gioi han cache: so muc va tong dung luong cac mang da chuan bi (pho FFT co the lon)
+MAX_ENTRIES = 256
+MAX_BYTES = 256 * 1024 * 1024
+
+_cache = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'bytes': 0}
+# parallel.parallel_convolution goi cache tu cac luong worker: khoa bao ve _cache va _stats
+_lock = threading.Lock()
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+def _freeze(value):
+    # Ket qua dung chung giua cac lan goi: khoa ghi de tranh bi sua nham
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+def make_key(kind, kernel, shape=None, dtype=None):
+    """Khoa cache: loai chuan bi + noi dung kernel (bytes, shape, dtype) + shape/dtype dich."""
+    k = np.ascontiguousarray(kernel)
+    return (kind, k.tobytes(), k.shape, k.dtype.str,
+            None if shape is None else tuple(shape),
+            None if dtype is None else np.dtype(dtype).str)
+
+
+def prepare(kind, kernel, builder, shape=None, dtype=None):
+    """
+    Tra ve ban chuan bi cua kernel (vd cac thua so tach, pho FFT, kernel so nguyen),
+    goi builder() chi khi chua co trong cache. Cache LRU gioi han theo MAX_ENTRIES va MAX_BYTES.
+    An toan giua cac luong; builder() chay ngoai khoa (co the goi lai prepare), neu 2 luong
+    cung tinh 1 khoa thi ban vao cache truoc duoc dung chung.
+    """
+    key = make_key(kind, kernel, shape, dtype)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats['hits'] += 1
+            return _cache[key]
+        _stats['misses'] += 1
+
+    value = _freeze(builder())
+    size = _nbytes(value)
+    if size > MAX_BYTES:
+        return value
+
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+        _cache[key] = value
+        _stats['bytes'] += size
+        while len(_cache) > MAX_ENTRIES or _stats['bytes'] > MAX_BYTES:
+            _, old = _cache.popitem(last=False)
+            _stats['bytes'] -= _nbytes(old)
+    return value
+
+
+def cache_info():
+    """So lan trung/truot cache, so muc va dung luong dang giu."""
+    with _lock:
+        return {
+            'hits': _stats['hits'],
+            'misses': _stats['misses'],
+            'entries': len(_cache),
+            'bytes': _stats['bytes'],
+        }
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0, bytes=0)
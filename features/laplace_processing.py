@@ -1,7 +1,14 @@
 import numpy as np
-from features import convolution, edge_detection
+from features import border, convolution, edge_detection, kernel_cache
 
-def get_kernels():
+# Ban kinh kernel Gaussian/LoG = ceil(LOG_TRUNCATE * sigma)
+LOG_TRUNCATE = 4.0
+# Ti so sigma giua 2 Gaussian cua DoG
+DOG_RATIO = 1.6
+# So hang moi khoi khi ghep ket qua unsharp mask
+_ROWS = 256
+
+def _build_kernels():
     # Laplace Kernels
     # 4-neighbor (Center -4)
     laplace4n_neg = np.array([[0, 1, 0], 
@@ -29,13 +36,28 @@ def get_kernels():
                              [2, 4, 2], 
                              [1, 2, 1]]) / 16.0
                              
-    return {
+    kernels = {
         'laplace4n_neg': laplace4n_neg,
         'laplace8n_neg': laplace8n_neg,
         'laplace4n_pos': laplace4n_pos,
         'laplace8n_pos': laplace8n_pos,
         'gaussian': gaussian_3x3
     }
+    # Built once and shared: read-only so callers cannot modify them by accident
+    for k in kernels.values():
+        k.flags.writeable = False
+    return kernels
+
+_KERNELS = _build_kernels()
+
+def get_kernels():
+    return dict(_KERNELS)
+
+def _convolve(image, kernel):
+    # Anh 8-bit voi kernel nguyen (hoac nguyen / 2^k): tich luy int16/int32, khong doi sang float64
+    if image.dtype == np.uint8 and convolution.prepared_fixed_point(kernel) is not None:
+        return convolution.integer_convolution(image, kernel)
+    return convolution.my_convolution(image, kernel)
 
 def apply_laplace(image, method='4n_neg'):
 
@@ -47,8 +69,8 @@ def apply_laplace(image, method='4n_neg'):
         raise ValueError(f"Unknown method {method}")
         
     # Convolve
-    # my_convolution returns float or int usually, need to handle
-    conv_res = convolution.my_convolution(image, kernel)
+    # Integer accumulator for uint8 input, float/int from my_convolution otherwise
+    conv_res = _convolve(image, kernel)
     
     abs_res = np.abs(conv_res)
     
@@ -60,39 +82,250 @@ def apply_gaussian_smooth(image):
     kernels = get_kernels()
     kernel = kernels['gaussian']
     
-    res = convolution.my_convolution(image, kernel)
+    # /16 kernel: integer sum then >> 4 (floor == old float truncation for values >= 0)
+    res = _convolve(image, kernel)
     res = np.clip(res, 0, 255).astype(np.uint8)
     return res
 
-def apply_log(image, method='4n_neg'):
+def _radius(sigma):
+    return max(1, int(np.ceil(LOG_TRUNCATE * sigma)))
 
-    smooth = apply_gaussian_smooth(image)
-    
-    res = apply_laplace(smooth, method)
+def gaussian_kernel_1d(sigma):
+    """Gaussian 1D chuan hoa (tong = 1), ban kinh ceil(LOG_TRUNCATE * sigma); dung chung qua kernel_cache."""
+    def build():
+        x = np.arange(-_radius(sigma), _radius(sigma) + 1, dtype=float)
+        g = np.exp(-x * x / (2.0 * sigma * sigma))
+        return g / g.sum()
+    return kernel_cache.prepare('gaussian1d', np.array([float(sigma)]), build)
+
+def gaussian_blur(image, sigma, mode='constant'):
+    """
+    Lam mo Gaussian tach duoc (2 luot 1D), ket qua float. Ho tro anh (H, W, C).
+    mode: xu ly bien theo features.border (mac dinh padding 0; 'reflect'/'edge' khong lam toi vien).
+    """
+    g = gaussian_kernel_1d(sigma)
+    if image.dtype != np.uint8:
+        # uint8 tich luy thang bang float; kieu khac doi sang float de khong bi cat ve kieu anh
+        image = image.astype(float, copy=False)
+    return convolution.convolve_separable(image, g, g, mode)
+
+def log_kernel(sigma):
+    """
+    Kernel LoG chuan hoa theo thang: sigma^2 * (d2G/dx2 + d2G/dy2), cung dau voi laplace4n_neg
+    (tam am). Dung tu 2 thanh phan tach duoc G''(y)G(x) + G(y)G''(x); tong he so = 0.
+    """
+    def build():
+        g = gaussian_kernel_1d(sigma)
+        x = np.arange(-_radius(sigma), _radius(sigma) + 1, dtype=float)
+        g2 = g * (x * x - sigma * sigma) / sigma ** 2
+        # Bu sai so cat duoi: tong G'' = 0 de vung phang cho dap ung 0
+        g2 -= g * g2.sum()
+        return np.outer(g2, g) + np.outer(g, g2)
+    return kernel_cache.prepare('log2d', np.array([float(sigma)]), build)
+
+def _dog_sigmas(sigma):
+    # 2 Gaussian dat doi xung (ti so DOG_RATIO) quanh sigma
+    k = np.sqrt(DOG_RATIO)
+    return sigma / k, sigma * k
+
+def _dog_scale():
+    # G(s*k) - G(s/k) ~ (k - 1/k) * sigma^2 * LoG  (dG/dsigma = sigma * LoG)
+    k = np.sqrt(DOG_RATIO)
+    return 1.0 / (k - 1.0 / k)
+
+def _blur_cost(shape, sigma):
+    # 2 luot 1D: cung mo hinh (da hieu chinh) voi duong tach duoc cua convolution.method_costs
+    taps = 2 * _radius(sigma) + 1
+    return convolution.separable_cost(shape, taps, taps)
+
+def _dog_cost(shape, sigma):
+    # 2 lan lam mo + 1 luot tru va 1 luot nhan he so tren ca anh
+    s1, s2 = _dog_sigmas(sigma)
+    H, W = shape[:2]
+    return _blur_cost(shape, s1) + _blur_cost(shape, np.sqrt(s2 * s2 - s1 * s1)) \
+        + 2 * convolution.SEPARABLE_PASS_COST * H * W
+
+def _kernel_cost(shape, sigma):
+    # Kernel LoG 2D di qua my_convolution: spatial hoac FFT, lay duong re hon
+    k = log_kernel(sigma)
+    return convolution.method_costs(shape, k)[convolution.choose_method(shape, k)]
+
+def _check_approx(approx):
+    if approx not in ('auto', 'kernel', 'dog'):
+        raise ValueError(f"Unknown approximation {approx}")
+
+def log_filter(image, sigma, approx='auto'):
+    """
+    LoG gop 1 luot voi sigma bat ky, ket qua float (sigma^2 * LoG, co dau).
+    - approx='kernel': 1 kernel LoG 2D (my_convolution tu chon spatial/FFT).
+    - approx='dog': hieu 2 Gaussian tach duoc, chi phi ~ tuyen tinh theo ban kinh.
+    - approx='auto': duong re hon theo mo hinh chi phi (kernel LoG qua FFT thuong thang khi sigma lon).
+    """
+    if sigma <= 0:
+        raise ValueError("sigma phai > 0")
+    _check_approx(approx)
+    if approx == 'auto':
+        approx = 'dog' if _dog_cost(image.shape, sigma) < _kernel_cost(image.shape, sigma) else 'kernel'
+    if approx == 'dog':
+        s1, s2 = _dog_sigmas(sigma)
+        small = gaussian_blur(image, s1)
+        # G(s2) = G(s1) * G(sqrt(s2^2 - s1^2)): dung lai anh da lam mo
+        res = gaussian_blur(small, np.sqrt(s2 * s2 - s1 * s1))
+        res -= small
+        res *= _dog_scale()
+        return res
+    return convolution.my_convolution(image.astype(float, copy=False), log_kernel(sigma))
+
+def log_stack(image, sigmas, approx='auto'):
+    """
+    LoG da thang: mang (len(sigmas), H, W) float theo thu tu sigmas.
+    Duong DoG chia se chuoi anh lam mo tang dan: moi buoc chi lam mo them sqrt(s_j^2 - s_{j-1}^2);
+    voi sigmas cap so nhan ti so DOG_RATIO, 2 thang lien tiep dung chung 1 anh mo.
+    approx='auto': DoG chung chuoi neu tong chi phi re hon cac kernel LoG rieng le.
+    """
+    _check_approx(approx)
+    image = image.astype(float, copy=False)
+    out = np.empty((len(sigmas),) + image.shape)
+
+    # Cac sigma Gaussian can thiet, lam tron de gop cac gia tri trung nhau
+    needed = sorted({round(b, 12) for s in sigmas for b in _dog_sigmas(s)})
+
+    if approx == 'auto':
+        steps = np.sqrt(np.diff(np.square([0.0] + needed)))
+        chain = sum(_blur_cost(image.shape, b) for b in steps) \
+            + 2 * convolution.SEPARABLE_PASS_COST * image.shape[0] * image.shape[1] * len(sigmas)
+        separate = sum(_kernel_cost(image.shape, s) for s in sigmas)
+        approx = 'dog' if chain < separate else 'kernel'
+
+    if approx == 'kernel':
+        for i, s in enumerate(sigmas):
+            out[i] = log_filter(image, s, 'kernel')
+        return out
+
+    blurs = {}
+    current, prev = image, 0.0
+    for b in needed:
+        current = gaussian_blur(current, np.sqrt(b * b - prev * prev))
+        blurs[b] = current
+        prev = b
+
+    for i, s in enumerate(sigmas):
+        s1, s2 = (round(b, 12) for b in _dog_sigmas(s))
+        np.subtract(blurs[s2], blurs[s1], out=out[i])
+        out[i] *= _dog_scale()
+    return out
+
+def _fused_log_kernel(method):
+    # Laplace (3x3) o Gaussian 3x3/16 gop thanh 1 kernel 5x5 (nguyen / 16)
+    lap = _KERNELS[f'laplace{method}']
+    gauss = _KERNELS['gaussian']
+    def build():
+        k = np.zeros((5, 5))
+        for a in range(3):
+            for b in range(3):
+                k[a:a + 3, b:b + 3] += lap[a, b] * gauss
+        return k
+    return kernel_cache.prepare('fused_log', lap, build)
+
+def _log_border(image, method, res):
+    # Kernel gop 5x5 coi anh da lam tron khac 0 ngay ngoai bien, con ban 2 luot (lam tron roi
+    # Laplace, moi luot padding 0) thi bang 0: tinh lai vien 2 pixel theo 2 luot tren dai 4 hang/cot
+    # (du de 2 hang/cot ngoai dung), cung cach lam tron voi phan ben trong
+    lap = _KERNELS[f'laplace{method}']
+    gauss = _KERNELS['gaussian']
+    def two_pass(strip):
+        if image.dtype == np.uint8:
+            # Tong nguyen (x16) chinh xac trong float64, lam tron gan nhat nhu integer_convolution
+            acc = convolution.my_convolution(strip, gauss * 16, separable=False, method='spatial')
+            acc = convolution.my_convolution(acc, lap, separable=False, method='spatial')
+            return np.floor((acc + 8) / 16)
+        smooth = convolution.my_convolution(strip, gauss, separable=False, method='spatial')
+        return convolution.my_convolution(smooth, lap, separable=False, method='spatial')
+    res[:2] = two_pass(image[:4])[:2]
+    res[-2:] = two_pass(image[-4:])[-2:]
+    res[:, :2] = two_pass(image[:, :4])[:, :2]
+    res[:, -2:] = two_pass(image[:, -4:])[:, -2:]
     return res
 
+def apply_log(image, method='4n_neg', sigma=None, approx='auto'):
+    """
+    LoG -> |.| cat ve uint8.
+    - sigma=None: Gaussian 3x3 + Laplace 'method' gop thanh 1 kernel 5x5, 1 lan tich chap,
+      khong cat uint8 o buoc trung gian. Vien 2 pixel tinh lai theo 2 luot (lam tron roi Laplace,
+      padding 0 moi luot) nen giong ban 2 luot cu, chi khac phan lam tron trung gian.
+    - sigma: LoG chuan hoa theo thang voi sigma tuy y (xem log_filter); 'method' khong dung.
+    """
+    if sigma is not None:
+        res = log_filter(image, sigma, approx)
+    else:
+        if f'laplace{method}' not in _KERNELS:
+            raise ValueError(f"Unknown method {method}")
+        kernel = _fused_log_kernel(method)
+        if image.dtype == np.uint8:
+            # Kernel nguyen / 16: tich luy so nguyen, lam tron gan nhat
+            res = convolution.integer_convolution(image, kernel, rounding='nearest')
+        else:
+            res = convolution.my_convolution(image, kernel)
+        _log_border(image, method, res)
+    return np.clip(np.abs(res), 0, 255).astype(np.uint8)
+
 def apply_smooth_sobel(image):
 
     smooth = apply_gaussian_smooth(image)
     res = edge_detection.apply_sobel(smooth)
     return res
 
-def apply_sharpening(image, method='4n_neg'):
-    kernels = get_kernels()
-    k_name = f'laplace{method}'
-    kernel = kernels.get(k_name)
-    
-    # Raw convolution result (can be negative)
-    laplace_res = convolution.my_convolution(image, kernel)
-    
-    img_float = image.astype(float)
-    
-    if 'neg' in method:
-        # Subtract
-        sharpened = img_float - laplace_res
-    else:
-        # Add
-        sharpened = img_float + laplace_res
-        
-    result = np.clip(sharpened, 0, 255).astype(np.uint8)
-    return result
+def _sharpen_kernel(method):
+    # Anh -/+ Laplace gop thanh 1 kernel: 'neg' (tam am) -> identity - L, 'pos' -> identity + L
+    lap = _KERNELS.get(f'laplace{method}')
+    if lap is None:
+        raise ValueError(f"Unknown method {method}")
+    def build():
+        k = -lap if 'neg' in method else lap.copy()
+        k[1, 1] += 1
+        return k
+    return kernel_cache.prepare('sharpen', lap, build)
+
+def apply_sharpening(image, method='4n_neg', out=None):
+    """
+    Lam net bang Laplace: 1 lan tich chap voi kernel identity -/+ Laplace, cat 0..255 va ghi
+    thang vao out (uint8, tuy chon). Anh xam hoac RGB (H, W, 3).
+    """
+    return convolution.saturate_convolution(image, _sharpen_kernel(method), out=out)
+
+def unsharp_mask(image, amount=1.0, radius=1.0, threshold=0, out=None):
+    """
+    Unsharp mask: anh + amount * (anh - Gaussian(radius)), chi ap dung o pixel co
+    |anh - mo| >= threshold. Lam tron gan nhat, cat 0..255, ghi vao out (uint8, tuy chon).
+    Anh xam hoac RGB (H, W, 3). Khong co bo dem float ca anh: ca 2 luot mo va phep tinh con lai
+    chay theo khoi hang (khoi doc kem vien 'reflect'), bo dem luot ngang dung lai giua cac khoi.
+    Anh mo dung bien 'reflect': padding 0 lam mo toi o vien va anh net bi khung sang bao hoa.
+    """
+    if not (np.isfinite(radius) and radius > 0):
+        raise ValueError("radius phai > 0")
+    if not np.isfinite(amount):
+        raise ValueError("amount phai la so huu han")
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+    if image.dtype != np.uint8:
+        image = image.astype(float, copy=False)
+    g = gaussian_kernel_1d(radius)
+    top, bottom = border.kernel_margins(len(g), 1)[:2]
+    buf = np.empty((min(_ROWS, image.shape[0]),) + image.shape[1:], dtype=float)
+
+    for r0 in range(0, image.shape[0], _ROWS):
+        r1 = min(r0 + _ROWS, image.shape[0])
+        src = image[r0:r1]
+        # Luot doc tren khoi co vien: cac hang [top, top + (r1 - r0)) chi dung hang trong khoi
+        window = border.read_window(image, r0 - top, r1 + bottom, 0, image.shape[1], 'reflect')
+        tmp = convolution.correlate_1d(window, g, 0, 'reflect')[top:top + r1 - r0]
+        d = convolution.correlate_1d(tmp, g, 1, 'reflect', out=buf[:r1 - r0])
+        np.subtract(src, d, out=d)
+        if threshold:
+            d[np.abs(d) < threshold] = 0
+        d *= amount
+        d += src
+        np.rint(d, out=d)
+        np.clip(d, 0, 255, out=d)
+        out[r0:r1] = d
+    return out
@@ -1,8 +1,15 @@
 import numpy as np
 
+from features import gradient, parallel
 
-def compute_metrics_from_array(arr: np.ndarray):
-    """Tính 4 chỉ số: độ sáng, độ tương phản, entropy, độ sắc nét"""
+
+def _sobel_magnitude_block(block):
+    """Độ lớn gradient Sobel (toán tử gradient hợp nhất, float64) trên một dải ảnh đã có viền 1 pixel."""
+    return gradient.gradient(block, ('magnitude',), 'sobel', mode='edge', dtype=np.float64)['magnitude']
+
+
+def compute_metrics_from_array(arr: np.ndarray, workers=None):
+    """Tính 4 chỉ số: độ sáng, độ tương phản, entropy, độ sắc nét (Sobel chạy song song theo dải)"""
     a = np.asarray(arr, dtype=float)
 
     mean = float(np.mean(a)) # Độ sáng của ảnh
@@ -20,21 +27,9 @@ def compute_metrics_from_array(arr: np.ndarray):
     entropy = float(-(probs * np.log2(probs)).sum()) # Tính entropy
 
     # Laplacian
-    sobel_x = np.array([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]], float)
-    sobel_y = np.array([[-1, -2, -1], [0, 0, 0], [1, 2, 1]], float)
-    pad = np.pad(a, pad_width=1, mode='edge')
-
-    h, w = a.shape
-    gx = np.zeros_like(a)
-    gy = np.zeros_like(a)
-
-    for y in range(h):
-        for x in range(w):
-            region = pad[y:y+3, x:x+3]
-            gx[y, x] = np.sum(region * sobel_x)
-            gy[y, x] = np.sum(region * sobel_y)
+    sobel_mag = parallel.parallel_apply(a, _sobel_magnitude_block, 1, workers=workers, mode='edge')
 
-    sharpness = float(np.mean(np.sqrt(gx**2 + gy**2))) # Độ sắc nét
+    sharpness = float(np.mean(sobel_mag)) # Độ sắc nét
 
     return {
         "mean": mean,
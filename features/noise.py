@@ -1,60 +1,317 @@
 import numpy as np
 from PIL import Image
 
-def add_salt_and_pepper_noise(image, salt_ratio=0.02, pepper_ratio=0.02):
+from features import border, summed_area
+
+def _finish(arr, noisy):
+    # Anh nguyen: lam tron va cat ve mien gia tri cua kieu (uint8: 0..255); anh thuc giu nguyen
+    if np.issubdtype(arr.dtype, np.integer):
+        info = np.iinfo(arr.dtype)
+        np.rint(noisy, out=noisy)
+        np.clip(noisy, info.min, info.max, out=noisy)
+        return noisy.astype(arr.dtype)
+    return noisy
+
+def _work(arr):
+    # Anh uint8/uint16: tinh bang float32 (du chinh xac, nhanh hon); con lai float64
+    return np.float32 if arr.dtype in (np.uint8, np.uint16) else np.float64
+
+def salt_and_pepper(arr, salt_ratio=0.02, pepper_ratio=0.02, seed=None, channel_axis=None, low=0, high=255):
+    """
+    Nhieu muoi tieu tren mang bat ky (anh xam, RGB, chong anh (N, H, W[, C])): moi phan tu thanh
+    high voi xac suat salt_ratio, low voi xac suat pepper_ratio (doc lap, khong trung nhau).
+    channel_axis: truc kenh mau - ca pixel (moi kenh) cung bi muoi/tieu. seed: so nguyen,
+    None hoac np.random.Generator.
+    """
+    arr = np.asarray(arr)
+    rng = np.random.default_rng(seed)
+    shape = list(arr.shape)
+    if channel_axis is not None:
+        shape[channel_axis] = 1
+    u = rng.random(shape, dtype=np.float32)
+    out = arr.copy()
+    np.copyto(out, np.asarray(high, dtype=arr.dtype), where=u < salt_ratio)
+    np.copyto(out, np.asarray(low, dtype=arr.dtype), where=u >= 1 - pepper_ratio)
+    return out
+
+def gaussian_noise(arr, sigma=10.0, mean=0.0, seed=None):
+    """Cong nhieu Gauss N(mean, sigma^2) doc lap cho moi phan tu (moi kenh, moi anh trong chong)."""
+    arr = np.asarray(arr)
+    rng = np.random.default_rng(seed)
+    dtype = _work(arr)
+    noisy = rng.standard_normal(arr.shape, dtype=dtype)
+    noisy *= sigma
+    noisy += mean
+    noisy += arr
+    return _finish(arr, noisy)
+
+def poisson_noise(arr, scale=1.0, seed=None):
+    """
+    Nhieu luong tu (shot noise): gia tri moi ~ Poisson(arr * scale) / scale.
+    scale lon (nhieu photon tren 1 muc xam) thi nhieu nho.
+    """
+    arr = np.asarray(arr)
+    rng = np.random.default_rng(seed)
+    lam = np.multiply(arr, scale, dtype=np.float64)
+    noisy = rng.poisson(np.maximum(lam, 0)).astype(_work(arr))
+    noisy /= scale
+    return _finish(arr, noisy)
+
+def speckle_noise(arr, sigma=0.1, seed=None):
+    """Nhieu nhan (speckle): arr * (1 + n), n ~ N(0, sigma^2)."""
+    arr = np.asarray(arr)
+    rng = np.random.default_rng(seed)
+    noisy = rng.standard_normal(arr.shape, dtype=_work(arr))
+    noisy *= sigma
+    noisy += 1
+    noisy *= arr
+    return _finish(arr, noisy)
+
+def uniform_noise(arr, low=-10.0, high=10.0, seed=None):
+    """Cong nhieu deu U(low, high) doc lap cho moi phan tu."""
+    arr = np.asarray(arr)
+    rng = np.random.default_rng(seed)
+    noisy = rng.random(arr.shape, dtype=_work(arr))
+    noisy *= high - low
+    noisy += low
+    noisy += arr
+    return _finish(arr, noisy)
+
+NOISE_FUNCS = {
+    'salt_and_pepper': salt_and_pepper,
+    'gaussian': gaussian_noise,
+    'poisson': poisson_noise,
+    'speckle': speckle_noise,
+    'uniform': uniform_noise,
+}
+
+def noisy_variants(arr, count, kind='gaussian', seed=None, **params):
+    """
+    count ban nhieu khac nhau cua cung mot anh trong 1 lan goi: mang (count,) + arr.shape.
+    Cung seed -> cung ket qua. params truyen cho ham nhieu tuong ung trong NOISE_FUNCS
+    (voi salt_and_pepper, channel_axis tinh theo arr - khong tinh truc count).
+    """
+    arr = np.asarray(arr)
+    stack = np.broadcast_to(arr, (count,) + arr.shape)
+    if params.get('channel_axis') is not None:
+        params['channel_axis'] = params['channel_axis'] % arr.ndim + 1
+    return NOISE_FUNCS[kind](stack, seed=seed, **params)
+
+def add_salt_and_pepper_noise(image, salt_ratio=0.02, pepper_ratio=0.02, seed=None):
     if image.mode != 'L':
         image = image.convert('L')
     
     arr = np.array(image)
     noisy_arr = arr.copy()
+    rng = np.random.default_rng(seed)
     
     h, w = arr.shape
     num_pixels = h * w
     
+    # Chi so trong [0, n) (ca hang/cot cuoi)
     num_salt = int(num_pixels * salt_ratio)
-    coords_salt = [np.random.randint(0, i - 1, num_salt) for i in arr.shape]
+    coords_salt = [rng.integers(0, i, num_salt) for i in arr.shape]
     noisy_arr[tuple(coords_salt)] = 255
     
     num_pepper = int(num_pixels * pepper_ratio)
-    coords_pepper = [np.random.randint(0, i - 1, num_pepper) for i in arr.shape]
+    coords_pepper = [rng.integers(0, i, num_pepper) for i in arr.shape]
     noisy_arr[tuple(coords_pepper)] = 0
     
     return Image.fromarray(noisy_arr)
 
+# Tu kich thuoc cua so nay, anh uint8 dung median histogram (chi phi/pixel khong phu thuoc size);
+# cua so nho hon thi sap xep truc tiep van nhanh hon (do bang benchmarks/bench_median.py)
+HISTOGRAM_MEDIAN_MIN_SIZE = 9
+
+def _margins(size):
+    # Cua so size x size bat dau tai i - size//2 (giong np.pad(pad, pad) roi lay [i:i+size])
+    return border.kernel_margins(size, size)
+
+def average_filter_array(arr, size=3):
+    """
+    Loc trung binh tren mang 2D, padding reflect; tra ve mang float cung kich thuoc.
+    Dung bang tong tich luy (features.summed_area): chi phi moi pixel khong phu thuoc size.
+    """
+    return summed_area.window_mean(arr, size, 'reflect')
+
 def apply_average_filter(image, size=3):
     if image.mode != 'L':
         image = image.convert('L')
-        
-    arr = np.array(image, dtype=float)
-    h, w = arr.shape
-    pad = size // 2
-    
-    padded = np.pad(arr, ((pad, pad), (pad, pad)), mode='reflect')
-    output = np.zeros_like(arr)
-    
-    kernel_size = size * size
-    
-    for i in range(h):
-        for j in range(w):
-            region = padded[i:i+size, j:j+size]
-            output[i, j] = np.sum(region) / kernel_size
-            
+
+    # Giu uint8 de tich luy chinh xac bang int64
+    output = average_filter_array(np.array(image), size)
+
     return Image.fromarray(output.astype(np.uint8))
 
+def _histogram_median(arr, size):
+    """
+    Trung vi cua so size x size cho anh uint8 theo kieu Perreault-Hebert, quet tung hang:
+    - moi cot giu histogram 256 bin (va 16 bin tho) cua size hang trong cua so;
+      xuong 1 hang chi bot hang cu / them hang moi (-1/+1 moi cot);
+    - histogram cua so = hieu tong tich luy theo cot (uint16: phep tru tran so van dung
+      vi moi bin dem <= size^2);
+    - tim hang 2 muc: bin tho (16) roi 16 bin min trong bin tho do.
+    Chi phi moi pixel khong phu thuoc size. Bien reflect (doc tung hang qua border.read_window).
+    Ket qua float, giong median_filter_array (size chan: trung binh 2 gia tri giua).
+    """
+    H, W = arr.shape
+    top, bottom, left, right = _margins(size)
+    Wp = W + size - 1
+    cols = np.arange(Wp)
+    j = np.arange(W)
+    fine_bins = np.arange(16)[:, None]
+
+    def row(r):
+        return border.read_window(arr, r, r + 1, -left, W + right, 'reflect')[0]
+
+    # Histogram dang (bin, cot) de tong tich luy chay theo truc lien tuc
+    hist = np.zeros((256, Wp), dtype=np.uint16)
+    coarse = np.zeros((16, Wp), dtype=np.uint16)
+    C = np.zeros((256, Wp + 1), dtype=np.uint16)
+    Cc = np.zeros((16, Wp + 1), dtype=np.uint16)
+
+    def select(rank):
+        # Gia tri hang `rank` (0-based) cua tung cua so
+        cc = np.cumsum(Cc[:, size:size + W] - Cc[:, :W], axis=0, dtype=np.uint16)
+        b = (cc <= rank).sum(axis=0)
+        before = np.where(b > 0, cc[b - 1, j], 0)
+        bins = b * 16 + fine_bins
+        fc = np.cumsum(C[bins, j + size] - C[bins, j], axis=0, dtype=np.uint16)
+        return b * 16 + (fc <= rank - before).sum(axis=0)
+
+    n = size * size
+    out = np.empty((H, W), dtype=float)
+    for r in range(-top, bottom + 1):
+        v = row(r)
+        hist[v, cols] += 1
+        coarse[v >> 4, cols] += 1
+
+    for i in range(H):
+        if i:
+            v = row(i - top - 1)
+            hist[v, cols] -= 1
+            coarse[v >> 4, cols] -= 1
+            v = row(i + bottom)
+            hist[v, cols] += 1
+            coarse[v >> 4, cols] += 1
+        np.cumsum(hist, axis=1, out=C[:, 1:])
+        np.cumsum(coarse, axis=1, out=Cc[:, 1:])
+        if n % 2:
+            out[i] = select(n // 2)
+        else:
+            out[i] = (select(n // 2 - 1) + select(n // 2)) / 2
+    return out
+
+def median_filter_array(arr, size=3):
+    """
+    Loc trung vi tren mang 2D, padding reflect; tra ve mang float cung kich thuoc.
+    Anh uint8 voi size >= HISTOGRAM_MEDIAN_MIN_SIZE dung _histogram_median (cung ket qua).
+    """
+    arr = np.asarray(arr)
+    if arr.dtype == np.uint8 and size >= HISTOGRAM_MEDIAN_MIN_SIZE:
+        return _histogram_median(arr, size)
+    arr = arr.astype(float, copy=False)
+
+    def valid_median(block, out):
+        h, w = out.shape
+        # Xu ly theo khoi hang de bo nho tam (rows * w * size^2) khong qua lon
+        rows = max(1, (1 << 22) // max(1, w * size * size))
+        for i0 in range(0, h, rows):
+            i1 = min(i0 + rows, h)
+            windows = np.lib.stride_tricks.sliding_window_view(block[i0:i1 + size - 1, :w + size - 1], (size, size))
+            out[i0:i1] = np.median(windows, axis=(-2, -1))
+
+    return border.filter_same(arr, valid_median, _margins(size), 'reflect')
+
+# Median thich nghi: pixel cuc tri lech khoi trung vi 3x3 cua no qua nguong nay moi coi la nhieu xung
+# (vung chay sang/toi that thi trung vi lan can cung la cuc tri)
+IMPULSE_TOLERANCE = 40
+
+def _neighbours(r, c, size, rmap, cmap, pad):
+    # Chi so (hang, cot) cua cua so size x size quanh cac pixel (r, c), dang (K, size, size);
+    # rmap/cmap: chi so phan chieu cua [-pad, n + pad)
+    off = np.arange(size) - size // 2
+    rr = rmap[(r[:, None] + off + pad)[:, :, None]]
+    cc = cmap[(c[:, None] + off + pad)[:, None, :]]
+    return rr, cc
+
+def detect_impulses(arr, low=0, high=255, tolerance=IMPULSE_TOLERANCE):
+    """
+    Mask nhieu xung (muoi tieu): pixel bang low/high va lech khoi trung vi cua so 3x3 quanh no
+    hon tolerance. Chi cac pixel cuc tri moi duoc tinh trung vi lan can.
+    """
+    arr = np.asarray(arr)
+    H, W = arr.shape
+    mask = (arr == low) | (arr == high)
+    idx = np.flatnonzero(mask)
+    if not idx.size:
+        return mask
+    rmap, _ = border.map_indices(-1, H + 1, H, 'reflect')
+    cmap, _ = border.map_indices(-1, W + 1, W, 'reflect')
+    r, c = np.divmod(idx, W)
+    rr, cc = _neighbours(r, c, 3, rmap, cmap, 1)
+    med = np.median(arr[rr, cc].reshape(idx.size, 9), axis=1)
+    mask.flat[idx[np.abs(arr.flat[idx] - med) <= tolerance]] = False
+    return mask
+
+def adaptive_median_filter_array(arr, max_size=7, mask=None):
+    """
+    Median thich nghi chi tren pixel nhieu (mask, mac dinh detect_impulses): voi moi pixel nhieu,
+    lay trung vi cac pixel KHONG nhieu trong cua so 3x3; neu khong co thi mo rong 5x5, 7x7, ...
+    toi max_size (van khong co: trung vi ca cua so). Pixel con lai giu nguyen.
+    Chi phi ti le voi so pixel nhieu, khong phai dien tich anh. Ket qua cung kieu voi arr.
+    """
+    arr = np.asarray(arr)
+    H, W = arr.shape
+    if mask is None:
+        mask = detect_impulses(arr)
+    out = arr.copy()
+    todo = np.flatnonzero(mask)
+    pad = max_size // 2
+    rmap, _ = border.map_indices(-pad, H + pad, H, 'reflect')
+    cmap, _ = border.map_indices(-pad, W + pad, W, 'reflect')
+    integer = np.issubdtype(arr.dtype, np.integer)
+
+    for size in range(3, max_size + 1, 2):
+        if not todo.size:
+            break
+        last = size + 2 > max_size
+        n = size * size
+        chunk = max(1, (1 << 22) // n)
+        left = []
+        for k0 in range(0, todo.size, chunk):
+            idx = todo[k0:k0 + chunk]
+            r, c = np.divmod(idx, W)
+            rr, cc = _neighbours(r, c, size, rmap, cmap, pad)
+            vals = arr[rr, cc].reshape(idx.size, n).astype(np.float64)
+            if last:
+                valid = np.full(idx.size, n)
+            else:
+                bad = mask[rr, cc].reshape(idx.size, n)
+                valid = n - bad.sum(axis=1)
+                vals[bad] = np.inf
+            vals.sort(axis=1)
+            done = valid > 0
+            rows = np.flatnonzero(done)
+            lo = vals[rows, (valid[rows] - 1) // 2]
+            hi = vals[rows, valid[rows] // 2]
+            med = (lo + hi) / 2
+            out.flat[idx[rows]] = np.floor(med) if integer else med
+            left.append(idx[~done])
+        todo = np.concatenate(left)
+    return out
+
+def apply_adaptive_median_filter(image, max_size=7):
+    if image.mode != 'L':
+        image = image.convert('L')
+
+    return Image.fromarray(adaptive_median_filter_array(np.array(image), max_size))
+
 def apply_median_filter(image, size=3):
     if image.mode != 'L':
         image = image.convert('L')
-        
-    arr = np.array(image, dtype=float)
-    h, w = arr.shape
-    pad = size // 2
-    
-    padded = np.pad(arr, ((pad, pad), (pad, pad)), mode='reflect')
-    output = np.zeros_like(arr)
-    
-    for i in range(h):
-        for j in range(w):
-            region = padded[i:i+size, j:j+size]
-            output[i, j] = np.median(region)
-            
+
+    # Giu uint8 de dung duoc median histogram
+    output = median_filter_array(np.array(image), size)
+
     return Image.fromarray(output.astype(np.uint8))
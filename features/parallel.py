@@ -0,0 +1,120 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from features import border, convolution, noise
+
+
+def _strip_bounds(H, n_strips):
+    """Chia H hang thanh n_strips dai lien tiep (r0, r1)."""
+    n_strips = max(1, min(n_strips, H))
+    edges = np.linspace(0, H, n_strips + 1).astype(int)
+    return [(int(edges[i]), int(edges[i + 1])) for i in range(n_strips)]
+
+
+def _run_strip(func, src, out, r0, r1, halo, mode, cval):
+    # Doc dai hang co vien (halo) tu src, chi ghi phan loi vao out
+    top, bottom, left, right = halo
+    W = src.shape[1]
+    block = border.read_window(src, r0 - top, r1 + bottom, -left, W + right, mode, cval)
+    res = func(block)
+    out[r0:r1] = res[top:top + (r1 - r0), left:left + W]
+
+
+def _process_worker(func, src_spec, out_spec, r0, r1, halo, mode, cval):
+    # Worker chi nhan ten vung shared memory, khong nhan (pickle) ca mang anh
+    src_shm = shared_memory.SharedMemory(name=src_spec[0])
+    out_shm = shared_memory.SharedMemory(name=out_spec[0])
+    try:
+        src = np.ndarray(src_spec[1], dtype=src_spec[2], buffer=src_shm.buf)
+        out = np.ndarray(out_spec[1], dtype=out_spec[2], buffer=out_shm.buf)
+        _run_strip(func, src, out, r0, r1, halo, mode, cval)
+        del src, out
+    finally:
+        src_shm.close()
+        out_shm.close()
+
+
+def parallel_apply(src, func, halo, out_dtype=None, workers=None, backend='thread',
+                   strips=None, mode='constant', cval=0):
+    """
+    Chia anh thanh cac dai hang co vien chong lap (halo) va chay func song song.
+    - func(block) tra ve mang cung kich thuoc block (giong tiled.tiled_apply).
+    - backend: 'thread' (numpy nha GIL trong phep tinh mang) hoac 'process'
+      (anh vao/ra nam trong multiprocessing.shared_memory; func phai pickle duoc).
+    - workers: so luong worker, mac dinh os.cpu_count(); strips: so dai, mac dinh = workers.
+    """
+    if np.isscalar(halo):
+        halo = (halo, halo, halo, halo)
+    workers = workers or os.cpu_count() or 1
+    src = np.asarray(src)
+    out_dtype = np.dtype(out_dtype or src.dtype)
+    H = src.shape[0]
+    bounds = _strip_bounds(H, strips or workers)
+
+    if workers == 1:
+        out = np.empty(src.shape, dtype=out_dtype)
+        for r0, r1 in bounds:
+            _run_strip(func, src, out, r0, r1, halo, mode, cval)
+        return out
+
+    if backend == 'thread':
+        out = np.empty(src.shape, dtype=out_dtype)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = [ex.submit(_run_strip, func, src, out, r0, r1, halo, mode, cval) for r0, r1 in bounds]
+            for f in futures:
+                f.result()
+        return out
+
+    if backend != 'process':
+        raise ValueError(f"Unknown backend {backend}")
+
+    src_shm = shared_memory.SharedMemory(create=True, size=max(1, src.nbytes))
+    out_shm = shared_memory.SharedMemory(create=True, size=max(1, src.size * out_dtype.itemsize))
+    try:
+        shared_src = np.ndarray(src.shape, dtype=src.dtype, buffer=src_shm.buf)
+        shared_src[...] = src
+        src_spec = (src_shm.name, src.shape, src.dtype.str)
+        out_spec = (out_shm.name, src.shape, out_dtype.str)
+
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = [ex.submit(_process_worker, func, src_spec, out_spec, r0, r1, halo, mode, cval)
+                       for r0, r1 in bounds]
+            for f in futures:
+                f.result()
+
+        out = np.ndarray(src.shape, dtype=out_dtype, buffer=out_shm.buf).copy()
+        del shared_src
+        return out
+    finally:
+        src_shm.close()
+        src_shm.unlink()
+        out_shm.close()
+        out_shm.unlink()
+
+
+def parallel_convolution(image, kernel, workers=None, backend='thread'):
+    """my_convolution (padding 0) chay song song theo dai hang."""
+    kernel = np.asarray(kernel)
+    kh, kw = kernel.shape
+    out_dtype = float if image.dtype == np.uint8 else image.dtype
+    func = partial(convolution.my_convolution, kernel=kernel)
+    return parallel_apply(image, func, (kh // 2, kh // 2, kw // 2, kw // 2), out_dtype=out_dtype,
+                          workers=workers, backend=backend, mode='constant')
+
+
+def parallel_average_filter(arr, size=3, workers=None, backend='thread'):
+    """noise.average_filter_array (padding reflect) chay song song, tra ve float."""
+    func = partial(noise.average_filter_array, size=size)
+    return parallel_apply(np.asarray(arr, dtype=float), func, size // 2, workers=workers,
+                          backend=backend, mode='reflect')
+
+
+def parallel_median_filter(arr, size=3, workers=None, backend='thread'):
+    """noise.median_filter_array (padding reflect) chay song song, tra ve float."""
+    func = partial(noise.median_filter_array, size=size)
+    return parallel_apply(np.asarray(arr, dtype=float), func, size // 2, workers=workers,
+                          backend=backend, mode='reflect')
@@ -0,0 +1,201 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from features import border
+
+# Kernel nhi thuc 5 diem [1, 4, 6, 4, 1] / 16 (Burt & Adelson), tach duoc theo hang va cot
+BINOMIAL_5 = np.array([1, 4, 6, 4, 1]) / 16.0
+BINOMIAL_5.flags.writeable = False
+
+# Bien cua reduce/expand: phan chieu (khong tao vien toi nhu padding 0)
+MODE = 'reflect'
+
+# Dung xay them tang khi canh ngan nhat nho hon gia tri nay
+MIN_SIZE = 8
+
+# So anh giu kim tu thap trong cache (thuong chi can anh dang mo)
+MAX_CACHED_IMAGES = 2
+
+
+def _taps(n, stride, offsets, n_out):
+    # Chi so (da phan chieu) cua diem stride*i + offset tren truc dai n, cho tung offset
+    base = stride * np.arange(n_out)
+    out = []
+    for off in offsets:
+        lo = base[0] + off
+        idx, _ = border.map_indices(lo, lo + stride * (n_out - 1) + 1, n, MODE)
+        out.append(idx[::stride])
+    return out
+
+
+def _reduce_axis(x, axis, dtype):
+    # Tong co trong so [1, 4, 6, 4, 1] (chua chia 16) tai cac diem chan 2i cua truc axis.
+    # Phan trong dung lat cat buoc 2 (view); chi vai diem sat bien doc qua chi so phan chieu.
+    x = np.moveaxis(x, axis, 0)
+    n = x.shape[0]
+    m = (n + 1) // 2
+    out = np.empty((m,) + x.shape[1:], dtype=dtype)
+
+    lo, hi = 1, (n - 3) // 2 + 1   # 2i - 2 >= 0 va 2i + 2 <= n - 1
+    if hi > lo:
+        def tap(k):
+            return x[2 * lo + k:2 * (hi - 1) + k + 1:2]
+        o = out[lo:hi]
+        np.add(tap(-2), tap(2), out=o, dtype=dtype)
+        t = np.add(tap(-1), tap(1), dtype=dtype)
+        t *= 4
+        o += t
+        o += np.multiply(tap(0), 6, dtype=dtype)
+    else:
+        lo = hi = m
+
+    edge = np.r_[0:lo, hi:m]
+    if edge.size:
+        acc = np.zeros((edge.size,) + x.shape[1:], dtype=dtype)
+        for c, off in zip((1, 4, 6, 4, 1), range(-2, 3)):
+            idx = np.array([border.map_indices(2 * i + off, 2 * i + off + 1, n, MODE)[0][0] for i in edge])
+            acc += np.multiply(x[idx], c, dtype=dtype)
+        out[edge] = acc
+    return np.moveaxis(out, 0, axis)
+
+
+def reduce(image, dtype=np.float32):
+    """
+    Mot tang Gaussian: loc [1, 4, 6, 4, 1]/16 theo cot roi theo hang, lay 1/2 moi chieu.
+    Chi tinh tai cac hang/cot duoc giu (khong loc ca anh roi bo 3/4). Ho tro anh (H, W, C).
+    Ket qua kich thuoc ((H + 1) // 2, (W + 1) // 2), kieu dtype; anh uint8 voi dtype=np.uint8
+    tich luy chinh xac bang uint16 (tong <= 255 * 256) roi lam tron gan nhat.
+    """
+    if np.dtype(dtype) == np.uint8:
+        if image.dtype != np.uint8:
+            raise ValueError("dtype=uint8 chi dung cho anh uint8")
+        acc = _reduce_axis(_reduce_axis(image, 0, np.uint16), 1, np.uint16)
+        acc += 128
+        acc >>= 8
+        return acc.astype(np.uint8)
+
+    out = _reduce_axis(_reduce_axis(image, 0, dtype), 1, dtype)
+    out *= 1 / 256
+    return out
+
+
+def _expand_axis(image, n, axis, dtype):
+    # Noi suy x2 theo 1 truc toi do dai n (dang polyphase cua chen 0 + loc 2 * BINOMIAL_5):
+    # diem chan 2i = (g[i-1] + 6 g[i] + g[i+1]) / 8, diem le 2i+1 = (g[i] + g[i+1]) / 2
+    m = image.shape[axis]
+    shape = list(image.shape)
+    shape[axis] = n
+    out = np.empty(shape, dtype=dtype)
+
+    def at(idx):
+        return np.take(image, idx, axis=axis).astype(dtype, copy=False)
+
+    def put(start, value):
+        sl = [slice(None)] * image.ndim
+        sl[axis] = slice(start, None, 2)
+        out[tuple(sl)] = value
+
+    n_even, n_odd = (n + 1) // 2, n // 2
+    prev, cur, nxt = _taps(m, 1, (-1, 0, 1), n_even)
+    put(0, (at(prev) + 6 * at(cur) + at(nxt)) / 8)
+    if n_odd:
+        cur, nxt = _taps(m, 1, (0, 1), n_odd)
+        put(1, (at(cur) + at(nxt)) / 2)
+    return out
+
+
+def expand(image, shape, dtype=np.float32):
+    """Phong to x2 (nguoc voi reduce) toi kich thuoc shape = (H, W) cua tang tren."""
+    tmp = _expand_axis(image, shape[0], 0, dtype)
+    return _expand_axis(tmp, shape[1], 1, dtype)
+
+
+def num_levels(shape, min_size=MIN_SIZE):
+    """So tang toi da cho den khi canh ngan nhat < min_size."""
+    n, size = 1, min(shape[:2])
+    while (size + 1) // 2 >= min_size:
+        size = (size + 1) // 2
+        n += 1
+    return n
+
+
+def gaussian_pyramid(image, levels=None, dtype=np.float32):
+    """Danh sach [G0, G1, ...]: G0 la anh goc (kieu dtype), G(k+1) = reduce(Gk)."""
+    levels = levels or num_levels(image.shape)
+    pyr = [np.asarray(image, dtype=dtype)]
+    for _ in range(levels - 1):
+        pyr.append(reduce(pyr[-1], dtype))
+    return pyr
+
+
+def laplacian_pyramid(image, levels=None, dtype=np.float32):
+    """
+    Danh sach [L0, ..., L(n-2), G(n-1)] voi Lk = Gk - expand(G(k+1)).
+    Tang cuoi la tang Gaussian tho nhat; reconstruct() khoi phuc lai anh goc.
+    """
+    gauss = gaussian_pyramid(image, levels, dtype)
+    pyr = [g - expand(gauss[k + 1], g.shape, dtype) for k, g in enumerate(gauss[:-1])]
+    pyr.append(gauss[-1])
+    return pyr
+
+
+def reconstruct(pyr, dtype=np.float32):
+    """Khoi phuc anh tu kim tu thap Laplace: G(k) = Lk + expand(G(k+1)), tu tang tho len."""
+    img = pyr[-1]
+    for lap in reversed(pyr[:-1]):
+        img = lap + expand(img, lap.shape, dtype)
+    return img
+
+
+_cache = OrderedDict()
+
+
+def get_level(image, level):
+    """
+    Tang Gaussian thu level cua image (mang hoac anh PIL), cache theo doi tuong anh (anh dang mo):
+    cac tang chi duoc tinh khi can va dung lai cho cac lan xem truoc sau.
+    Anh da sua tai cho phai goi clear_cache(). Ket qua chi doc.
+    """
+    key = id(image)
+    entry = _cache.get(key)
+    if entry is None or entry[0] is not image:
+        # View chi doc: khong doi co writeable cua mang cua nguoi goi
+        base = np.asarray(image).view()
+        base.flags.writeable = False
+        entry = (image, [base])
+        _cache[key] = entry
+        while len(_cache) > MAX_CACHED_IMAGES:
+            _cache.popitem(last=False)
+    _cache.move_to_end(key)
+
+    pyr = entry[1]
+    while len(pyr) <= level:
+        # Anh 8-bit giu cac tang uint8 (tich luy so nguyen), con lai float32
+        nxt = reduce(pyr[-1], np.uint8 if pyr[0].dtype == np.uint8 else np.float32)
+        nxt.flags.writeable = False
+        pyr.append(nxt)
+    return pyr[level]
+
+
+def preview_level(shape, max_size):
+    """Tang tho nhat ma van lon hon (hoac bang) max_size = (H, W) o ca 2 chieu."""
+    H, W = shape[:2]
+    level = 0
+    while (H + 1) // 2 >= max_size[0] and (W + 1) // 2 >= max_size[1] and min(H, W) > 1:
+        H, W = (H + 1) // 2, (W + 1) // 2
+        level += 1
+    return level
+
+
+def preview(image, max_size, func=None):
+    """
+    Xem truoc tren tang tho: lay tang vua du lon cho max_size (tu cache), roi ap func neu co.
+    Dung cho hien thi va cho bo loc nang; goi lai func tren anh goc khi can ket qua day du.
+    """
+    low = get_level(image, preview_level(get_level(image, 0).shape, max_size))
+    return low if func is None else func(low)
+
+
+def clear_cache():
+    _cache.clear()
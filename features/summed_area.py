@@ -0,0 +1,96 @@
+import numpy as np
+
+from features import border
+
+
+def _acc_dtype(dtype):
+    # Anh nguyen/bool cong bang int64 (chinh xac tuyet doi), con lai float64
+    dtype = np.dtype(dtype)
+    if dtype == np.bool_ or np.issubdtype(dtype, np.integer):
+        return np.dtype(np.int64)
+    return np.dtype(np.float64)
+
+
+def _window(size):
+    # size: so nguyen (cua so vuong) hoac (kh, kw)
+    if np.ndim(size) == 0:
+        return int(size), int(size)
+    kh, kw = size
+    return int(kh), int(kw)
+
+
+def table(arr, dtype=None):
+    """
+    Bang tong tich luy (integral image) kich thuoc (H + 1, W + 1), hang/cot 0 bang 0:
+    T[i, j] = tong arr[:i, :j]. dtype mac dinh: int64 cho anh nguyen, float64 cho anh thuc.
+    """
+    arr = np.asarray(arr)
+    dtype = dtype or _acc_dtype(arr.dtype)
+    H, W = arr.shape[:2]
+    T = np.zeros((H + 1, W + 1) + arr.shape[2:], dtype=dtype)
+    np.cumsum(arr, axis=0, dtype=dtype, out=T[1:, 1:])
+    np.cumsum(T[1:, 1:], axis=1, out=T[1:, 1:])
+    return T
+
+
+def _corners(T, kh, kw, out):
+    # Tong cua so kh x kw bat dau tai (i, j) = 4 goc cua bang (chi lat cat, khong gather)
+    h, w = out.shape[:2]
+    np.subtract(T[kh:kh + h, kw:kw + w], T[:h, kw:kw + w], out=out)
+    out -= T[kh:kh + h, :w]
+    out += T[:h, :w]
+    return out
+
+
+def window_sum(arr, size, mode='reflect', cval=0, dtype=None):
+    """
+    Tong tren cua so size x size (hoac (kh, kw)) quanh moi pixel, ket qua cung kich thuoc anh.
+    Chi phi moi pixel khong doi theo kich thuoc cua so. Bien theo mode (xem features.border).
+    dtype (bo tich luy va ket qua): mac dinh int64 cho anh nguyen, float64 cho anh thuc.
+    """
+    arr = np.asarray(arr)
+    kh, kw = _window(size)
+    dtype = dtype or _acc_dtype(arr.dtype)
+
+    def valid_sum(block, out):
+        _corners(table(block, dtype), kh, kw, out)
+
+    return border.filter_same(arr, valid_sum, border.kernel_margins(kh, kw), mode, cval, out_dtype=dtype)
+
+
+def window_mean(arr, size, mode='reflect', cval=0):
+    """Trung binh tren cua so (float64), chi phi moi pixel khong doi theo kich thuoc cua so."""
+    kh, kw = _window(size)
+    mean = window_sum(arr, (kh, kw), mode, cval).astype(np.float64, copy=False)
+    mean /= kh * kw
+    return mean
+
+
+def window_variance(arr, size, mode='reflect', cval=0, return_mean=False):
+    """
+    Phuong sai (chia n) tren cua so, float64. Anh nguyen: tinh chinh xac bang int64
+    (n * tong x^2 - (tong x)^2) / n^2; anh thuc: tru trung binh toan anh truoc de tranh triet tieu.
+    return_mean=True tra ve (mean, var).
+    """
+    arr = np.asarray(arr)
+    kh, kw = _window(size)
+    n = kh * kw
+
+    if _acc_dtype(arr.dtype) == np.int64:
+        wide = arr.astype(np.int64)
+        s1 = window_sum(wide, (kh, kw), mode, cval)
+        s2 = window_sum(wide * wide, (kh, kw), mode, cval)
+        s2 *= n
+        s2 -= s1 * s1
+        var = s2 / float(n * n)
+        mean = s1 / float(n)
+    else:
+        shift = float(arr.mean()) if arr.size else 0.0
+        centered = arr.astype(np.float64) - shift
+        mean = window_sum(centered, (kh, kw), mode, cval - shift) / n
+        var = window_sum(centered * centered, (kh, kw), mode, (cval - shift) ** 2) / n
+        var -= mean * mean
+        np.maximum(var, 0, out=var)
+        mean += shift
+
+    return (mean, var) if return_mean else var
@@ -0,0 +1,81 @@
+import os
+import numpy as np
+
+from features import border, convolution, noise
+
+
+def open_image_array(path, shape=None, dtype=np.uint8):
+    """
+    Mo anh lon tren dia ma khong doc het vao RAM.
+    - File .npy: np.load voi mmap_mode='r' (shape/dtype lay tu header).
+    - File raw: np.memmap, can truyen shape (h, w) va dtype.
+    """
+    if os.path.splitext(path)[1].lower() == '.npy':
+        return np.load(path, mmap_mode='r')
+    if shape is None:
+        raise ValueError("File raw can shape (h, w)")
+    return np.memmap(path, dtype=dtype, mode='r', shape=tuple(shape))
+
+
+def create_image_array(path, shape, dtype=np.uint8):
+    """Tao mang ket qua memory-mapped (.npy co header, hoac raw) de ghi tung tile."""
+    if os.path.splitext(path)[1].lower() == '.npy':
+        return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=tuple(shape))
+    return np.memmap(path, dtype=dtype, mode='w+', shape=tuple(shape))
+
+
+def tiled_apply(src, func, halo, out=None, out_dtype=None, tile_size=1024, mode='constant', cval=0):
+    """
+    Chay func tren tung tile co vien (halo) roi ghi phan loi vao out.
+    - func(block) tra ve mang cung kich thuoc block; chi phan giua (bo halo) duoc giu lai.
+    - halo: so nguyen hoac (tren, duoi, trai, phai); phai >= ban kinh lan can cua func.
+    - out: mang dich (co the la memmap); None thi tao mang trong RAM.
+    Bo nho dinh chi phu thuoc tile_size va halo, khong phu thuoc kich thuoc anh.
+    """
+    if np.isscalar(halo):
+        halo = (halo, halo, halo, halo)
+    top, bottom, left, right = halo
+
+    H, W = src.shape[:2]
+    if out is None:
+        out = np.empty(src.shape, dtype=out_dtype or src.dtype)
+
+    for r0 in range(0, H, tile_size):
+        r1 = min(r0 + tile_size, H)
+        for c0 in range(0, W, tile_size):
+            c1 = min(c0 + tile_size, W)
+
+            block = border.read_window(src, r0 - top, r1 + bottom, c0 - left, c1 + right, mode, cval)
+            res = func(block)
+            out[r0:r1, c0:c1] = res[top:top + (r1 - r0), left:left + (c1 - c0)]
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def tiled_convolution(src, kernel, out=None, tile_size=1024):
+    """my_convolution (padding 0) theo tung tile; ket qua giong het chay tren ca anh."""
+    kernel = np.asarray(kernel)
+    kh, kw = kernel.shape
+    out_dtype = float if src.dtype == np.uint8 else src.dtype
+
+    # my_convolution pad k//2 ca hai phia
+    halo = (kh // 2, kh // 2, kw // 2, kw // 2)
+    return tiled_apply(src, lambda block: convolution.my_convolution(block, kernel), halo,
+                       out=out, out_dtype=out_dtype, tile_size=tile_size, mode='constant')
+
+
+def tiled_average_filter(src, size=3, out=None, tile_size=1024):
+    """Loc trung binh (padding reflect) theo tung tile, ket qua uint8 giong apply_average_filter."""
+    pad = size // 2
+    return tiled_apply(src, lambda block: noise.average_filter_array(block, size).astype(np.uint8), pad,
+                       out=out, out_dtype=np.uint8, tile_size=tile_size, mode='reflect')
+
+
+def convolve_file(src_path, dst_path, kernel, tile_size=1024, shape=None, dtype=np.uint8):
+    """Doc anh tu file (.npy hoac raw), tich chap theo tile va ghi ket qua ra file memory-mapped."""
+    src = open_image_array(src_path, shape=shape, dtype=dtype)
+    out_dtype = float if src.dtype == np.uint8 else src.dtype
+    out = create_image_array(dst_path, src.shape, out_dtype)
+    return tiled_convolution(src, kernel, out=out, tile_size=tile_size)
@@ -1369,7 +1369,7 @@ def create_my_convolution_ui(app, info_frame):
         return
 
     desc = tk.Label(info_frame, 
-                   text="Áp dụng my_convolution (chạy 2 vòng lặp) với kernel làm nét (Sharpen) trên ảnh tải lên.\nLưu ý: Có thể mất vài giây với ảnh lớn.",
+                   text="Áp dụng my_convolution (vector hóa theo từng hệ số kernel) với kernel làm nét (Sharpen) trên ảnh tải lên.",
                    font=('Segoe UI', 9),
                    bg='white', fg='#7f8c8d', justify='left')
     desc.pack(anchor='w', pady=(0, 15))
@@ -1438,6 +1438,82 @@ def create_edge_detection_ui(app, info_frame):
     from features import edge_detection
     import numpy as np
     
+    # Gray array is kept per loaded image so edge_detection.edge_magnitude can reuse the
+    # magnitude map. The preview thresholds a copy already reduced to display size, so a
+    # threshold slider never touches the full-resolution map; that is only thresholded when
+    # the processed image is saved
+    state = {'source': None, 'gray_img': None, 'gray': None,
+             'shown': {}, 'pending': {}, 'display': None,
+             'preview_size': None, 'previews': {}, 'current': None}
+
+    def get_gray():
+        if state['source'] is not app.original_image:
+            edge_detection.clear_magnitude_cache()
+            state['source'] = app.original_image
+            state['gray_img'] = app.original_image.convert("L")
+            state['gray'] = np.array(state['gray_img'])
+            state['display'] = None
+            state['previews'] = {}
+        return state['gray_img'], state['gray']
+
+    def layout(n_imgs):
+        # Canvas size and the box each of the n_imgs side-by-side images fits into
+        W = app.canvas.winfo_width() or 800
+        H = app.canvas.winfo_height() or 600
+        spacing = 10
+        return W, H, spacing, (W - (n_imgs+1) * spacing) // n_imgs, H - 50
+
+    def fit(size, img_w, img_h):
+        w, h = size
+        ratio = min(img_w/w, img_h/h)
+        return (int(w*ratio), int(h*ratio))
+
+    def preview_edges(operators, th, n_imgs):
+        gray_img, gray = get_gray()
+        _, _, _, img_w, img_h = layout(n_imgs)
+        size = fit(gray_img.size, img_w, img_h)
+        if state['preview_size'] != size:
+            state['preview_size'] = size
+            state['previews'] = {}
+        imgs = []
+        for op in operators:
+            small = state['previews'].get(op)
+            if small is None:
+                small = edge_detection.reduce_magnitude(edge_detection.edge_magnitude(gray, op), size)
+                state['previews'][op] = small
+            imgs.append(Image.fromarray(edge_detection.render_threshold(small, th)))
+        return imgs
+
+    def render_edge(op, th):
+        # Full-resolution edge map, for apply/save only
+        _, gray = get_gray()
+        return Image.fromarray(edge_detection.render_threshold(edge_detection.edge_magnitude(gray, op), th))
+
+    def set_current(op, th):
+        # The map on screen becomes the processed image; its full-resolution render is
+        # deferred to the first read (Save), so slider moves stay cheap
+        state['current'] = (op, th)
+        app.set_processed_lazy(lambda: render_edge(op, th))
+
+    def save_edges(op, var):
+        try:
+            app.processed_image = render_edge(op, var.get())
+        except Exception as e:
+            messagebox.showerror("Lỗi", f"{e}")
+            return
+        app.save_processed()
+
+    def on_threshold(key, run):
+        # Re-render only after the first run; slider events are coalesced into one idle update
+        if not state['shown'].get(key) or state['pending'].get(key):
+            return
+        state['pending'][key] = True
+
+        def update():
+            state['pending'][key] = False
+            run(busy=False)
+        app.after_idle(update)
+
     nb = ttk.Notebook(info_frame)
     nb.pack(fill='both', expand=True, pady=10)
     
@@ -1454,35 +1530,30 @@ def create_edge_detection_ui(app, info_frame):
     thresh_frame1.pack(anchor='w', pady=(0, 10))
     tk.Label(thresh_frame1, text="Ngưỡng (Threshold):", bg='white').pack(side='left')
     thresh_var1 = tk.IntVar(value=40)
-    tk.Scale(thresh_frame1, variable=thresh_var1, from_=0, to=255, orient='horizontal', bg='white', length=200).pack(side='left', padx=10)
+    tk.Scale(thresh_frame1, variable=thresh_var1, from_=0, to=255, orient='horizontal', bg='white', length=200,
+             command=lambda _v: on_threshold('sobel_prewitt', run_sobel_prewitt)).pack(side='left', padx=10)
 
     # Label phân tích cho Sobel/Prewitt (ẩn ban đầu)
     analysis_lbl1 = tk.Label(f1, text="", font=('Segoe UI', 9), 
                             bg='#ecf0f1', fg='#2c3e50', justify='left', wraplength=350, padx=10, pady=10)
     
-    def run_sobel_prewitt():
+    def run_sobel_prewitt(busy=True):
         try:
-             app.config(cursor="wait")
-             app.update()
+             if busy:
+                 app.config(cursor="wait")
+                 app.update()
              
-             gray = app.original_image.convert("L")
-             img_arr = np.array(gray)
              th = thresh_var1.get()
              
-             # Calculate
-             sobel_res = edge_detection.apply_sobel(img_arr, threshold=th)
-             prewitt_res = edge_detection.apply_prewitt(img_arr, threshold=th)
-             
-             # Convert to Images
-             sobel_img = Image.fromarray(sobel_res)
-             prewitt_img = Image.fromarray(prewitt_res)
+             # Preview: threshold the display-size magnitude (cached)
+             sobel_img, prewitt_img = preview_edges(('sobel', 'prewitt'), th, 3)
              
-             # Save one to processed for saving
-             app.processed_image = sobel_img # Default save sobel
+             # Save one to processed for saving (full resolution rendered on save)
+             set_current('sobel', th) # Default save sobel
              
              # Display comparision
              imgs = [
-                 ("Ảnh gốc", app.original_image.convert("L")),
+                 ("Ảnh gốc", state['gray_img']),
                  ("Sobel", sobel_img),
                  ("Prewitt", prewitt_img)
              ]
@@ -1494,16 +1565,22 @@ def create_edge_detection_ui(app, info_frame):
 - Prewitt: Trọng số đều nhau, rất nhạy với nhiễu. Đường biên có thể sắc mảnh nhưng dễ bị đứt đoạn bởi nhiễu."""
              analysis_lbl1.config(text=analysis)
              analysis_lbl1.pack(anchor='w', fill='x', pady=10)
+             state['shown']['sobel_prewitt'] = True
              
         except Exception as e:
             messagebox.showerror("Lỗi", f"{e}")
         finally:
              app.config(cursor="")
              
-    btn1 = tk.Button(f1, text="Chạy so sánh", command=run_sobel_prewitt,
+    btn_frame1 = tk.Frame(f1, bg='white')
+    btn_frame1.pack(anchor='w')
+    btn1 = tk.Button(btn_frame1, text="Chạy so sánh", command=run_sobel_prewitt,
                     font=('Segoe UI', 9, 'bold'), bg='#2980b9', fg='white',
                     relief='flat', padx=15, pady=5)
-    btn1.pack(anchor='w')
+    btn1.pack(side='left', padx=(0, 10))
+    tk.Button(btn_frame1, text="Lưu Sobel", command=lambda: save_edges('sobel', thresh_var1),
+             font=('Segoe UI', 9), bg='#27ae60', fg='white',
+             relief='flat', padx=15, pady=5).pack(side='left')
 
 
     # Tab 2: Robert vs Kirsch
@@ -1519,34 +1596,29 @@ def create_edge_detection_ui(app, info_frame):
     thresh_frame2.pack(anchor='w', pady=(0, 10))
     tk.Label(thresh_frame2, text="Ngưỡng (Threshold):", bg='white').pack(side='left')
     thresh_var2 = tk.IntVar(value=40)
-    tk.Scale(thresh_frame2, variable=thresh_var2, from_=0, to=255, orient='horizontal', bg='white', length=200).pack(side='left', padx=10)
+    tk.Scale(thresh_frame2, variable=thresh_var2, from_=0, to=255, orient='horizontal', bg='white', length=200,
+             command=lambda _v: on_threshold('robert_kirsch', run_robert_kirsch)).pack(side='left', padx=10)
     
     # Label phân tích cho Robert/Kirsch
     analysis_lbl2 = tk.Label(f2, text="", font=('Segoe UI', 9), 
                             bg='#ecf0f1', fg='#2c3e50', justify='left', wraplength=350, padx=10, pady=10)
 
-    def run_robert_kirsch():
+    def run_robert_kirsch(busy=True):
         try:
-             app.config(cursor="wait")
-             app.update()
+             if busy:
+                 app.config(cursor="wait")
+                 app.update()
              
-             gray = app.original_image.convert("L")
-             img_arr = np.array(gray)
              th = thresh_var2.get()
              
-             # Calculate
-             robert_res = edge_detection.apply_roberts(img_arr, threshold=th)
-             kirsch_res = edge_detection.apply_kirsch(img_arr, threshold=th)
-             
-             # Convert to Images
-             robert_img = Image.fromarray(robert_res)
-             kirsch_img = Image.fromarray(kirsch_res)
+             # Preview: threshold the display-size magnitude (cached)
+             robert_img, kirsch_img = preview_edges(('roberts', 'kirsch'), th, 3)
              
-             app.processed_image = kirsch_img
+             set_current('kirsch', th)
              
              # Display comparision
              imgs = [
-                 ("Ảnh gốc", app.original_image.convert("L")),
+                 ("Ảnh gốc", state['gray_img']),
                  ("Robert (2x2)", robert_img),
                  ("Kirsch (8 hướng)", kirsch_img)
              ]
@@ -1558,16 +1630,22 @@ def create_edge_detection_ui(app, info_frame):
 - Kirsch: Dò 8 hướng lấy max. Biên cực kỳ rõ và ít nhiễu hơn Robert. Tốt nhất trong các phương pháp trên."""
              analysis_lbl2.config(text=analysis)
              analysis_lbl2.pack(anchor='w', fill='x', pady=10)
+             state['shown']['robert_kirsch'] = True
              
         except Exception as e:
             messagebox.showerror("Lỗi", f"{e}")
         finally:
              app.config(cursor="")
 
-    btn2 = tk.Button(f2, text="Chạy so sánh", command=run_robert_kirsch,
+    btn_frame2 = tk.Frame(f2, bg='white')
+    btn_frame2.pack(anchor='w')
+    btn2 = tk.Button(btn_frame2, text="Chạy so sánh", command=run_robert_kirsch,
                     font=('Segoe UI', 9, 'bold'), bg='#8e44ad', fg='white',
                     relief='flat', padx=15, pady=5)
-    btn2.pack(anchor='w')
+    btn2.pack(side='left', padx=(0, 10))
+    tk.Button(btn_frame2, text="Lưu Kirsch", command=lambda: save_edges('kirsch', thresh_var2),
+             font=('Segoe UI', 9), bg='#27ae60', fg='white',
+             relief='flat', padx=15, pady=5).pack(side='left')
 
     def show_comparison(image_list):
         # Helper to show images horizontally
@@ -1577,23 +1655,24 @@ def create_edge_detection_ui(app, info_frame):
         app.canvas.master.pack(fill='both', expand=True)
         app.canvas.delete("all")
         
-        W = app.canvas.winfo_width() or 800
-        H = app.canvas.winfo_height() or 600
-        
-        n_imgs = len(image_list)
-        spacing = 10
-        img_w = (W - (n_imgs+1) * spacing) // n_imgs
-        img_h = H - 50 
+        W, H, spacing, img_w, img_h = layout(len(image_list))
         
         current_x = spacing
         
         app.comparison_photos = [] 
         
         for title, pil_img in image_list:
-            w, h = pil_img.size
-            ratio = min(img_w/w, img_h/h)
-            new_size = (int(w*ratio), int(h*ratio))
-            resized = pil_img.resize(new_size, Image.LANCZOS)
+            new_size = fit(pil_img.size, img_w, img_h)
+            # Previews are already at display size; the original does not change with the
+            # threshold: keep its resized copy
+            if pil_img.size == new_size:
+                resized = pil_img
+            elif pil_img is state['gray_img'] and state['display'] and state['display'][0] == new_size:
+                resized = state['display'][1]
+            else:
+                resized = pil_img.resize(new_size, Image.LANCZOS)
+                if pil_img is state['gray_img']:
+                    state['display'] = (new_size, resized)
             
             p = ImageTk.PhotoImage(resized)
             app.comparison_photos.append(p)
@@ -1723,14 +1802,15 @@ def create_median_filter_ui(app, info_frame):
     btn_frame.pack(anchor='w', pady=(0, 15))
 
     def show_comparison(avg_img, median_img, size):
-        for widget in display_frame.winfo_children():
-            widget.destroy()
-
-        imgs = [
+        show_images([
             (f"Ảnh nhiễu", state['noisy']),
             (f"Trung bình {size}x{size}", avg_img),
             (f"Trung vị {size}x{size}", median_img)
-        ]
+        ])
+
+    def show_images(imgs):
+        for widget in display_frame.winfo_children():
+            widget.destroy()
 
         for name, img in imgs:
             if img:
@@ -1786,11 +1866,29 @@ def create_median_filter_ui(app, info_frame):
         show_comparison(avg_res, median_res, size)
         update_analysis(size)
 
+    def run_adaptive():
+        if state['noisy'] is None:
+            messagebox.showwarning("Chưa có nhiễu", "Vui lòng thêm nhiễu trước.")
+            return
+
+        # Chỉ lọc các pixel bị phát hiện là nhiễu xung, phần còn lại giữ nguyên
+        adaptive_res = noise.apply_adaptive_median_filter(state['noisy'])
+        app.processed_image = adaptive_res
+
+        show_images([
+            ("Ảnh nhiễu", state['noisy']),
+            ("Trung vị 3x3", noise.apply_median_filter(state['noisy'], 3)),
+            ("Trung vị thích nghi", adaptive_res)
+        ])
+        update_analysis(-1)
+
     def update_analysis(size):
         text_widget.config(state='normal')
         text_widget.delete('1.0', tk.END)
         if size == 0:
              msg = "Hãy thêm nhiễu trước."
+        elif size == -1:
+            msg = "Trung vị thích nghi:\n- Chỉ các pixel 0/255 lệch xa trung vị 3x3 quanh nó mới bị coi là nhiễu xung.\n- Mỗi pixel nhiễu lấy trung vị các pixel không nhiễu, cửa sổ tăng dần 3x3 -> 7x7.\n- Các pixel còn lại giữ nguyên nên ảnh không bị mờ, thời gian tỉ lệ với mật độ nhiễu."
         elif size == 3:
             msg = "So sánh 3x3:\n- Trung bình: Làm mờ ảnh, nhiễu vẫn còn (dạng đốm mờ).\n- Trung vị: Khử sạch nhiễu muối tiêu, giữ lại cạnh sắc nét hơn hẳn. Trung vị tốt hơn vì nó loại bỏ giá trị cực đoan (0/255) thay vì chia đều chúng."
         else:
@@ -1807,6 +1905,9 @@ def create_median_filter_ui(app, info_frame):
     tk.Button(btn_frame, text="So sánh 5x5", command=lambda: run_compare(5),
              font=('Segoe UI', 9), bg='#2980b9', fg='white', relief='flat', padx=10).pack(side='left', padx=2)
 
+    tk.Button(btn_frame, text="Trung vị thích nghi", command=run_adaptive,
+             font=('Segoe UI', 9), bg='#27ae60', fg='white', relief='flat', padx=10).pack(side='left', padx=2)
+
     display_frame = tk.Frame(info_frame, bg='white')
     display_frame.pack(fill='x', pady=10)
 
@@ -2087,6 +2188,22 @@ def create_laplace_features_ui(app, info_frame):
     analysis_lbl4.pack(fill='x', pady=10)
 
 
+# Các màn hình Fourier dùng ảnh độ phân giải gốc (FFT); chỉ thu nhỏ ảnh lớn hơn mức này để giới hạn bộ nhớ phổ phức
+FOURIER_MAX_SIDE = 4096
+
+
+def _fourier_input(app):
+    """Ảnh xám cho các màn hình Fourier: kích thước gốc (tối đa FOURIER_MAX_SIDE), cắt về số chẵn
+    để hiệu chỉnh I2 * (-1)^(x+y) ở màn hình IDFT khôi phục đúng ảnh (shifted dùng được cả kích thước lẻ)."""
+    img = app.original_image.convert("L")
+    if max(img.size) > FOURIER_MAX_SIDE:
+        img.thumbnail((FOURIER_MAX_SIDE, FOURIER_MAX_SIDE), Image.LANCZOS)
+    w, h = img.size
+    if w % 2 or h % 2:
+        img = img.crop((0, 0, w - w % 2, h - h % 2))
+    return img
+
+
 def create_fourier_ui(app, info_frame):
     """UI cho chức năng Biến đổi Fourier (DFT)"""
     # Tạo vùng cuộn
@@ -2148,26 +2265,21 @@ def create_fourier_ui(app, info_frame):
             for widget in result_images_frame.winfo_children():
                 widget.destroy()
 
-            # 1. Resize image to small size (e.g. 64x64) for performance
-            target_size = (64, 64)
-            
-            img_resized = app.original_image.convert("L").resize(target_size, Image.LANCZOS)
+            # 1. Ảnh độ phân giải gốc (FFT nên không cần thu nhỏ)
+            img_resized = _fourier_input(app)
             img_arr = np.array(img_resized)
+            target_size = img_resized.size
             
             # 2. DFT -> F
             F = fourier.DFT_Fourier(img_arr)
             
-            # 3. Shift -> Fs1
-            Fs1 = fourier.shifted(F)
+            # 3. Shift -> Fs1 (dịch tại chỗ: F không còn dùng, không tạo thêm mảng phổ)
+            Fs1 = fourier.shifted(F, out=F)
             
             # 4. Multiply (-1)^(x+y) then DFT -> Fs2
             Fs2 = fourier.F_shifted_transform(img_arr)
             
-            # 5. Compare Fs1 and Fs2
-            diff = np.abs(Fs1 - Fs2)
-            max_diff = np.max(diff)
-            
-            # 6. Prepare Images for Display (Spectrum)
+            # 5. Prepare Images for Display (Spectrum)
             spec_fs1 = fourier.compute_spectrum(Fs1)
             spec_fs2 = fourier.compute_spectrum(Fs2)
             
@@ -2176,10 +2288,10 @@ def create_fourier_ui(app, info_frame):
             
             # --- HIỂN THỊ ẢNH ---
             # Ảnh gốc
-            lbl1 = tk.Label(result_images_frame, text="Ảnh gốc (64x64)", bg='white', font=('Segoe UI', 9, 'bold'))
+            lbl1 = tk.Label(result_images_frame, text=f"Ảnh gốc ({target_size[0]}x{target_size[1]})", bg='white', font=('Segoe UI', 9, 'bold'))
             lbl1.grid(row=0, column=0, padx=5)
-            # Resize lên để dễ nhìn
-            orig_view = ImageTk.PhotoImage(img_resized.resize((150, 150), Image.NEAREST))
+            # Đưa về 150x150 để hiển thị
+            orig_view = ImageTk.PhotoImage(img_resized.resize((150, 150), Image.LANCZOS))
             canv1 = tk.Label(result_images_frame, image=orig_view, bg='white')
             canv1.image = orig_view
             canv1.grid(row=1, column=0, padx=5)
@@ -2187,7 +2299,7 @@ def create_fourier_ui(app, info_frame):
             # Phổ Fs1
             lbl2 = tk.Label(result_images_frame, text="Phổ Fs1 (Dịch chuyển)", bg='white', font=('Segoe UI', 9, 'bold'))
             lbl2.grid(row=0, column=1, padx=5)
-            fs1_view = ImageTk.PhotoImage(img_fs1.resize((150, 150), Image.NEAREST))
+            fs1_view = ImageTk.PhotoImage(img_fs1.resize((150, 150), Image.LANCZOS))
             canv2 = tk.Label(result_images_frame, image=fs1_view, bg='white')
             canv2.image = fs1_view
             canv2.grid(row=1, column=1, padx=5)
@@ -2195,18 +2307,21 @@ def create_fourier_ui(app, info_frame):
             # Phổ Fs2
             lbl3 = tk.Label(result_images_frame, text="Phổ Fs2 (Nhân (-1)^(x+y))", bg='white', font=('Segoe UI', 9, 'bold'))
             lbl3.grid(row=0, column=2, padx=5)
-            fs2_view = ImageTk.PhotoImage(img_fs2.resize((150, 150), Image.NEAREST))
+            fs2_view = ImageTk.PhotoImage(img_fs2.resize((150, 150), Image.LANCZOS))
             canv3 = tk.Label(result_images_frame, image=fs2_view, bg='white')
             canv3.image = fs2_view
             canv3.grid(row=1, column=2, padx=5)
 
             # --- HIỂN THỊ KẾT QUẢ SO SÁNH TEXT ---
             # Lấy data mẫu tâm 3x3 để so sánh trực quan
-            cx, cy = 32, 32
-            center_slice = slice(cx-1, cx+2)
+            cx, cy = img_arr.shape[0] // 2, img_arr.shape[1] // 2
+            rows, cols = slice(cx-1, cx+2), slice(cy-1, cy+2)
             
-            sample_fs1 = Fs1[center_slice, center_slice]
-            sample_fs2 = Fs2[center_slice, center_slice]
+            sample_fs1 = Fs1[rows, cols]
+            sample_fs2 = Fs2[rows, cols].copy()
+
+            # 6. Compare Fs1 and Fs2 (hiệu ghi đè lên Fs2, đã hiển thị xong)
+            max_diff = np.max(np.abs(np.subtract(Fs2, Fs1, out=Fs2)))
             
             def format_complex_mat(mat):
                 lines = []
@@ -2219,7 +2334,7 @@ def create_fourier_ui(app, info_frame):
             str_fs2 = format_complex_mat(sample_fs2)
             
             res_text = f"""
-KẾT QUẢ SO SÁNH (Ảnh nhỏ {target_size}):
+KẾT QUẢ SO SÁNH (Ảnh {target_size[0]}x{target_size[1]}):
 - Max Difference (Fs1 vs Fs2): {max_diff:.2e}
 - Kết luận: {'Hai ma trận GIỐNG NHAU' if max_diff < 1e-4 else 'Hai ma trận KHÁC NHAU'}
 
@@ -2312,19 +2427,21 @@ def create_idft_ui(app, info_frame):
             for widget in result_images_frame.winfo_children():
                 widget.destroy()
 
-            target_size = (64, 64)
-            img_resized = app.original_image.convert("L").resize(target_size, Image.LANCZOS)
+            img_resized = _fourier_input(app)
             img_arr = np.array(img_resized)
+            target_size = img_resized.size
             
             # --- TÍNH TOÁN ---
             # 1. DFT
             F = fourier.DFT_Fourier(img_arr)
-            Fs1 = fourier.shifted(F)
             
             # 2. IDFT(F) -> I1 (Phục hồi chuẩn từ F gốc)
             # Vì IDFT phục hồi F (gốc tại (0,0)) nên I1 sẽ giống hệt ảnh gốc
             I1 = fourier.IDFT_Fourier(F)
             
+            # Dịch tâm tại chỗ (F đã dùng xong), không tạo thêm mảng phổ
+            Fs1 = fourier.shifted(F, out=F)
+            
             # 3. IDFT(Fs1) -> I2 (Phục hồi từ phổ đã dịch tâm)
             # Vì phổ Fs1 bị dịch đi (M/2, N/2), theo định lý dời hình IDFT:
             # f(x,y) * (-1)^(x+y) <-> F(u - M/2, v - N/2)
@@ -2350,9 +2467,10 @@ def create_idft_ui(app, info_frame):
             # Prepare images
             def to_img(arr):
                 arr = np.clip(arr, 0, 255).astype(np.uint8)
+                # NEAREST giữ mẫu bàn cờ của I2 (LANCZOS sẽ làm mờ thành mảng xám)
                 return Image.fromarray(arr).resize((130, 130), Image.NEAREST)
             
-            p_orig = ImageTk.PhotoImage(img_resized.resize((130, 130), Image.NEAREST))
+            p_orig = ImageTk.PhotoImage(img_resized.resize((130, 130), Image.LANCZOS))
             p_i1 = ImageTk.PhotoImage(to_img(I1))
             p_i2 = ImageTk.PhotoImage(to_img(I2))
             p_i3 = ImageTk.PhotoImage(to_img(I3))
@@ -2388,7 +2506,7 @@ def create_idft_ui(app, info_frame):
             l5.grid(row=3, column=1, padx=5, pady=5)
             
             # Analysis Text
-            res_text = f"KẾT QUẢ IDFT (Ảnh {target_size}):\n"
+            res_text = f"KẾT QUẢ IDFT (Ảnh {target_size[0]}x{target_size[1]}):\n"
             res_text += f"- Sai số giữa I3 (hiệu chỉnh) và I1 (chuẩn): {diff_I:.2e}\n"
             res_text += f"- Kết luận I1 ?= I3: {'GIỐNG NHAU' if is_equal else 'KHÁC NHAU'}\n\n"
             res_text += "PHÂN TÍCH QUY TRÌNH:\n"
@@ -2409,3 +2527,127 @@ def create_idft_ui(app, info_frame):
     tk.Button(btn_frame, text="Chạy IDFT & Demo Phục hồi", command=run_idft,
              font=('Segoe UI', 10, 'bold'), bg='#e74c3c', fg='white',
              relief='flat', padx=15, pady=8).pack(side='left')
+
+
+def create_frequency_filter_ui(app, info_frame):
+    """UI cho Lọc trong miền tần số (lý tưởng / Butterworth / Gaussian)"""
+    title = tk.Label(info_frame, text="Lọc miền tần số",
+                    font=('Segoe UI', 12, 'bold'),
+                    bg='white', fg='#2c3e50')
+    title.pack(anchor='w', pady=(0, 10))
+
+    if app.original_image is None:
+        tk.Label(info_frame, text="Vui lòng tải ảnh lên trước.",
+                font=('Segoe UI', 9), bg='white', fg='#e74c3c').pack(anchor='w')
+        return
+
+    from features import frequency_filters
+
+    kinds = {'Lý tưởng': 'ideal', 'Butterworth': 'butterworth', 'Gaussian': 'gaussian'}
+    bands = {'Thông thấp': 'lowpass', 'Thông cao': 'highpass', 'Thông dải': 'bandpass',
+             'Chắn dải': 'bandreject', 'Notch (chắn điểm)': 'notch'}
+
+    # Phổ thuận của ảnh chỉ tính một lần; mỗi lần kéo thanh trượt chỉ nhân hàm truyền (đã cache) và biến đổi ngược
+    state = {'source': None, 'F': None, 'arr': None, 'alpha': None, 'job': None}
+
+    ops_frame = tk.Frame(info_frame, bg='white')
+    ops_frame.pack(anchor='w', pady=(0, 10), fill='x')
+
+    kind_var = tk.StringVar(value='Gaussian')
+    band_var = tk.StringVar(value='Thông thấp')
+    tk.Label(ops_frame, text="Loại bộ lọc:", font=('Segoe UI', 9, 'bold'),
+            bg='white', fg='#2c3e50').grid(row=0, column=0, sticky='w', pady=5)
+    ttk.Combobox(ops_frame, textvariable=kind_var, values=list(kinds),
+                state="readonly", width=20).grid(row=0, column=1, padx=(10, 0), pady=5)
+    tk.Label(ops_frame, text="Dải tần:", font=('Segoe UI', 9, 'bold'),
+            bg='white', fg='#2c3e50').grid(row=1, column=0, sticky='w', pady=5)
+    ttk.Combobox(ops_frame, textvariable=band_var, values=list(bands),
+                state="readonly", width=20).grid(row=1, column=1, padx=(10, 0), pady=5)
+
+    slider_frame = tk.Frame(info_frame, bg='white')
+    slider_frame.pack(anchor='w', fill='x', pady=(0, 10))
+
+    cutoff_var = tk.DoubleVar(value=30)
+    width_var = tk.DoubleVar(value=20)
+    order_var = tk.IntVar(value=2)
+    notch_var = tk.StringVar(value="0,40")
+
+    def add_slider(text, var, frm, to, resolution=1):
+        tk.Label(slider_frame, text=text, font=('Segoe UI', 9, 'bold'),
+                bg='white', fg='#2c3e50').pack(anchor='w', pady=(5, 0))
+        tk.Scale(slider_frame, variable=var, from_=frm, to=to,
+                resolution=resolution, orient=tk.HORIZONTAL, length=300,
+                bg='white', highlightthickness=0, troughcolor='#ecf0f1', fg='#2c3e50',
+                command=lambda _: schedule()).pack(anchor='w')
+
+    add_slider("Bán kính cắt D0 (tâm dải / bán kính notch):", cutoff_var, 1, 300)
+    add_slider("Độ rộng dải W (Thông dải / Chắn dải):", width_var, 1, 200)
+    add_slider("Bậc n (Butterworth):", order_var, 1, 10)
+    tk.Label(slider_frame, text="Tâm notch (u,v; u,v ...) tính từ tâm phổ:", font=('Segoe UI', 9, 'bold'),
+            bg='white', fg='#2c3e50').pack(anchor='w', pady=(5, 0))
+    tk.Entry(slider_frame, textvariable=notch_var, width=30).pack(anchor='w')
+
+    info_lbl = tk.Label(info_frame, text="Kéo thanh trượt hoặc nhấn Áp dụng để lọc.",
+                       bg='white', justify='left', wraplength=450, font=('Consolas', 9))
+
+    def source_spectra():
+        if state['source'] is not app.original_image:
+            img = app.original_image
+            if max(img.size) > FOURIER_MAX_SIDE:
+                img = img.copy()
+                img.thumbnail((FOURIER_MAX_SIDE, FOURIER_MAX_SIDE), Image.LANCZOS)
+            state['alpha'] = img.getchannel('A') if img.mode == 'RGBA' else None
+            if img.mode not in ('L', 'RGB'):
+                img = img.convert('RGB')
+            state['arr'] = np.array(img)
+            state['F'] = frequency_filters.spectra(state['arr'])
+            state['source'] = app.original_image
+        return state['F'], state['arr']
+
+    def apply_filter():
+        state['job'] = None
+        try:
+            app.config(cursor="wait")
+            app.update()
+            F, arr = source_spectra()
+            band = bands[band_var.get()]
+            D0 = cutoff_var.get()
+            cutoff = (max(D0 - width_var.get() / 2, 0), D0 + width_var.get() / 2) \
+                if band in ('bandpass', 'bandreject') else D0
+            centers = [tuple(float(v) for v in pair.split(','))
+                       for pair in notch_var.get().split(';') if pair.strip()]
+            out = frequency_filters.filter_spectra(F, arr.shape, arr.dtype, kinds[kind_var.get()], band,
+                                                   cutoff, order_var.get(), centers)
+            result = Image.fromarray(out)
+            if state['alpha'] is not None:
+                result.putalpha(state['alpha'])
+            app.processed_image = result
+            app.show_image(result)
+            info = frequency_filters.cache_info()
+            info_lbl.config(text=f"Ảnh {arr.shape[1]}x{arr.shape[0]}, {1 if arr.ndim == 2 else arr.shape[2]} kênh\n"
+                                 f"Cache hàm truyền: {info['entries']} mục, trúng {info['hits']} / trượt {info['misses']}")
+        except Exception as e:
+            messagebox.showerror("Error", f"{e}")
+        finally:
+            app.config(cursor="")
+
+    def schedule():
+        # Gộp các lần kéo liên tiếp: chỉ lọc khi thanh trượt dừng 150 ms
+        if state['job'] is not None:
+            app.after_cancel(state['job'])
+        state['job'] = app.after(150, apply_filter)
+
+    btn_frame = tk.Frame(info_frame, bg='white')
+    btn_frame.pack(anchor='w', pady=(10, 0))
+
+    tk.Button(btn_frame, text="Áp dụng", command=apply_filter,
+             font=('Segoe UI', 9, 'bold'), bg='#3498db', fg='white',
+             relief='flat', cursor='hand2', padx=15, pady=8).grid(row=0, column=0, padx=(0, 10))
+    tk.Button(btn_frame, text="Lưu", command=app.save_processed,
+             font=('Segoe UI', 9), bg='#27ae60', fg='white',
+             relief='flat', cursor='hand2', padx=15, pady=8).grid(row=0, column=1, padx=(0, 10))
+    tk.Button(btn_frame, text="Quay về", command=lambda: app.show_image(app.original_image),
+             font=('Segoe UI', 9), bg='#95a5a6', fg='white',
+             relief='flat', cursor='hand2', padx=15, pady=8).grid(row=0, column=2)
+
+    info_lbl.pack(anchor='w', pady=(10, 0))
@@ -1,14 +1,21 @@
 from PIL import Image, ImageTk
 import tkinter as tk
 
+from features import pyramid
 
-def resize_for_display(canvas, pil_image):
-    """Resize image để hiển thị trên canvas"""
+
+def resize_for_display(canvas, pil_image, cached=False):
+    """Resize image để hiển thị trên canvas.
+    cached=True: ảnh được hiển thị lại nhiều lần (vd ảnh gốc) -> thu nhỏ từ tầng kim tự tháp
+    vừa đủ lớn (lưu cache theo ảnh) thay vì từ độ phân giải đầy đủ."""
     w = canvas.winfo_width() or 800
     h = canvas.winfo_height() or 600
     img_w, img_h = pil_image.size
     ratio = min(w / img_w, h / img_h, 1.0)
     new_size = (max(1, int(img_w * ratio)), max(1, int(img_h * ratio)))
+    if cached and ratio < 0.5 and pil_image.mode in ('L', 'RGB', 'RGBA'):
+        low = pyramid.preview(pil_image, (new_size[1], new_size[0]))
+        return Image.fromarray(low).resize(new_size, Image.LANCZOS)
     return pil_image.resize(new_size, Image.LANCZOS)
 
 
@@ -0,0 +1,87 @@
+import sys
+import os
+from collections import deque
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    from features import edge_detection
+    print("Successfully imported edge_detection module")
+except ImportError as e:
+    print(f"Failed to import edge_detection module: {e}")
+    sys.exit(1)
+
+
+def flood_fill_hysteresis(weak, strong):
+    # Reference: BFS from strong pixels through 8-connected weak pixels
+    H, W = weak.shape
+    out = strong.copy()
+    queue = deque(zip(*np.nonzero(strong)))
+    while queue:
+        r, c = queue.popleft()
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                rr, cc = r + dr, c + dc
+                if 0 <= rr < H and 0 <= cc < W and weak[rr, cc] and not out[rr, cc]:
+                    out[rr, cc] = True
+                    queue.append((rr, cc))
+    return out
+
+
+def verify():
+    print("--- Verifying Canny ---")
+    rng = np.random.default_rng(0)
+
+    # 1. Run labeling hysteresis == flood fill
+    ok = True
+    for _ in range(50):
+        H, W = rng.integers(1, 40, 2)
+        weak = rng.random((H, W)) < rng.random()
+        strong = weak & (rng.random((H, W)) < 0.05)
+        if not np.array_equal(edge_detection._hysteresis(weak, strong), flood_fill_hysteresis(weak, strong)):
+            ok = False
+            break
+    print("SUCCESS: Hysteresis matches flood fill" if ok else "FAIL: Hysteresis differs from flood fill")
+
+    # 2. Bright rectangle: thin closed contour, nothing in flat regions
+    img = np.full((120, 150), 20, dtype=np.uint8)
+    img[30:90, 40:110] = 200
+    edges = edge_detection.apply_canny(img, 50, 100)
+    rows_hit = np.count_nonzero(edges[35:85, 35:45], axis=1)
+    flat = edges[50:70, 60:90].any() or edges[:20].any()
+    if np.all(rows_hit == 1) and not flat:
+        print("SUCCESS: Canny gives a 1-pixel contour and no response on flat regions")
+    else:
+        print(f"FAIL: Canny contour widths {np.unique(rows_hit)}, flat response {flat}")
+
+    # 3. Fused gradient == correlation with the shared kernel constants (zero padding)
+    from features import gradient
+    img = rng.integers(0, 256, (23, 31)).astype(np.float64)
+    ok = True
+    for op, (kx, ky) in gradient.KERNELS.items():
+        kh, kw = kx.shape
+        top, left = (kh - 1) // 2 + (kh % 2 == 0), (kw - 1) // 2 + (kw % 2 == 0)
+        padded = np.pad(img, ((top, kh - 1 - top), (left, kw - 1 - left)))
+        windows = np.lib.stride_tricks.sliding_window_view(padded, (kh, kw))
+        res = gradient.gradient(img, ('ix', 'iy'), op, dtype=np.float64)
+        ok &= np.array_equal(res['ix'], np.einsum('ijkl,kl->ij', windows, kx)) and \
+            np.array_equal(res['iy'], np.einsum('ijkl,kl->ij', windows, ky))
+    ok &= edge_detection.SOBEL_X is gradient.SOBEL_X
+    print("SUCCESS: Fused gradient matches the shared kernel constants" if ok
+          else "FAIL: Fused gradient differs from the kernel constants")
+
+    # 4. Display-size preview: block max, so a thin edge survives the threshold
+    mag = np.zeros((90, 120))
+    mag[41, :] = 200
+    small = edge_detection.reduce_magnitude(mag, (40, 30))
+    blocks = mag.reshape(30, 3, 40, 3).max(axis=(1, 3))
+    ok = small.shape == (30, 40) and np.array_equal(small, blocks) and \
+        edge_detection.render_threshold(small, 100)[13].all()
+    print("SUCCESS: Reduced magnitude keeps thin edges for the preview" if ok
+          else "FAIL: Reduced magnitude loses edges or differs from the block max")
+
+
+if __name__ == "__main__":
+    verify()
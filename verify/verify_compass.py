@@ -0,0 +1,68 @@
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    from features import compass, convolution, edge_detection
+    print("Successfully imported compass module")
+except ImportError as e:
+    print(f"Failed to import compass module: {e}")
+    sys.exit(1)
+
+
+def ring_mask(weights):
+    # Dat trong so theo vong lang gieng compass.RING vao mat na 3x3
+    m = np.zeros((3, 3), dtype=int)
+    for (dr, dc), wt in zip(compass.RING, weights):
+        m[1 + dr, 1 + dc] = wt
+    return m
+
+
+def check(name, best, direction, stack):
+    ok_max = np.array_equal(best, stack.max(axis=0))
+    ok_dir = np.array_equal(direction, stack.argmax(axis=0))
+    if ok_max and ok_dir:
+        print(f"SUCCESS: {name} max and direction match the 8 independent convolutions")
+    else:
+        print(f"FAIL: {name} max match={ok_max}, direction match={ok_dir}")
+
+
+def verify():
+    print("--- Verifying Compass Operators ---")
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (64, 80)).astype(np.uint8)
+
+    # 1. Kirsch vs 8 KIRSCH masks
+    stack = np.stack([convolution.my_convolution(img, k) for k in edge_detection.KIRSCH])
+    best, direction = compass.compass(img, 'kirsch')
+    check("Kirsch", best, direction, stack)
+
+    # 2. Robinson vs 8 rotated Sobel masks
+    base = [1, 2, 1, 0, -1, -2, -1, 0]
+    masks = [ring_mask(np.roll(base, d)) for d in range(8)]
+    stack = np.stack([convolution.my_convolution(img, k) for k in masks])
+    best, direction = compass.compass(img, 'robinson')
+    check("Robinson", best, direction, stack)
+
+    # 3. Frei-Chen: response is a cosine in [0, 1]
+    best, _ = compass.compass(img, 'frei_chen')
+    if best.min() >= 0 and best.max() <= 1 + 1e-12:
+        print("SUCCESS: Frei-Chen response lies in [0, 1]")
+    else:
+        print(f"FAIL: Frei-Chen response out of range [{best.min()}, {best.max()}]")
+
+    # Vertical step edge: direction should be W/E-facing mask (G2); flat regions give 0
+    step = np.zeros((16, 16))
+    step[:, 8:] = 100
+    best, direction = compass.compass(step, 'frei_chen', mode='edge')
+    if direction[8, 8] == 1 and best[8, 8] > 0.3 and best[8, 2] == 0 and best[8, 13] == 0:
+        print("SUCCESS: Frei-Chen detects vertical edge with mask G2")
+    else:
+        print(f"FAIL: Frei-Chen step edge gave direction {direction[8, 8]}, response {best[8, 8]}")
+
+
+if __name__ == "__main__":
+    verify()
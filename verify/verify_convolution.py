@@ -62,5 +62,94 @@ def verify():
     else:
         print(f"FAIL: Manual {val} != I_conv {I_conv[2,2]}")
 
+    # 4. Vectorized vs loop version (must be bit-identical for integer kernels)
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (40, 50), dtype=np.uint8)
+    for kernel in [K, np.array([[1, 0], [0, -1]]), rng.integers(-5, 5, (5, 5))]:
+        fast = convolution.my_convolution(img, kernel)
+        slow = convolution.my_convolution_loop(img, kernel)
+        if fast.dtype == slow.dtype and np.array_equal(fast, slow):
+            print(f"SUCCESS: my_convolution == my_convolution_loop for {kernel.shape} kernel")
+        else:
+            print(f"FAIL: my_convolution differs from loop for {kernel.shape} kernel")
+
+    # 4b. Float inputs: different summation order, equal only up to rounding
+    frng = np.random.default_rng(1)
+    img32 = (frng.random((40, 50)) * 255).astype(np.float32)
+    k32 = frng.standard_normal((5, 5)).astype(np.float32)
+    fast = convolution.my_convolution(img32, k32, separable=False, method='spatial')
+    slow = convolution.my_convolution_loop(img32, k32)
+    err = np.max(np.abs(fast - slow)) / np.max(np.abs(slow))
+    if fast.dtype == np.float32 and err < 1e-5:
+        print(f"SUCCESS: float32 my_convolution matches loop within tolerance (rel err {err:.1e})")
+    else:
+        print(f"FAIL: float32 my_convolution differs from loop (dtype {fast.dtype}, rel err {err:.1e})")
+
+    # 5. Separable fast path vs 2-D path
+    gaussian = np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]]) / 16.0
+    sobel_x = np.array([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]])
+    for name, kernel in [("gaussian", gaussian), ("sobel_x", sobel_x), ("box 7x7", np.ones((7, 7), dtype=int))]:
+        if convolution.separate_kernel(kernel) is None:
+            print(f"FAIL: {name} kernel should be separable")
+            continue
+        sep = convolution.my_convolution(img, kernel, separable=True)
+        full = convolution.my_convolution(img, kernel, separable=False)
+        if np.allclose(sep, full, rtol=0, atol=1e-9):
+            print(f"SUCCESS: separable == 2-D path for {name}")
+        else:
+            print(f"FAIL: separable differs from 2-D path for {name}: {np.max(np.abs(sep - full))}")
+
+    # 6. FFT backend vs spatial (integer kernel -> exact after rounding)
+    big_kernel = rng.integers(-3, 4, (15, 15))
+    fft_res = convolution.my_convolution(img, big_kernel, method='fft')
+    spatial_res = convolution.my_convolution(img, big_kernel, method='spatial')
+    if np.array_equal(fft_res, spatial_res):
+        print("SUCCESS: FFT backend == spatial for 15x15 integer kernel")
+    else:
+        print(f"FAIL: FFT backend differs: {np.max(np.abs(fft_res - spatial_res))}")
+    print(f"Auto method for {img.shape} image, 15x15 kernel: {convolution.choose_method(img.shape, big_kernel)}")
+
+    # 6b. uint8 + kernel thuc (dia 9x9 chuan hoa) tren anh phang: FFT khong duoc ra 199 sau khi cat uint8
+    y, x = np.mgrid[-4:5, -4:5]
+    disk = (x * x + y * y <= 16).astype(float)
+    disk /= disk.sum()
+    flat = np.full((64, 64), 200, dtype=np.uint8)
+    as_u8 = [np.clip(convolution.my_convolution(flat, disk, method=m), 0, 255).astype(np.uint8)
+             for m in ('fft', 'spatial')]
+    if np.array_equal(as_u8[0], as_u8[1]) and np.all(as_u8[0][4:-4, 4:-4] == 200):
+        print("SUCCESS: FFT path snaps integer results (uint8 image, float disk kernel)")
+    else:
+        print("FAIL: FFT and spatial disagree after uint8 conversion")
+
+    # 6c. Mo hinh chi phi: 5x5 khong tach duoc va 15x15 tach duoc tren anh lon -> FFT
+    gauss15 = np.outer(*(2 * [np.exp(-np.linspace(-2, 2, 15) ** 2)]))
+    picks = (convolution.choose_method((2048, 2048), rng.integers(-3, 4, (5, 5))),
+             convolution.choose_method((2048, 2048), gauss15, convolution.prepared_factors(gauss15)))
+    if picks == ('fft', 'fft'):
+        print("SUCCESS: auto picks FFT for 5x5 dense and 15x15 separable kernels on 2048x2048")
+    else:
+        print(f"FAIL: auto picks {picks} for 5x5 dense / 15x15 separable on 2048x2048")
+
+    # 7. Filter bank vs one my_convolution per kernel
+    bank = rng.integers(-5, 5, (8, 3, 3))
+    stacked = np.stack([convolution.my_convolution(img, k) for k in bank])
+    max_res, arg_res = convolution.filter_bank(img, bank, reduce='argmax')
+    if (np.array_equal(convolution.filter_bank(img, bank), stacked)
+            and np.array_equal(convolution.filter_bank(img, bank, reduce='max'), stacked.max(axis=0))
+            and np.array_equal(arg_res, stacked.argmax(axis=0))
+            and np.array_equal(convolution.filter_bank(img, bank, reduce='sumsq'), (stacked ** 2).sum(axis=0))):
+        print("SUCCESS: filter_bank matches per-kernel my_convolution (all reduce modes)")
+    else:
+        print("FAIL: filter_bank differs from per-kernel my_convolution")
+
+    # 8. Fixed-point integer path for uint8 (exact, int16/int32 accumulator)
+    for name, kernel in [("gaussian /16", gaussian), ("sharpen", np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]]))]:
+        int_res = convolution.integer_convolution(img, kernel)
+        float_res = convolution.my_convolution(img, kernel)
+        if np.array_equal(int_res, np.floor(float_res)):
+            print(f"SUCCESS: integer_convolution ({int_res.dtype}) == floor(float path) for {name}")
+        else:
+            print(f"FAIL: integer_convolution differs for {name}")
+
 if __name__ == "__main__":
     verify()
@@ -1,5 +1,5 @@
 import numpy as np
-from features import fourier
+from features import fourier, frequency_filters
 import traceback
 
 def verify():
@@ -49,6 +49,80 @@ def verify():
             diff = np.max(np.abs(Fs1 - Fs2))
             print(f"   Fs1 != Fs2. Max diff: {diff}")
             
+        # 5. FFT vs ma tran DFT (dinh nghia) cho kich thuoc bat ky: le, nguyen to (Bluestein), chong anh
+        print("5. Testing FFT engine against the matrix DFT...")
+        rng = np.random.default_rng(0)
+
+        def dft_matrix(n):
+            k = np.arange(n)
+            return np.exp(-2j * np.pi * (np.outer(k, k) % n) / n)
+
+        worst = 0.0
+        for M, N in [(1, 7), (15, 16), (17, 64), (67, 90), (127, 30), (128, 97), (360, 240)]:
+            img = rng.random((M, N)) * 255
+            ref = dft_matrix(M) @ img @ dft_matrix(N)
+            F = fourier.DFT_Fourier(img)
+            worst = max(worst, np.abs(F - ref).max() / np.abs(ref).max(),
+                        np.abs(fourier.IDFT_Fourier(F) - img).max() / 255)
+        stack = rng.random((3, 20, 33))
+        batched = fourier.DFT_Fourier(stack)
+        worst = max(worst, max(np.abs(batched[c] - fourier.DFT_Fourier(stack[c])).max() for c in range(3)))
+        if worst < 1e-9:
+            print(f"   FFT matches matrix DFT (max rel err {worst:.1e})")
+        else:
+            print(f"   FAIL: FFT differs from matrix DFT (max rel err {worst:.1e})")
+
+        # 6. Nua pho (anh thuc): RDFT/IRDFT, phuc hoi pho day du, anh pho va dich tam tren nua pho
+        print("6. Testing half-spectrum (real input) path...")
+        worst = 0.0
+        for M, N in [(16, 16), (15, 16), (16, 17), (7, 9)]:
+            img = rng.random((M, N)) * 255
+            ref = np.fft.fft2(img)
+            H = fourier.RDFT_Fourier(img)
+            worst = max(worst, np.abs(fourier.full_spectrum(H, N) - ref).max() / np.abs(ref).max(),
+                        np.abs(fourier.IRDFT_Fourier(H, N) - img).max() / 255,
+                        np.abs(fourier.I_shifted(fourier.shifted(H, N), N) - H).max())
+        ok_shape = H.shape == (7, 5)
+        spec_ok = np.array_equal(fourier.compute_spectrum(fourier.RDFT_Fourier(img_arr), size),
+                                 fourier.compute_spectrum(fourier.DFT_Fourier(img_arr)))
+        centered_ok = np.array_equal(
+            fourier.compute_spectrum(fourier.shifted(fourier.RDFT_Fourier(img_arr), size), size, centered=True),
+            fourier.compute_spectrum(Fs1))
+        if worst < 1e-9 and ok_shape and spec_ok and centered_ok:
+            print(f"   Half spectrum matches full DFT (max rel err {worst:.1e}), spectra identical")
+        else:
+            print(f"   FAIL: half-spectrum path (err {worst:.1e}, shape {ok_shape}, spectrum {spec_ok}, centered {centered_ok})")
+
+        # 7. Loc mien tan so: nua pho (1 lan RDFT/IRDFT, ca 3 kenh) == loc tren pho da dich tam
+        print("7. Testing frequency-domain filters...")
+        ff = frequency_filters
+        ff.clear_cache()
+        rgb = rng.integers(0, 256, (32, 40, 3)).astype(float)
+        worst = 0.0
+        for kind in ff.KINDS:
+            for band, cutoff in [('lowpass', 6), ('highpass', 6), ('bandpass', (3, 9)),
+                                 ('bandreject', (3, 9)), ('notch', 3)]:
+                out = ff.filter_array(rgb, kind, band, cutoff, centers=((2, 5),))
+                for c in range(3):
+                    Fs = ff.apply_centered(fourier.F_shifted_transform(rgb[..., c]), kind, band, cutoff,
+                                           centers=((2, 5),))
+                    ref = fourier.IDFT_Fourier(fourier.I_shifted(Fs))
+                    worst = max(worst, np.abs(out[..., c] - ref).max() / 255)
+        low = ff.filter_array(rgb, 'gaussian', 'lowpass', 5)
+        high = ff.filter_array(rgb, 'gaussian', 'highpass', 5)
+        info = ff.cache_info()
+        ff.filter_array(rgb, 'gaussian', 'lowpass', 5)
+        cached = ff.cache_info()['hits'] == info['hits'] + 1 and ff.cache_info()['misses'] == info['misses']
+        y = np.arange(32)[:, None]
+        wave = 100 + 50 * np.cos(2 * np.pi * 4 * y / 32) + 0 * rgb[..., 0]
+        notched = ff.filter_array(wave, 'ideal', 'notch', 1, centers=((4, 0),))
+        u8 = ff.filter_array(rgb.astype(np.uint8), 'butterworth', 'lowpass', 8, order=3)
+        if worst < 1e-9 and np.allclose(low + high, rgb) and cached and np.allclose(notched, 100) \
+                and u8.dtype == np.uint8 and u8.shape == rgb.shape:
+            print(f"   Filters match centered-spectrum reference (max rel err {worst:.1e}), masks cached")
+        else:
+            print(f"   FAIL: frequency filters (err {worst:.1e}, cached {cached})")
+
         print("\nSUCCESS: DFT features ran.")
         
     except Exception as e:
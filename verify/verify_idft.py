@@ -1,5 +1,5 @@
 import numpy as np
-from features import fourier
+from features import fft, fourier
 import traceback
 
 def verify_idft():
@@ -54,6 +54,65 @@ def verify_idft():
              max_diff = np.max(np.abs(I - I3))
              print(f"   I3 != I. Max diff: {max_diff}")
              
+        # 7. Cache ke hoach FFT: DFT/IDFT lap lai cung kich thuoc chi tao twiddle 1 lan
+        print("7. Testing FFT plan cache...")
+        fft.clear_cache()
+        fourier.IDFT_Fourier(fourier.DFT_Fourier(I))
+        first = fft.cache_info()
+        for _ in range(3):
+            fourier.IDFT_Fourier(fourier.DFT_Fourier(I))
+        info = fft.cache_info()
+        if info['misses'] == first['misses'] and info['hits'] > first['hits'] and info['bytes'] > 0 \
+                and (size, 'forward', 'complex128') in info['keys'] and (size, 'inverse', 'complex128') in info['keys']:
+            print(f"   Plans reused: {info['entries']} plans, {info['bytes']} bytes, {info['hits']} hits.")
+        else:
+            print(f"   FAIL: plan cache not reused: {info}")
+
+        old_max = fft.MAX_PLANS
+        fft.MAX_PLANS = 2
+        for n in (5, 6, 7, 9):
+            fft.fft(np.ones(n))
+        if fft.cache_info()['entries'] == 2:
+            print("   Plan cache stays within MAX_PLANS.")
+        else:
+            print("   FAIL: plan cache grew past MAX_PLANS")
+        fft.MAX_PLANS = old_max
+        fft.clear_cache()
+
+        # 8. Dich tam voi moi kich thuoc (ca M, N le), tai cho / vao out, va gop vao bien doi
+        print("8. Testing shift/unshift for odd and even sizes...")
+        rng = np.random.default_rng(0)
+        failed = []
+        for M, N in [(1, 1), (1, 6), (5, 5), (15, 16), (16, 17), (7, 9), (16, 16)]:
+            X = rng.random((2, M, N)) + 1j * rng.random((2, M, N))
+            ref = np.fft.fftshift(X, axes=(-2, -1))
+            Y = X.copy()
+            out = np.empty_like(X)
+            ok = np.array_equal(fourier.shifted(X), ref) and np.array_equal(fourier.I_shifted(ref), X)
+            ok &= fourier.shifted(Y, out=Y) is Y and np.array_equal(Y, ref)
+            ok &= np.array_equal(fourier.I_shifted(Y, out=Y), X)
+            ok &= fourier.shifted(X, out=out) is out and np.array_equal(out, ref)
+            img = rng.random((M, N)) * 255
+            Fs = np.fft.fftshift(np.fft.fft2(img))
+            ok &= np.allclose(fourier.DFT_Fourier(img, centered=True), Fs)
+            ok &= np.allclose(fourier.F_shifted_transform(img), Fs)
+            ok &= np.allclose(fourier.IDFT_Fourier(Fs, centered=True), img)
+            ok &= np.array_equal(fourier.compute_spectrum(fourier.shifted(fourier.RDFT_Fourier(img), N), N, centered=True),
+                                 fourier.compute_spectrum(Fs))
+            if not ok:
+                failed.append((M, N))
+
+        import tracemalloc
+        big = rng.random((512, 512)) + 0j
+        tracemalloc.start()
+        fourier.shifted(big, out=big)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        if not failed and peak < big.nbytes // 64:
+            print(f"   shifted/I_shifted match fftshift for all sizes; in-place peak {peak} B")
+        else:
+            print(f"   FAIL: shift mismatch for {failed}, in-place peak {peak} B")
+
         print("\nSUCCESS: IDFT features verified.")
         
     except Exception as e:
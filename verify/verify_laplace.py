@@ -1,6 +1,6 @@
 import numpy as np
 from PIL import Image
-from features import laplace_processing
+from features import laplace_processing, kernel_cache, convolution
 import traceback
 
 def verify():
@@ -29,6 +29,61 @@ def verify():
         log_res = laplace_processing.apply_log(img_arr, '4n_neg')
         print("   LoG OK")
         
+        print("Testing fused LoG...")
+        # 1 kernel 5x5 == Gaussian roi Laplace (float, khong cat trung gian) tren ca anh, ke ca vien
+        f = img_arr.astype(float)
+        two_pass = convolution.my_convolution(
+            convolution.my_convolution(f, laplace_processing.get_kernels()['gaussian']),
+            laplace_processing.get_kernels()['laplace4n_neg'])
+        ref = np.clip(np.abs(two_pass), 0, 255)
+        err = np.abs(log_res.astype(float) - ref).max()
+        err_f = np.abs(laplace_processing.apply_log(f, '4n_neg').astype(float) - ref).max()
+        # Ban 2 luot cu (cat uint8 sau lam tron): chi khac phan lam tron trung gian, ke ca o vien
+        old = laplace_processing.apply_laplace(laplace_processing.apply_gaussian_smooth(img_arr), '4n_neg')
+        err_old = np.abs(log_res.astype(int) - old.astype(int)).max()
+        if err <= 0.5 and err_f <= 1 and err_old <= 4:
+            print(f"   Fused LoG OK (max diff {err}, float {err_f}, vs old two-pass {err_old})")
+        else:
+            print(f"FAILED: fused LoG differs from two-pass by {err} (float {err_f}, old {err_old})")
+
+        print("Testing sigma LoG / DoG / stack...")
+        for sigma in (1.0, 2.5):
+            k = laplace_processing.log_filter(img_arr, sigma, 'kernel')
+            d = laplace_processing.log_filter(img_arr, sigma, 'dog')
+            rel = np.abs(k - d).max() / np.abs(k).max()
+            if abs(laplace_processing.log_kernel(sigma).sum()) < 1e-12 and rel < 0.1:
+                print(f"   sigma={sigma}: DoG within {rel:.3f} of LoG kernel")
+            else:
+                print(f"FAILED: sigma={sigma} DoG relative error {rel}")
+        sigmas = [1.0, 1.6, 2.56]
+        stack = laplace_processing.log_stack(img_arr, sigmas, 'dog')
+        single = np.stack([laplace_processing.log_filter(img_arr, s, 'dog') for s in sigmas])
+        if stack.shape == (3, 100, 100) and np.abs(stack - single).max() < 0.5:
+            print("   LoG stack OK")
+        else:
+            print(f"FAILED: LoG stack differs by {np.abs(stack - single).max()}")
+
+        # auto: mo hinh chi phi phai chon duong nhanh hon o sigma nho (do thoi gian thuc)
+        import time
+        big = np.random.default_rng(0).integers(0, 256, (1024, 1024), dtype=np.uint8)
+
+        def best_time(approx):
+            best = float('inf')
+            for _ in range(3):
+                t0 = time.perf_counter()
+                laplace_processing.log_filter(big, 1.0, approx)
+                best = min(best, time.perf_counter() - t0)
+            return best
+
+        times = {a: best_time(a) for a in ('kernel', 'dog')}
+        dog_cost = laplace_processing._dog_cost(big.shape, 1.0)
+        picked = 'dog' if dog_cost < laplace_processing._kernel_cost(big.shape, 1.0) else 'kernel'
+        other = 'kernel' if picked == 'dog' else 'dog'
+        if times[picked] <= 1.1 * times[other]:
+            print(f"   auto picks {picked} at sigma=1 on 1024x1024 ({times[picked]:.3f}s vs {other} {times[other]:.3f}s)")
+        else:
+            print(f"FAILED: auto picks {picked} ({times[picked]:.3f}s) but {other} is faster ({times[other]:.3f}s)")
+
         print("Test Smooth Sobel 9.3")
         print("Testing Smooth Sobel 9.3...")
         sog_res = laplace_processing.apply_smooth_sobel(img_arr)
@@ -40,6 +95,78 @@ def verify():
         s3 = laplace_processing.apply_sharpening(img_arr, '4n_pos')
         s4 = laplace_processing.apply_sharpening(img_arr, '8n_pos')
         print("   Sharpen OK")
+
+        print("Testing sharpening engine (RGB, out buffer, unsharp mask)...")
+        rgb = np.stack([img_arr, img_arr[::-1], img_arr[:, ::-1]], axis=-1)
+        out = np.empty(rgb.shape, dtype=np.uint8)
+        res = laplace_processing.apply_sharpening(rgb, '8n_neg', out=out)
+        per_channel = all(np.array_equal(res[..., c], laplace_processing.apply_sharpening(
+            np.ascontiguousarray(rgb[..., c]), '8n_neg')) for c in range(3))
+        if res is out and per_channel and np.array_equal(res[..., 0], s2):
+            print("   RGB sharpening into out buffer OK")
+        else:
+            print("FAILED: RGB sharpening differs from per-channel result")
+        usm = laplace_processing.unsharp_mask(rgb, amount=1.0, radius=1.5, threshold=5)
+        flat = laplace_processing.unsharp_mask(np.full((20, 20), 90, np.uint8), amount=2.0, radius=1.0)
+        # Anh phang sang: vien khong duoc bi khung sang (mo padding 0 cho 255 o bien)
+        bright = laplace_processing.unsharp_mask(np.full((24, 30, 3), 200, np.uint8), amount=1.5, radius=2.0)
+        # Mo dung bien reflect: so voi pad reflect toan anh + tich chap 2D
+        g = laplace_processing.gaussian_kernel_1d(1.5)
+        r = len(g) // 2
+        padded = np.pad(img_arr.astype(float), r, mode='reflect')
+        ref = np.einsum('ijkl,kl->ij', np.lib.stride_tricks.sliding_window_view(padded, (2 * r + 1,) * 2),
+                        np.outer(g, g))
+        blur_ok = np.allclose(laplace_processing.gaussian_blur(img_arr, 1.5, 'reflect'), ref)
+        # Theo khoi hang (anh cao hon 1 khoi) == cong thuc tren anh mo ca anh
+        tall = np.random.default_rng(3).integers(0, 256, (600, 40), dtype=np.uint8)
+        d = tall - laplace_processing.gaussian_blur(tall, 2.0, 'reflect')
+        d[np.abs(d) < 4] = 0
+        blocks_ok = np.array_equal(laplace_processing.unsharp_mask(tall, 1.5, 2.0, 4),
+                                   np.clip(np.rint(tall + 1.5 * d), 0, 255).astype(np.uint8))
+        rejected = 0
+        for bad in ({'radius': 0}, {'radius': -1.0}, {'amount': np.nan}):
+            try:
+                laplace_processing.unsharp_mask(img_arr, **bad)
+            except ValueError:
+                rejected += 1
+        if usm.shape == rgb.shape and usm.dtype == np.uint8 and np.all(flat == 90) \
+                and np.all(bright == 200) and blur_ok and blocks_ok and rejected == 3:
+            print("   Unsharp mask OK")
+        else:
+            print("FAILED: unsharp mask")
+
+        print("Testing kernel cache reuse...")
+        kernel_cache.clear_cache()
+        for _ in range(2):
+            laplace_processing.apply_laplace(img_arr, '4n_neg')
+            laplace_processing.apply_log(img_arr, '4n_neg')
+            laplace_processing.apply_sharpening(img_arr, '8n_pos')
+        info = kernel_cache.cache_info()
+        print(f"   Cache: {info['hits']} hits, {info['misses']} misses, {info['entries']} entries, {info['bytes']} bytes")
+        if info['hits'] > info['misses']:
+            print("   Prepared kernels reused")
+        else:
+            print("FAILED: prepared kernels were not reused")
+
+        print("Testing kernel cache from several threads...")
+        import threading
+        kernel_cache.clear_cache()
+        kernels = [np.full((3, 3), i) for i in range(20)]
+        def worker():
+            for _ in range(50):
+                for k in kernels:
+                    kernel_cache.prepare('threads', k, lambda k=k: k * 2.0)
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        info = kernel_cache.cache_info()
+        if info['hits'] + info['misses'] == 4 * 50 * 20 and info['entries'] == 20 \
+                and info['bytes'] == 20 * 9 * 8:
+            print(f"   Thread-safe cache OK ({info['hits']} hits, {info['misses']} misses)")
+        else:
+            print(f"FAILED: cache stats after threads {info}")
         
         print("\nSUCCESS: All Laplace features ran without exception.")
         
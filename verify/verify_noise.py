@@ -8,7 +8,7 @@ from PIL import Image
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 try:
-    from features import noise
+    from features import noise, summed_area
     print("Successfully imported noise module")
 except ImportError as e:
     print(f"Failed to import noise module: {e}")
@@ -58,5 +58,74 @@ def verify():
     else:
         print(f"FAIL: 5x5 filter did not smooth more than 3x3: {std_5} vs {std_3}")
 
+def verify_summed_area():
+    print("--- Verifying summed-area window sum / mean / variance ---")
+    rng = np.random.default_rng(1)
+    img = rng.integers(0, 256, (37, 53), dtype=np.uint8)
+    img_f = rng.standard_normal((29, 31)) * 1e3 + 1e6
+
+    for size in (1, 2, 3, 4, 7, 51):
+        top, bottom, left, right = noise._margins(size)
+        for arr in (img, img_f):
+            padded = np.pad(arr.astype(float), ((top, bottom), (left, right)), mode='reflect')
+            windows = np.lib.stride_tricks.sliding_window_view(padded, (size, size))
+            ref_mean = windows.mean(axis=(-2, -1))
+            ref_var = windows.var(axis=(-2, -1))
+            mean, var = summed_area.window_variance(arr, size, return_mean=True)
+            avg = noise.average_filter_array(arr, size)
+            scale = max(1.0, float(np.abs(ref_var).max()))
+            if np.allclose(mean, ref_mean, rtol=0, atol=1e-9 * np.abs(ref_mean).max()) and \
+                    np.allclose(avg, ref_mean, rtol=0, atol=1e-9 * np.abs(ref_mean).max()) and \
+                    np.abs(var - ref_var).max() <= 1e-6 * scale:
+                print(f"SUCCESS: size {size} ({arr.dtype}) mean/variance match sliding-window reference")
+            else:
+                print(f"FAIL: size {size} ({arr.dtype}) mean/variance mismatch")
+
+    s = summed_area.window_sum(img, (3, 5))
+    if s.dtype == np.int64 and s[10, 10] == int(img[9:12, 8:13].sum()):
+        print("SUCCESS: integer window sum is exact int64")
+    else:
+        print("FAIL: integer window sum")
+
+def verify_synthesis():
+    print("--- Verifying seeded noise synthesis ---")
+    rng = np.random.default_rng(3)
+    rgb = rng.integers(30, 226, (32, 48, 3), dtype=np.uint8)
+
+    for kind in noise.NOISE_FUNCS:
+        a = noise.noisy_variants(rgb, 50, kind, seed=7)
+        b = noise.noisy_variants(rgb, 50, kind, seed=7)
+        c = noise.noisy_variants(rgb, 50, kind, seed=8)
+        if a.shape == (50,) + rgb.shape and a.dtype == np.uint8 and np.array_equal(a, b) \
+                and not np.array_equal(a, c) and not np.array_equal(a[0], a[1]):
+            print(f"SUCCESS: {kind} is seeded, batched and keeps uint8 RGB")
+        else:
+            print(f"FAIL: {kind} batch/seed behaviour")
+
+    flat = np.full((200, 200), 128.0)
+    std = noise.gaussian_noise(flat, sigma=5.0, seed=0).std()
+    if abs(std - 5.0) < 0.1:
+        print("SUCCESS: Gaussian noise has the requested sigma")
+    else:
+        print(f"FAIL: Gaussian noise std {std}")
+
+    sp = noise.salt_and_pepper(rgb, 0.1, 0.1, seed=1, channel_axis=-1)
+    hit = (sp != rgb).any(axis=-1)
+    whole = ((sp == 255).all(axis=-1) | (sp == 0).all(axis=-1))
+    if np.array_equal(hit, hit & whole) and abs(hit.mean() - 0.2) < 0.03:
+        print("SUCCESS: Salt-and-pepper with channel_axis hits whole pixels at the requested ratio")
+    else:
+        print("FAIL: Salt-and-pepper channel handling")
+
+    # Hang/cot cuoi cung phai co the bi nhieu (truoc day randint(0, i - 1) bo sot)
+    small = Image.new('L', (4, 4), color=128)
+    noisy = np.array(noise.add_salt_and_pepper_noise(small, 0.5, 0.5, seed=0))
+    if (noisy[-1] != 128).any() and (noisy[:, -1] != 128).any():
+        print("SUCCESS: Salt-and-pepper reaches the last row and column")
+    else:
+        print("FAIL: Salt-and-pepper never touches the last row/column")
+
 if __name__ == "__main__":
     verify()
+    verify_summed_area()
+    verify_synthesis()
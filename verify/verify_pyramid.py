@@ -0,0 +1,76 @@
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    from features import pyramid
+    print("Successfully imported pyramid module")
+except ImportError as e:
+    print(f"Failed to import pyramid module: {e}")
+    sys.exit(1)
+
+
+def reference_reduce(img):
+    # Loc 2D 5x5 tren ca anh (bien phan chieu) roi lay cac diem chan
+    K = np.outer(pyramid.BINOMIAL_5, pyramid.BINOMIAL_5)
+    H, W = img.shape
+    p = np.pad(img.astype(float), 2, mode='reflect')
+    full = sum(K[i, j] * p[i:i + H, j:j + W] for i in range(5) for j in range(5))
+    return full[::2, ::2]
+
+
+def verify():
+    print("--- Verifying Image Pyramids ---")
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (67, 90)).astype(np.uint8)
+
+    # 1. reduce == loc 5x5 day du roi lay mau
+    err = np.abs(pyramid.reduce(img, np.float64) - reference_reduce(img)).max()
+    if err < 1e-9:
+        print("SUCCESS: reduce matches full 5x5 filtering + subsampling")
+    else:
+        print(f"FAIL: reduce differs by {err}")
+
+    # 2. Tang uint8 = tang float lam tron
+    diff = np.abs(pyramid.reduce(img, np.uint8).astype(float) - pyramid.reduce(img, np.float64)).max()
+    if diff <= 0.5:
+        print("SUCCESS: uint8 reduce is the rounded float reduce")
+    else:
+        print(f"FAIL: uint8 reduce off by {diff}")
+
+    # 3. Kim tu thap Laplace khoi phuc chinh xac
+    lap = pyramid.laplacian_pyramid(img)
+    rec = pyramid.reconstruct(lap)
+    shapes = [l.shape for l in lap]
+    if np.abs(rec - img).max() < 1e-3:
+        print(f"SUCCESS: Laplacian pyramid {shapes} reconstructs the image")
+    else:
+        print(f"FAIL: reconstruction error {np.abs(rec - img).max()}")
+
+    # 4. RGB va cache theo anh
+    rgb = np.stack([img, img[::-1], img[:, ::-1]], axis=-1)
+    pyramid.clear_cache()
+    low = pyramid.preview(rgb, (20, 25))
+    again = pyramid.preview(rgb, (20, 25))
+    if low is again and low.shape == (34, 45, 3) and low.dtype == np.uint8:
+        print("SUCCESS: preview level cached per image (RGB)")
+    else:
+        print(f"FAIL: preview level {low.shape} {low.dtype}, cached={low is again}")
+
+    # 5. Cache khong khoa mang cua nguoi goi (van sua tai cho duoc)
+    pyramid.clear_cache()
+    src = img.copy()
+    base = pyramid.get_level(src, 0)
+    pyramid.get_level(src, 1)
+    if src.flags.writeable and not base.flags.writeable:
+        src[0, 0] = 1
+        print("SUCCESS: get_level leaves the input writeable and returns read-only levels")
+    else:
+        print(f"FAIL: input writeable={src.flags.writeable}, cached level writeable={base.flags.writeable}")
+
+
+if __name__ == "__main__":
+    verify()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import tracemalloc
+import numpy as np
+from PIL import Image
+from features import convolution, noise, tiled
+import traceback
+
+def verify():
+    print("--- Verifying Tiled (out-of-core) Processing ---")
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (300, 500), dtype=np.uint8)
+    kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            src_path = os.path.join(tmp, "src.npy")
+            dst_path = os.path.join(tmp, "dst.npy")
+            np.save(src_path, img)
+
+            # 1. Tiled convolution from .npy memmap to .npy memmap
+            print("1. Testing convolve_file...")
+            out = tiled.convolve_file(src_path, dst_path, kernel, tile_size=64)
+            expected = convolution.my_convolution(img, kernel)
+            if np.array_equal(np.load(dst_path), expected):
+                print("   Tiled convolution == my_convolution")
+            else:
+                print("   FAIL: tiled convolution differs")
+            del out
+
+            # 2. Tiled average filter (reflect padding)
+            print("2. Testing tiled_average_filter...")
+            src = tiled.open_image_array(src_path)
+            avg = tiled.tiled_average_filter(src, size=5, tile_size=64)
+            expected = np.array(noise.apply_average_filter(Image.fromarray(img), 5))
+            if np.array_equal(avg, expected):
+                print("   Tiled average filter == apply_average_filter")
+            else:
+                print("   FAIL: tiled average filter differs")
+
+            # 3. Peak memory bounded by tile size
+            print("3. Checking peak memory...")
+            big = rng.integers(0, 256, (2000, 2000), dtype=np.uint8)
+            big_path = os.path.join(tmp, "big.npy")
+            np.save(big_path, big)
+            del big
+            tracemalloc.start()
+            tiled.convolve_file(big_path, os.path.join(tmp, "big_out.npy"), kernel, tile_size=256)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            full_float = 2000 * 2000 * 8
+            print(f"   Peak traced memory: {peak / 1e6:.1f} MB (full float64 image: {full_float / 1e6:.1f} MB)")
+            if peak < full_float / 4:
+                print("   Peak memory bounded by tile size")
+            else:
+                print("   FAIL: peak memory too large")
+
+        print("\nSUCCESS: Tiled features ran.")
+
+    except Exception as e:
+        print(f"\nFAILED with Exception: {e}")
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    verify()